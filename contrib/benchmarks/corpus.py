@@ -0,0 +1,79 @@
+# -*- coding: utf8 -*-
+
+"""
+Generator of synthetic pylatest test case documents for benchmarks.
+"""
+
+
+TESTCASE_TEMPLATE = """\
+Test Case {num:05d}
+{title_line}
+
+:author: joe{num}@example.com
+:component: component{component}
+:caseimportance: {importance}
+:requirement: FOO-{requirement}
+
+Description
+===========
+
+This is test case number {num}, which checks that the component{component}
+does what it should do. Lorem ipsum dolor sit amet, consectetur adipiscing
+elit. Donec a diam lectus. Sed sit amet ipsum mauris.
+
+Setup
+=====
+
+#. Install the component on a client: ``dnf install component{component}``
+#. Start the service:
+
+   .. code-block:: shell
+
+       # systemctl start component{component}d
+
+Test Steps
+==========
+
+{actions}
+Teardown
+========
+
+#. Remove the component: ``dnf remove component{component}``
+"""
+
+ACTION_TEMPLATE = """\
+.. test_step:: {action_id}
+
+    Run ``component{component} --check {action_id}`` and check the output.
+
+.. test_result:: {action_id}
+
+    There are no errors reported for check {action_id}.
+
+"""
+
+
+def generate_testcase(num, actions=3):
+    """
+    Generate rst source of a test case document with given number of test
+    actions.
+    """
+    title = "Test Case {0:05d}".format(num)
+    action_list = []
+    for action_id in range(1, actions + 1):
+        action_list.append(ACTION_TEMPLATE.format(
+            action_id=action_id, component=num % 10))
+    return TESTCASE_TEMPLATE.format(
+        num=num,
+        title_line="*" * len(title),
+        component=num % 10,
+        importance=("low", "medium", "high")[num % 3],
+        requirement=num % 100,
+        actions="".join(action_list))
+
+
+def generate_corpus(size, actions=3):
+    """
+    Generate list of rst sources of given number of test case documents.
+    """
+    return [generate_testcase(num, actions) for num in range(size)]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+"""
+Benchmark of ``find_actions()`` function on a document with many actions.
+
+Compares current implementation with the previous one, which used
+``node.traverse(siblings=True)`` and ``node.traverse(ascend=True)`` to find
+the next node after each test action node (see ``find_actions_traverse()``
+below), and checks that both produce the same results.
+
+Example of usage::
+
+    $ python3 contrib/benchmarks/find_actions.py --actions 2000
+"""
+
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import generate_testcase  # noqa: E402
+from pylatest.xdocutils.nodes import test_action_node  # noqa: E402
+import pylatest.rstsource as rstsource  # noqa: E402
+
+
+def find_actions_traverse(rst_source):
+    """
+    Previous implementation of ``find_actions()`` (without comments).
+    """
+    nodetree = rstsource.publish_doctree(rst_source)
+    actions = []
+    for node in nodetree.traverse(test_action_node):
+        start_line = node.children[0].line - 2
+        next_siblings = node.traverse(
+            include_self=False, descend=False, siblings=True)
+        if len(next_siblings) > 0:
+            next_node = next_siblings[0]
+            if next_node.tagname == "test_action_node":
+                end_line = next_node.children[0].line - 4
+            elif next_node.tagname == "section":
+                end_line = next_node.line - 3
+            else:
+                end_line = next_node.line - 2
+        else:
+            following_nodes = node.traverse(
+                include_self=False, descend=False, ascend=True, siblings=False)
+            if len(following_nodes) > 0:
+                next_node = following_nodes[0]
+                if next_node.tagname == "section":
+                    end_line = next_node.line - 3
+                else:
+                    end_line = next_node.line - 2
+            else:
+                end_line = rstsource.get_last_line_num(rst_source)
+        actions.append(rstsource.RstTestAction(
+            node.attributes['action_id'],
+            node.attributes['action_name'],
+            start_line,
+            end_line))
+    return actions
+
+
+def timeit(func, rst_source):
+    start = time.perf_counter()
+    result = func(rst_source)
+    return time.perf_counter() - start, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument(
+        "-a", "--actions", type=int, default=2000,
+        help="number of test action nodes in the document")
+    args = ap.parse_args()
+
+    # each generated test action consists of test_step and test_result
+    rst_source = generate_testcase(0, actions=args.actions // 2)
+    parse_time, _ = timeit(rstsource.publish_doctree, rst_source)
+    old_time, old_actions = timeit(find_actions_traverse, rst_source)
+    new_time, new_actions = timeit(rstsource.find_actions, rst_source)
+    assert old_actions == new_actions
+    print("document with {} action nodes".format(len(new_actions)))
+    print("      parsing only: {:8.3f} s".format(parse_time))
+    print(" traverse (before): {:8.3f} s".format(old_time))
+    print("  next sibling map: {:8.3f} s".format(new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+"""
+Benchmark of rendering many small rst documents into html.
+
+Compares ``pylatest_publish_parts()`` function, which sets up whole docutils
+machinery (including processing of docutils settings) for each document, with
+reusable ``PylatestPublisher`` object. Parsing of rst sources via
+``find_sections()`` and ``find_actions()`` functions is reported as well.
+
+Example of usage::
+
+    $ python3 contrib/benchmarks/publisher.py --documents 500
+"""
+
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import generate_corpus  # noqa: E402
+import pylatest.rstsource as rstsource  # noqa: E402
+from pylatest.xdocutils.core import PylatestPublisher  # noqa: E402
+from pylatest.xdocutils.core import pylatest_publish_parts  # noqa: E402
+
+
+def render_functions(rst_sources):
+    return [
+        pylatest_publish_parts(src, writer_name='html', use_plain=True)
+        for src in rst_sources]
+
+
+def render_publisher(rst_sources):
+    publisher = PylatestPublisher(writer_name='html', use_plain=True)
+    return publisher.render_many(rst_sources)
+
+
+def parse_sources(rst_sources):
+    for src in rst_sources:
+        rstsource.find_sections(src)
+        rstsource.find_actions(src)
+
+
+def timeit(func, rst_sources):
+    start = time.perf_counter()
+    result = func(rst_sources)
+    return time.perf_counter() - start, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument(
+        "-n", "--documents", type=int, default=500,
+        help="number of documents to render")
+    ap.add_argument(
+        "-a", "--actions", type=int, default=3,
+        help="number of test actions in each document")
+    args = ap.parse_args()
+
+    rst_sources = generate_corpus(args.documents, args.actions)
+
+    func_time, func_parts = timeit(render_functions, rst_sources)
+    pub_time, pub_parts = timeit(render_publisher, rst_sources)
+    # both ways need to produce the same output
+    for func_part, pub_part in zip(func_parts, pub_parts):
+        assert func_part['whole'] == pub_part['whole']
+    print("render {} documents".format(args.documents))
+    print("  pylatest_publish_parts: {:8.3f} s {:8.2f} ms/doc".format(
+        func_time, 1000 * func_time / args.documents))
+    print("       PylatestPublisher: {:8.3f} s {:8.2f} ms/doc".format(
+        pub_time, 1000 * pub_time / args.documents))
+    parse_time, _ = timeit(parse_sources, rst_sources)
+    print("parse {} documents".format(args.documents))
+    template = " find_sections(), find_actions(): {:8.3f} s {:8.2f} ms/doc"
+    print(template.format(
+        parse_time, 1000 * parse_time / args.documents))
+
+
+if __name__ == '__main__':
+    main()
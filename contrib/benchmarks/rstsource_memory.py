@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+"""
+Memory benchmark of objects describing structure of rst sources.
+
+A corpus of test case documents is generated and processed via
+``find_sections()`` and ``find_actions()`` (the same way as ``py2pylatest``
+processes pylatest docstrings), keeping all ``RstSection``, ``RstTestAction``
+and ``Section`` objects alive.
+Python memory allocations are measured via tracemalloc and compared with the
+same objects represented by plain classes (with ``__dict__``), which is how
+these classes were implemented before.
+
+Example of usage::
+
+    $ python3 contrib/benchmarks/rstsource_memory.py --documents 20000
+"""
+
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import generate_testcase  # noqa: E402
+from pylatest.document import Section, TestCaseDoc  # noqa: E402
+import pylatest.rstsource as rstsource  # noqa: E402
+from pylatest.xdocutils.core import register_all  # noqa: E402
+
+
+class DictRstSection(object):
+
+    def __init__(self, title, start_line, end_line=None):
+        self.title = title
+        self.start_line = start_line
+        self.end_line = end_line
+
+
+class DictRstTestAction(object):
+
+    def __init__(self, action_id, action_name, start_line, end_line=None):
+        self.action_id = action_id
+        self.action_name = action_name
+        self.start_line = start_line
+        self.end_line = end_line
+
+
+class DictSection(object):
+
+    def __init__(self, title, html_id=True):
+        self.title = title
+        self.html_id = title.lower() if html_id else None
+
+
+def measure(func, locations):
+    """
+    Measure python memory allocated by objects created by given function
+    from given list of locations.
+    """
+    tracemalloc.start()
+    objects = func(locations)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used, len(objects)
+
+
+def build_compact(locations):
+    objects = []
+    for sections, actions in locations:
+        for s in sections:
+            objects.append(rstsource.RstSection(
+                s.title, s.start_line, s.end_line))
+            if s.title is not None:
+                objects.append(TestCaseDoc.find_section(s.title))
+        for a in actions:
+            objects.append(rstsource.RstTestAction(
+                a.action_id, a.action_name, a.start_line, a.end_line))
+    return objects
+
+
+def build_dict(locations):
+    objects = []
+    for sections, actions in locations:
+        for s in sections:
+            objects.append(DictRstSection(s.title, s.start_line, s.end_line))
+            if s.title is not None:
+                objects.append(DictSection(s.title))
+        for a in actions:
+            objects.append(DictRstTestAction(
+                a.action_id, a.action_name, a.start_line, a.end_line))
+    return objects
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure memory used by rst source location objects.")
+    parser.add_argument(
+        "-n", "--documents", type=int, default=1000,
+        help="number of documents in the corpus")
+    args = parser.parse_args()
+
+    register_all(use_plain=True)
+
+    # parse few distinct documents only (parsing is not measured here), but
+    # keep results for all documents of the corpus
+    parsed = []
+    for num in range(10):
+        rst_source = generate_testcase(num)
+        parsed.append((
+            rstsource.find_sections(rst_source),
+            rstsource.find_actions(rst_source)))
+    locations = [parsed[i % len(parsed)] for i in range(args.documents)]
+
+    for name, func in (("dict", build_dict), ("compact", build_compact)):
+        used, count = measure(func, locations)
+        print("{0:>8}: {1:>8} objects {2:>8.1f} kB {3:>6.1f} B/object".format(
+            name, count, used / 1024.0, used / float(count)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+"""
+Benchmark of lexical scanner used by ``find_sections(fast=True)`` and
+``find_actions(fast=True)`` functions.
+
+Runs both functions on generated test case documents with and without the
+scanner and checks that both ways produce the same results.
+
+Example of usage::
+
+    $ python3 contrib/benchmarks/scanner.py --documents 200
+"""
+
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import generate_corpus  # noqa: E402
+import pylatest.rstsource as rstsource  # noqa: E402
+
+
+def run(func, sources, fast):
+    start = time.perf_counter()
+    results = [func(src, fast=fast) for src in sources]
+    return time.perf_counter() - start, results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument(
+        "-d", "--documents", type=int, default=200,
+        help="number of generated test case documents")
+    ap.add_argument(
+        "-a", "--actions", type=int, default=3,
+        help="number of test actions in each document")
+    args = ap.parse_args()
+
+    sources = generate_corpus(args.documents, args.actions)
+    scanned = sum(
+        1 for src in sources if rstsource.scan_actions(src) is not None)
+    print("{} documents, {} handled by the scanner".format(
+        len(sources), scanned))
+    for func in (rstsource.find_sections, rstsource.find_actions):
+        slow_time, slow_results = run(func, sources, fast=False)
+        fast_time, fast_results = run(func, sources, fast=True)
+        assert slow_results == fast_results
+        print("{:>14}: docutils {:8.3f} s, scanner {:8.3f} s".format(
+            func.__name__, slow_time, fast_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf8 -*-
+
+"""
+Memory benchmark of XmlExportTestCaseDoc fragment types.
+
+Many xml export documents are built from html sources and kept in memory at
+once (as happens with combined exports or when pylatest export module is used
+as an API), and resident memory size of the process is reported for each
+fragment type. Each fragment type is measured in a separate child process.
+
+Memory allocated by libxml2 is not visible to tracemalloc, so that resident
+set size of the process (from ``/proc/self/statm``) is used instead, which
+means that this benchmark works on Linux only.
+
+Example of usage::
+
+    $ python3 contrib/benchmarks/xmlexport_memory.py --documents 2000
+"""
+
+
+import argparse
+import ctypes
+import gc
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import generate_testcase  # noqa: E402
+from pylatest.document import XmlExportTestCaseDoc  # noqa: E402
+from pylatest.export import build_xml_testcase_doc  # noqa: E402
+from pylatest.xdocutils.core import pylatest_publish_parts  # noqa: E402
+
+
+def get_rss():
+    """
+    Return resident set size of this process in bytes.
+    """
+    # return freed memory back to the system first, so that fragmentation of
+    # the heap (caused by freed html trees) doesn't hide the difference
+    ctypes.CDLL("libc.so.6").malloc_trim(0)
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(html_sources, fragment_type, queue):
+    gc.collect()
+    rss_before = get_rss()
+    docs = []
+    for html_source in html_sources:
+        docs.append(build_xml_testcase_doc(
+            html_source, fragment_type=fragment_type))
+    gc.collect()
+    rss_after = get_rss()
+    # make sure that the documents are still usable
+    docs[0].build_element_tree()
+    queue.put(rss_after - rss_before)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure memory used by xml export documents.")
+    parser.add_argument(
+        "-n", "--documents", type=int, default=1000,
+        help="number of documents kept in memory")
+    parser.add_argument(
+        "-a", "--actions", type=int, default=10,
+        help="number of test actions in each document")
+    args = parser.parse_args()
+
+    # html source of a test case is generated via pylatest docutils writer
+    # (just few distinct sources are rendered, each is parsed many times)
+    html_variants = []
+    for num in range(10):
+        parts = pylatest_publish_parts(
+            source=generate_testcase(num, args.actions),
+            writer_name='html',
+            use_plain=True)
+        html_variants.append(parts['whole'])
+    html_sources = [
+        html_variants[i % len(html_variants)] for i in range(args.documents)]
+
+    print("{0:>12} {1:>14} {2:>12}".format("fragments", "memory", "per doc"))
+    for fragment_type in XmlExportTestCaseDoc.FRAGMENT_TYPES:
+        queue = multiprocessing.Queue()
+        proc = multiprocessing.Process(
+            target=measure, args=(html_sources, fragment_type, queue))
+        proc.start()
+        used = queue.get()
+        proc.join()
+        print("{0:>12} {1:>11.1f} MB {2:>9.1f} kB".format(
+            fragment_type,
+            used / 1024.0 / 1024.0,
+            used / 1024.0 / args.documents))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+# -*- coding: utf8 -*-
+
+"""
+Python API for loading of pylatest test case documents.
+"""
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import OrderedDict
+import io
+import os
+import threading
+
+from docutils import nodes
+from docutils.languages import en
+
+from pylatest.document import TestActions, TestCaseDoc
+from pylatest.document import TestCaseDocWithContent
+from pylatest.pysource import extract_content
+from pylatest.rstsource import FIELD_RE, find_actions, find_sections
+from pylatest.rstsource import is_plain_title, publish_doctree
+from pylatest.rstsource import scan_blocks, split_lines
+from pylatest.xdocutils.core import register_all
+from pylatest.xdocutils.utils import get_field_list
+
+
+def _parse_field(lines):
+    """
+    Get name and plain text value of a field from given lines of a field list
+    item, or None if the field can't be reliably interpreted without docutils.
+    """
+    match = FIELD_RE.match(lines[0])
+    name = match.group(1)
+    if not is_plain_title(name):
+        return None
+    value_lines = []
+    if match.group(3):
+        value_lines.append(match.group(3))
+    indents = set()
+    for line in lines[1:]:
+        if len(line) == 0:
+            # field body with multiple paragraphs
+            return None
+        indents.add(len(line) - len(line.lstrip()))
+        value_lines.append(line.strip())
+    # lines of a paragraph are joined in the same way as in text of docutils
+    # paragraph node, while different indentation would create other
+    # constructs (such as definition list)
+    if len(indents) > 1:
+        return None
+    for line in value_lines:
+        if not is_plain_title(line):
+            return None
+    return name, "\n".join(value_lines)
+
+
+def parse_header(rst_source):
+    """
+    Find title and metadata (field list just after the title) of given rst
+    test case document via lexical scanner of pylatest.rstsource module,
+    without parsing the document. Returns None when the document contains
+    anything which can't be reliably interpreted in this way (eg. inline
+    markup), otherwise tuple (title, metadata dict) is returned, which is the
+    same as result of parse_header_doctree() function.
+    """
+    lines = split_lines(rst_source)
+    if lines is None:
+        return None
+    blocks = scan_blocks(lines)
+    if blocks is None:
+        return None
+    if len(blocks) == 0:
+        return None, OrderedDict()
+    # docutils promotes title of a lone top level section at the beginning
+    # of the document into document title (and the scanner checked that
+    # widths of title adornments and levels of titles are valid)
+    if blocks[0].kind != 'title':
+        return None
+    titles = [b for b in blocks if b.kind == 'title']
+    if len([b for b in titles if b.data[3] == 1]) != 1:
+        return None
+    title = blocks[0].data[0]
+    metadata = OrderedDict()
+    if len(blocks) == 1:
+        return title, metadata
+    if blocks[1].kind == 'explicit':
+        # comments and targets are skipped when docutils looks for docinfo
+        return None
+    if blocks[1].kind == 'title' and \
+       len([b for b in titles if b.data[3] == 2]) == 1:
+        # lone subsection would be promoted to document subtitle
+        return None
+    # field list just after the title is converted into docinfo (including
+    # field lists separated by blank lines only, which docutils merges)
+    index = 1
+    while index < len(blocks) and blocks[index].kind == 'field':
+        if any(name in en.bibliographic_fields for name in blocks[index].data):
+            # bibliographic fields are transformed into dedicated nodes
+            return None
+        if index + 1 < len(blocks):
+            end = blocks[index + 1].line
+            if blocks[index + 1].kind == 'title' and blocks[index + 1].data[2]:
+                end -= 1
+        else:
+            end = len(lines)
+        field_lines = lines[blocks[index].line:end]
+        while len(field_lines[-1]) == 0:
+            field_lines.pop()
+        starts = [
+            num for num, line in enumerate(field_lines)
+            if len(line) > 0 and not line[0].isspace()]
+        for start, stop in zip(starts, starts[1:] + [len(field_lines)]):
+            field = _parse_field(field_lines[start:stop])
+            if field is None:
+                return None
+            metadata[field[0]] = field[1]
+        index += 1
+    return title, metadata
+
+
+def parse_header_doctree(rst_source):
+    """
+    Find title and metadata of given rst test case document via docutils
+    parser. This is much slower than parse_header() function, but works for
+    any rst source.
+    """
+    register_all(use_plain=True)
+    nodetree = publish_doctree(rst_source)
+    title = None
+    title_node = nodetree.next_node(nodes.title)
+    if title_node is not None:
+        title = title_node.astext()
+    metadata = OrderedDict()
+    # standalone docutils reader converts field list just after document
+    # title into docinfo (with some bibliographic fields converted into
+    # dedicated nodes, eg. author)
+    docinfo = nodetree.next_node(nodes.docinfo)
+    if docinfo is not None:
+        for node in docinfo.children:
+            if isinstance(node, nodes.field):
+                metadata[node[0].astext()] = node[1].astext()
+            else:
+                metadata[node.tagname] = node.astext()
+    else:
+        field_list = get_field_list(nodetree)
+        if field_list is not None:
+            for field in field_list.traverse(nodes.field):
+                metadata[field[0].astext()] = field[1].astext()
+    return title, metadata
+
+
+class LazyTestCaseDoc(TestCaseDocWithContent):
+    """
+    Pylatest test case document loaded from a rst file (see load() function).
+
+    Title and metadata are taken from a quick parse of the document header
+    when accessed for the first time, while sections and test actions are
+    searched for only when some of them are accessed.
+    """
+
+    def __init__(self, path, rst_source):
+        # note that TestCaseDocWithContent.__init__() is not called, because
+        # _section_dict and _test_actions are computed lazily
+        self.path = path
+        """
+        Path of the rst file of this test case.
+        """
+        self.rst_source = rst_source
+        """
+        Rst source of this test case.
+        """
+        self._header = None
+        self._sections_cache = None
+        self._actions_cache = None
+
+    def __repr__(self):
+        return "LazyTestCaseDoc({0!r})".format(self.path)
+
+    def _get_header(self):
+        if self._header is None:
+            header = parse_header(self.rst_source)
+            if header is None:
+                header = parse_header_doctree(self.rst_source)
+            self._header = header
+        return self._header
+
+    @property
+    def title(self):
+        """
+        Title of the test case (or None if the document has no title).
+        """
+        return self._get_header()[0]
+
+    @property
+    def metadata(self):
+        """
+        Ordered dict with metadata from field list just after the title,
+        field name -> plain text of the field value.
+        """
+        return self._get_header()[1]
+
+    @property
+    def _section_dict(self):
+        if self._sections_cache is None:
+            # find_sections() falls back to docutils parser when the scanner
+            # can't handle the source, and it needs pylatest directives
+            register_all(use_plain=True)
+            source_lines = self.rst_source.splitlines()
+            section_dict = {}
+            for rst_sct in find_sections(self.rst_source, fast=True):
+                if rst_sct.title is None:
+                    section = TestCaseDoc._HEAD
+                else:
+                    section = TestCaseDoc.find_section(rst_sct.title)
+                section_dict[section] = extract_content(
+                    source_lines, rst_sct.start_line, rst_sct.end_line)
+            self._sections_cache = section_dict
+        return self._sections_cache
+
+    @property
+    def _test_actions(self):
+        if self._actions_cache is None:
+            register_all(use_plain=True)
+            source_lines = self.rst_source.splitlines()
+            test_actions = TestActions()
+            for rst_act in find_actions(self.rst_source, fast=True):
+                content = extract_content(
+                    source_lines, rst_act.start_line, rst_act.end_line)
+                test_actions.add(
+                    rst_act.action_name, content, rst_act.action_id)
+            self._actions_cache = test_actions
+        return self._actions_cache
+
+    @property
+    def test_actions(self):
+        """
+        Test actions of this test case (TestActions object).
+        """
+        return self._test_actions
+
+
+# cache of loaded documents: absolute path -> (file state, document), least
+# recently used documents are dropped when more than CACHE_SIZE documents are
+# cached
+CACHE_SIZE = 256
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load(path):
+    """
+    Load pylatest test case document from given rst file and return it as
+    LazyTestCaseDoc object.
+
+    Loaded documents are cached (up to ``CACHE_SIZE`` most recently used
+    ones), so that the file is read again (and new object is created) only
+    when it's modification time or size changes.
+    """
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    state = (stat.st_mtime, stat.st_size)
+    with _cache_lock:
+        cached = _cache.pop(abs_path, None)
+        if cached is not None and cached[0] == state:
+            _cache[abs_path] = cached
+            return cached[1]
+    with io.open(abs_path, 'r', encoding='utf-8') as rst_file:
+        rst_source = rst_file.read()
+    doc = LazyTestCaseDoc(abs_path, rst_source)
+    with _cache_lock:
+        _cache[abs_path] = (state, doc)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return doc
+
+
+def clear_cache():
+    """
+    Drop all documents cached by load() function.
+    """
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,472 @@
+# -*- coding: utf8 -*-
+
+"""
+SQLite catalog of test cases, with metadata, requirements and few other
+details of each test case, maintained by pylatest sphinx extension during
+the build (see ``pylatest_catalog`` config option).
+
+Catalog can be queried without parsing any rst or xml export files, eg.
+using ``pylatest-query`` command line tool which uses ``main()`` function
+from this module::
+
+    $ pylatest-query _build/doctrees/pylatest.db author=joe@example.com
+
+lists all test cases with given author.
+
+Text of test steps and results is indexed in a full text search table (using
+FTS5 or FTS4 extension of SQLite, whichever is available), which can be
+searched via ``pylatest-search`` tool (see ``search_main()``)::
+
+    $ pylatest-search _build/doctrees/pylatest.db '"ls -a"'
+"""
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS testcases (
+    docname TEXT PRIMARY KEY,
+    testcase_id TEXT,
+    title TEXT,
+    source TEXT,
+    actions INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS testcases_testcase_id ON testcases (testcase_id);
+CREATE TABLE IF NOT EXISTS metadata (
+    docname TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (docname, name)
+);
+CREATE INDEX IF NOT EXISTS metadata_name_value ON metadata (name, value);
+CREATE TABLE IF NOT EXISTS requirements (
+    docname TEXT NOT NULL,
+    requirement TEXT NOT NULL,
+    PRIMARY KEY (docname, requirement)
+);
+CREATE INDEX IF NOT EXISTS requirements_requirement
+    ON requirements (requirement);
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY,
+    docname TEXT NOT NULL,
+    action_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS actions_docname ON actions (docname);
+CREATE TABLE IF NOT EXISTS properties (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+TABLES = (
+    "testcases", "metadata", "requirements", "actions", "actions_fts",
+    "properties")
+
+# full text search extensions of sqlite, in order of preference
+FTS_MODULES = ("fts5", "fts4")
+
+# arguments of snippet() function of full text search table (which differ
+# for each extension), for a snippet of any column, highlighting matches
+SNIPPET_ARGS = {
+    "fts5": "actions_fts, -1, '[', ']', '...', 12",
+    "fts4": "actions_fts, '[', ']', '...', -1, 12",
+    }
+
+
+class CatalogVersionError(Exception):
+    """
+    Catalog opened in read only mode has unexpected schema version.
+    """
+
+
+class Catalog(object):
+    """
+    SQLite catalog of test cases, identified by docname.
+
+    When opened with ``readonly=True``, the catalog file is never modified:
+    schema is not created nor recreated (catalog with other schema version
+    is reported via CatalogVersionError instead).
+    """
+
+    # version of database schema, catalog with other version is recreated
+    # (or rejected when opened in read only mode)
+    VERSION = 2
+
+    def __init__(self, filename, readonly=False):
+        self.filename = filename
+        self.readonly = readonly
+        self.conn = sqlite3.connect(filename)
+        self.conn.row_factory = sqlite3.Row
+        if readonly:
+            self._check_schema()
+        else:
+            self._init_schema()
+
+    def _check_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.VERSION:
+            self.conn.close()
+            raise CatalogVersionError(
+                "catalog {0} has schema version {1:d}, but version {2:d} is "
+                "expected (rebuild the catalog via sphinx build)".format(
+                    self.filename, version, self.VERSION))
+        # sqlite refuses any change of the database from now on
+        self.conn.execute("PRAGMA query_only = ON")
+        self._init_fts(create=False)
+
+    def _init_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.VERSION:
+            for table in TABLES:
+                self.conn.execute("DROP TABLE IF EXISTS {0}".format(table))
+        self.conn.executescript(SCHEMA)
+        self._init_fts()
+        if version != self.VERSION:
+            self.conn.execute(
+                "PRAGMA user_version = {0:d}".format(self.VERSION))
+        self.conn.commit()
+
+    def _init_fts(self, create=True):
+        """
+        Create full text search table of test actions (if it doesn't exist
+        and create is True) using the first available extension.
+        """
+        # name of extension used for full text search table, if any
+        self.fts = None
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'actions_fts'"
+            ).fetchone()
+        if row is not None:
+            for module in FTS_MODULES:
+                if module in row[0].lower():
+                    self.fts = module
+            return
+        if not create:
+            return
+        for module in FTS_MODULES:
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE actions_fts "
+                    "USING {0}(step, result)".format(module))
+            except sqlite3.OperationalError:
+                # the extension is not available in this sqlite build
+                continue
+            self.fts = module
+            return
+
+    def close(self):
+        self.conn.close()
+
+    def transaction(self):
+        """
+        Returns context manager which commits all changes done within it (or
+        rolls them back on error).
+        """
+        return self.conn
+
+    def get_property(self, name):
+        row = self.conn.execute(
+            "SELECT value FROM properties WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def set_property(self, name, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO properties (name, value) VALUES (?, ?)",
+            (name, value))
+
+    def get_docnames(self):
+        """
+        Get set of docnames of all test cases in the catalog.
+        """
+        rows = self.conn.execute("SELECT docname FROM testcases")
+        return set(row[0] for row in rows)
+
+    def update(self, docname, testcase_id, title, source, actions,
+               metadata, requirements):
+        """
+        Add or replace test case of given docname, with given test actions
+        (list of tuples with action id, text of test step and text of test
+        result, where any of the texts can be None), metadata (dict which
+        maps field names to values) and requirements (list of keys).
+        """
+        self.remove(docname)
+        self.conn.execute(
+            "INSERT INTO testcases "
+            "(docname, testcase_id, title, source, actions) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (docname, testcase_id, title, source, len(actions)))
+        self.conn.executemany(
+            "INSERT INTO metadata (docname, name, value) VALUES (?, ?, ?)",
+            [(docname, name, value) for name, value in metadata.items()])
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO requirements (docname, requirement) "
+            "VALUES (?, ?)",
+            [(docname, req) for req in requirements])
+        for action_id, step, result in actions:
+            cursor = self.conn.execute(
+                "INSERT INTO actions (docname, action_id) VALUES (?, ?)",
+                (docname, action_id))
+            if self.fts is not None:
+                self.conn.execute(
+                    "INSERT INTO actions_fts (rowid, step, result) "
+                    "VALUES (?, ?, ?)",
+                    (cursor.lastrowid, step, result))
+
+    def remove(self, docname):
+        """
+        Remove test case of given docname (if present) from the catalog.
+        """
+        # full text search table is not indexed by docname, so it's rows are
+        # found via rowid from actions table instead
+        if self.fts is not None:
+            self.conn.execute(
+                "DELETE FROM actions_fts WHERE rowid IN "
+                "(SELECT id FROM actions WHERE docname = ?)", (docname,))
+        for table in ("testcases", "metadata", "requirements", "actions"):
+            self.conn.execute(
+                "DELETE FROM {0} WHERE docname = ?".format(table), (docname,))
+
+    def get_metadata(self, docname):
+        return dict(
+            (row[0], row[1]) for row in self.conn.execute(
+                "SELECT name, value FROM metadata WHERE docname = ?",
+                (docname,)))
+
+    def get_requirements(self, docname):
+        return [row[0] for row in self.conn.execute(
+            "SELECT requirement FROM requirements WHERE docname = ? "
+            "ORDER BY requirement",
+            (docname,))]
+
+    def query(self, metadata=(), requirement=None):
+        """
+        Find test cases which match all given metadata conditions and which
+        cover given requirement (when specified).
+
+        Each metadata condition is a tuple (name, operator, value), where
+        operator is either ``=`` (exact match) or ``~`` (value is a glob
+        pattern, see GLOB operator of SQLite).
+
+        Returns list of rows (sqlite3.Row) ordered by docname.
+        """
+        conditions = []
+        params = []
+        for name, operator, value in metadata:
+            if operator == "=":
+                sql_operator = "="
+            elif operator == "~":
+                sql_operator = "GLOB"
+            else:
+                raise ValueError("invalid operator: {0}".format(operator))
+            conditions.append(
+                "docname IN (SELECT docname FROM metadata "
+                "WHERE name = ? AND value {0} ?)".format(sql_operator))
+            params.extend([name, value])
+        if requirement is not None:
+            conditions.append(
+                "docname IN (SELECT docname FROM requirements "
+                "WHERE requirement = ?)")
+            params.append(requirement)
+        sql = "SELECT * FROM testcases"
+        if len(conditions) > 0:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY docname"
+        return self.conn.execute(sql, params).fetchall()
+
+    def search(self, query, column=None):
+        """
+        Find test actions which match given full text search query (see
+        documentation of sqlite FTS extensions for query syntax), optionally
+        matching just given column (``step`` or ``result``).
+
+        Returns list of rows (sqlite3.Row) with docname, action_id, step,
+        result and snippet of matching text, ordered by docname and action
+        id. Raises sqlite3.OperationalError for invalid query, and
+        ValueError when full text search is not available.
+        """
+        if self.fts is None:
+            raise ValueError(
+                "full text search is not supported by sqlite library")
+        if column is None:
+            match_column = "actions_fts"
+        elif column in ("step", "result"):
+            match_column = "actions_fts." + column
+        else:
+            raise ValueError("invalid column: {0}".format(column))
+        sql = (
+            "SELECT actions.docname, actions.action_id, "
+            "actions_fts.step, actions_fts.result, "
+            "snippet({0}) AS snippet "
+            "FROM actions_fts JOIN actions ON actions.id = actions_fts.rowid "
+            "WHERE {1} MATCH ? "
+            "ORDER BY actions.docname, actions.action_id").format(
+                SNIPPET_ARGS[self.fts], match_column)
+        return self.conn.execute(sql, (query,)).fetchall()
+
+
+def parse_condition(condition):
+    """
+    Parse metadata condition ``NAME=VALUE`` or ``NAME~PATTERN`` into tuple
+    (name, operator, value) as expected by ``Catalog.query()``.
+    """
+    positions = [
+        (condition.find(operator), operator) for operator in ("=", "~")
+        if condition.find(operator) > 0]
+    if len(positions) == 0:
+        raise ValueError(
+            "invalid condition (NAME=VALUE or NAME~PATTERN expected): "
+            "{0}".format(condition))
+    pos, operator = min(positions)
+    return condition[:pos], operator, condition[pos + 1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Query sqlite catalog of test cases created by pylatest "
+                    "sphinx extension.")
+    parser.add_argument(
+        "-r", "--requirement",
+        help="list only test cases which cover given requirement")
+    parser.add_argument(
+        "-j", "--json", action="store_true", default=False,
+        help="list test cases as json, including metadata and requirements")
+    parser.add_argument(
+        "-c", "--count", action="store_true", default=False,
+        help="report just number of matching test cases")
+    parser.add_argument(
+        "catalog",
+        help="catalog file (see pylatest_catalog config option)")
+    parser.add_argument(
+        "conditions", nargs="*", metavar="condition",
+        help="metadata condition, either NAME=VALUE or NAME~PATTERN")
+    args = parser.parse_args(argv)
+
+    try:
+        conditions = [parse_condition(c) for c in args.conditions]
+    except ValueError as ex:
+        parser.error(str(ex))
+    # don't create new empty catalog by mistake
+    if not os.path.isfile(args.catalog):
+        print("catalog file {0} not found".format(args.catalog),
+              file=sys.stderr)
+        return 1
+
+    try:
+        catalog = Catalog(args.catalog, readonly=True)
+    except (CatalogVersionError, sqlite3.DatabaseError) as ex:
+        print(str(ex), file=sys.stderr)
+        return 1
+    try:
+        rows = catalog.query(conditions, args.requirement)
+        if args.count:
+            print(len(rows))
+        elif args.json:
+            testcases = []
+            for row in rows:
+                testcase = dict(zip(row.keys(), row))
+                testcase['metadata'] = catalog.get_metadata(row['docname'])
+                testcase['requirements'] = catalog.get_requirements(
+                    row['docname'])
+                testcases.append(testcase)
+            print(json.dumps(testcases, indent=2, sort_keys=True))
+        else:
+            for row in rows:
+                print("\t".join([
+                    row['docname'],
+                    row['testcase_id'] or "",
+                    row['title'] or ""]))
+    finally:
+        catalog.close()
+    return 0
+
+
+def search_main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Full text search of test steps and results in sqlite "
+                    "catalog of test cases created by pylatest sphinx "
+                    "extension.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "-s", "--step", action="store_const", dest="column", const="step",
+        help="search in test steps only")
+    group.add_argument(
+        "-r", "--result", action="store_const", dest="column",
+        const="result", help="search in test results only")
+    parser.add_argument(
+        "-j", "--json", action="store_true", default=False,
+        help="list matching test actions as json, with full text")
+    parser.add_argument(
+        "-l", "--list", action="store_true", default=False,
+        help="list just docnames of matching test cases")
+    parser.add_argument(
+        "catalog",
+        help="catalog file (see pylatest_catalog config option)")
+    parser.add_argument(
+        "query",
+        help="full text search query (use double quotes for phrases)")
+    args = parser.parse_args(argv)
+
+    # don't create new empty catalog by mistake
+    if not os.path.isfile(args.catalog):
+        print("catalog file {0} not found".format(args.catalog),
+              file=sys.stderr)
+        return 1
+
+    try:
+        catalog = Catalog(args.catalog, readonly=True)
+    except (CatalogVersionError, sqlite3.DatabaseError) as ex:
+        print(str(ex), file=sys.stderr)
+        return 1
+    try:
+        rows = catalog.search(args.query, args.column)
+    except (ValueError, sqlite3.OperationalError) as ex:
+        print("search failed: {0}".format(ex), file=sys.stderr)
+        return 1
+    finally:
+        catalog.close()
+    if args.list:
+        docnames = []
+        for row in rows:
+            if row['docname'] not in docnames:
+                docnames.append(row['docname'])
+        for docname in docnames:
+            print(docname)
+    elif args.json:
+        actions = [
+            dict((key, row[key]) for key in (
+                'docname', 'action_id', 'step', 'result'))
+            for row in rows]
+        print(json.dumps(actions, indent=2, sort_keys=True))
+    else:
+        for row in rows:
+            snippet = " ".join(row['snippet'].split())
+            print("{0}\t{1}\t{2}".format(
+                row['docname'], row['action_id'], snippet))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
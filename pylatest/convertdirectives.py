@@ -0,0 +1,266 @@
+# -*- coding: utf8 -*-
+
+"""
+Command line tool which converts deprecated test action directives
+``test_step`` and ``test_result`` into ``test_action`` directive in all rst
+files of given directory trees.
+
+Example of usage, following command::
+
+    $ pylatest-convertdirectives testcases/
+
+converts all rst files with deprecated directives in ``testcases``
+directory, where ``pylatest-convertdirectives`` is command line tool which
+uses ``main()`` function from this module.
+
+Files are converted in parallel using pool of worker processes, each file is
+parsed just once and replaced atomically (so that the file is never left
+partially written, even when the tool is interrupted).
+
+There are multiple edge cases when the conversion doesn't work, such as:
+
+* empty directives
+* directives with content which doesn't start with text paragraph
+
+Such files are reported as failed and left untouched.
+"""
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import stat
+import sys
+import time
+
+from docutils.utils import SystemMessage
+
+from pylatest.document import TestActions
+from pylatest.rstsource import find_actions
+from pylatest.utils import write_atomic
+from pylatest.xdocutils.core import register_all
+
+
+# deprecated test action directives, used to quickly find files which need
+# to be converted without parsing them
+OLD_DIRECTIVE_RE = re.compile(
+    r'^[ \t]*\.\. test_(step|result)::', re.MULTILINE)
+
+# possible results of conversion of a single file
+CONVERTED = "converted"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+def convert_directives(rst_source):
+    """
+    Convert all ``test_step`` and ``test_result`` directives in given rst
+    source into ``test_action`` directives and return the new rst source.
+
+    Raises ValueError when the conversion can't be done reliably.
+    """
+    actions = TestActions()
+
+    # extract test actions of all deprecated test_{step,result} directives,
+    # including line numbers
+    for action in find_actions(rst_source, fast=True):
+        if action.action_name not in ("test_step", "test_result"):
+            raise ValueError(
+                "mix of test_action and deprecated directives is not "
+                "supported")
+        actions.add(action.action_name, action, action.action_id)
+
+    # list with content of rst source
+    rstcontent = rst_source.splitlines()
+
+    # number of next line in rst source to go to output, zero indexed
+    next_line_number = 0
+
+    output = []
+    for action_id, test_step, test_result in actions:
+        # make the assumptions clear
+        if test_step is None:
+            raise ValueError(
+                "test_result {0} without test_step".format(action_id))
+        if test_step.start_line <= next_line_number:
+            raise ValueError(
+                "test_step {0} is out of order".format(action_id))
+        if test_result is not None and \
+                test_step.end_line >= test_result.start_line:
+            raise ValueError(
+                "test_result {0} doesn't follow test_step".format(action_id))
+        for action in (test_step, test_result):
+            if action is None:
+                continue
+            directive_line = rstcontent[action.start_line - 1]
+            if not directive_line.startswith(
+                    ".. {0}::".format(action.action_name)):
+                raise ValueError(
+                    "{0} {1} is not a top level directive".format(
+                        action.action_name, action_id))
+        # copy all lines from last copied one to start of the current step
+        output.extend(rstcontent[next_line_number:test_step.start_line - 1])
+        # convert test_step/test_result directive pair into test_action
+        output.append(".. test_action::")
+        output.append("   :step:")
+        for linenum in range(test_step.start_line + 1, test_step.end_line):
+            output.append(_indent(rstcontent[linenum]))
+        next_line_number = test_step.end_line
+        if test_result is not None:
+            output.append("   :result:")
+            for linenum in range(
+                    test_result.start_line + 1, test_result.end_line):
+                output.append(_indent(rstcontent[linenum]))
+            next_line_number = test_result.end_line
+    # ok, and now copy the rest of the file
+    output.extend(rstcontent[next_line_number:])
+    new_source = "\n".join(output) + "\n"
+
+    # double check that all directives were found and converted
+    if OLD_DIRECTIVE_RE.search(new_source) is not None:
+        raise ValueError("some directives were not converted")
+    return new_source
+
+
+def _indent(line):
+    """
+    Indent given line of directive content into field body.
+    """
+    if len(line) > 0:
+        return "   " + line
+    return line
+
+
+def _init_worker():
+    """
+    Initialize worker process, so that pylatest docutils extensions are
+    registered just once in each process.
+    """
+    register_all(use_plain=True)
+
+
+def convert_file(task):
+    """
+    Convert single rst file in place. Returns tuple with path of the file,
+    result of the conversion, time spent on the file and error message (None
+    when no error happened).
+    """
+    path, dry_run = task
+    start = time.time()
+    try:
+        with io.open(path, 'r', encoding='utf-8', newline='') as rst_file:
+            rst_source = rst_file.read()
+        if OLD_DIRECTIVE_RE.search(rst_source) is None:
+            return path, UNCHANGED, time.time() - start, None
+        new_source = convert_directives(rst_source)
+        if not dry_run:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+            write_atomic(path, new_source.encode('utf-8'), mode)
+    except SystemMessage as ex:
+        # severe docutils error (eg. broken include directive) affects this
+        # file only
+        return path, FAILED, time.time() - start, str(ex)
+    except Exception as ex:
+        return path, FAILED, time.time() - start, str(ex)
+    return path, CONVERTED, time.time() - start, None
+
+
+def find_rst_files(paths):
+    """
+    Generate paths of all rst files in given directory trees (paths of files
+    are passed as they are), skipping hidden directories.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if filename.endswith(".rst"):
+                    yield os.path.join(dirpath, filename)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert directives test_{step,result} into test_action "
+                    "in all rst files of given directories.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=multiprocessing.cpu_count(),
+        help="number of worker processes (default: number of cpus)")
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", default=False,
+        help="don't change any file, just report what would be converted")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", default=False,
+        help="report conversion time of every converted file")
+    parser.add_argument(
+        "--slowest", type=int, default=10, metavar="N",
+        help="report N files which took the longest time (default: 10)")
+    parser.add_argument(
+        "paths", nargs="+", metavar="path",
+        help="rst file or directory with rst files")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    tasks = [(path, args.dry_run) for path in find_rst_files(args.paths)]
+    if args.jobs > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(
+            min(args.jobs, len(tasks)), initializer=_init_worker)
+        try:
+            results = pool.map(convert_file, tasks, chunksize=16)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _init_worker()
+        results = [convert_file(task) for task in tasks]
+    total_time = time.time() - start
+
+    counts = {CONVERTED: 0, UNCHANGED: 0, FAILED: 0}
+    for path, result, duration, error in results:
+        counts[result] += 1
+        if args.verbose and result != UNCHANGED:
+            print("{0:8.3f} s {1} {2}".format(duration, result, path))
+    processed = [r for r in results if r[1] != UNCHANGED]
+    processed.sort(key=lambda r: (-r[2], r[0]))
+    if args.slowest > 0 and len(processed) > 0:
+        print("Slowest files:")
+        for path, result, duration, error in processed[:args.slowest]:
+            print("{0:8.3f} s {1}".format(duration, path))
+    if counts[FAILED] > 0:
+        print("Failed files:", file=sys.stderr)
+        for path, result, duration, error in results:
+            if result == FAILED:
+                print("{0}: {1}".format(path, error), file=sys.stderr)
+    msg = "{0} {1}, {2} without deprecated directives, {3} failed " \
+          "in {4:.2f} s".format(
+              counts[CONVERTED],
+              "to convert" if args.dry_run else "converted",
+              counts[UNCHANGED],
+              counts[FAILED],
+              total_time)
+    print(msg, file=sys.stderr)
+    return 1 if counts[FAILED] > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
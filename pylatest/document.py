@@ -23,6 +23,9 @@ types (eg. list of section titles) and other general functions.
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import copy
+import hashlib
+
 from lxml import etree
 
 
@@ -161,6 +164,8 @@ class Section(object):
     This class is concerned just with document structure.
     """
 
+    __slots__ = ('title', 'html_id')
+
     def __init__(self, title, html_id=True):
         self.title = title
         if html_id:
@@ -245,6 +250,23 @@ class TestCaseDoc(object):
                 return True
         return False
 
+    @classmethod
+    def find_section(cls, title):
+        """
+        Return section object for given title. For sections of pylatest test
+        case document, the predefined section object is returned, so that new
+        object is created only for sections with other titles.
+        """
+        section = cls._SECTIONS_BY_TITLE.get(title)
+        if section is None:
+            section = Section(title)
+        return section
+
+
+# sections of pylatest test case document by title, see find_section()
+TestCaseDoc._SECTIONS_BY_TITLE = dict(
+    (section.title, section) for section in TestCaseDoc.SECTIONS_ALL)
+
 
 class TestCaseDocWithContent(TestCaseDoc):
     """
@@ -411,7 +433,34 @@ class XmlExportTestCaseDoc(TestCaseDocWithContent):
     List of supported ways to include content in xml export file.
     """
 
-    def __init__(self, title=None, content_type=None, testcase_id=None):
+    ELEMENT = "element"
+    DETACHED = "detached"
+    SERIALIZED = "serialized"
+    FRAGMENT_TYPES = (
+        ELEMENT,
+        DETACHED,
+        SERIALIZED,
+        )
+    """
+    List of supported ways to store html fragments (content of sections and
+    test actions) in the document:
+
+    * ``element``: given lxml element is stored as it is, which keeps it's
+      whole source html tree alive (default)
+    * ``detached``: a deep copy of the element (detached from it's source html
+      tree) is stored
+    * ``serialized``: the element is stored as a serialized bytes string
+
+    Note that the lxml element stored via ``element`` type is moved into
+    xml tree created by ``build_element_tree()``.
+    """
+
+    def __init__(
+            self,
+            title=None,
+            content_type=None,
+            testcase_id=None,
+            fragment_type=None):
         super(XmlExportTestCaseDoc, self).__init__()
         self.metadata = {}
         self.title = title
@@ -424,6 +473,19 @@ class XmlExportTestCaseDoc(TestCaseDocWithContent):
         else:
             msg = "unknown content type '{}'".format(content_type)
             raise PylatestDocumentError(msg)
+        if fragment_type is None:
+            self.fragment_type = self.ELEMENT
+        elif fragment_type in self.FRAGMENT_TYPES:
+            self.fragment_type = fragment_type
+        else:
+            msg = "unknown fragment type '{}'".format(fragment_type)
+            raise PylatestDocumentError(msg)
+        # root elements of trees with detached fragments, for fragments which
+        # inherited namespace declarations from it's html tree (True) and for
+        # fragments which declared namespaces on it's own (False)
+        self._fragment_roots = {}
+        # doctype of html document of the fragments
+        self._doctype = None
 
     def __eq__(self, other):
         # TODO: use testcase id here?
@@ -431,10 +493,108 @@ class XmlExportTestCaseDoc(TestCaseDocWithContent):
                 self.metadata == other.metadata and
                 self.title == other.title)
 
-    def _set_content(self, xml_node, html_node):
+    def _store_fragment(self, html_node):
+        """
+        Convert given html element into a form in which it's stored in this
+        document (based on fragment type).
+        """
+        if self.fragment_type != self.ELEMENT and self._doctype is None:
+            # serialization of html elements depends on doctype of the html
+            # document (eg. xhtml document has explicit end tags for empty
+            # elements), which we need to keep along with the fragments
+            self._doctype = html_node.getroottree().docinfo.doctype
+        # xml namespaces of the element are either declared on the element
+        # itself, or inherited from it's html tree
+        inherit_ns = html_node.getparent() is not None
+        if self.fragment_type == self.DETACHED:
+            # all detached fragments are kept in a single small tree, since
+            # creating new tree for each fragment would have considerable
+            # memory overhead
+            fragment_root = self._fragment_roots.get(inherit_ns)
+            if fragment_root is None:
+                fragment_root = etree.Element('fragments')
+                self._fragment_roots[inherit_ns] = fragment_root
+            fragment = copy.deepcopy(html_node)
+            fragment_root.append(fragment)
+            return fragment
+        elif self.fragment_type == self.SERIALIZED:
+            # tail text is not part of the serialized element (it would make
+            # the serialized string invalid xml), so it's stored separately,
+            # and the element is detached from it's html tree first (see
+            # _set_content() for the reason)
+            content_b = etree.tostring(
+                copy.deepcopy(html_node), encoding='utf-8', with_tail=False)
+            return content_b, html_node.tail, inherit_ns
+        return html_node
+
+    def _load_fragment(self, fragment):
+        """
+        Get html element from stored fragment, so that it can be included
+        into xml tree of the document (without changing the stored fragment,
+        unless ``element`` fragment type is used).
+        """
+        if self.fragment_type == self.DETACHED:
+            html_node = copy.deepcopy(fragment)
+            inherit_ns = fragment.getparent() is self._fragment_roots.get(True)
+        elif self.fragment_type == self.SERIALIZED:
+            content_b, tail, inherit_ns = fragment
+            html_node = etree.fromstring(content_b)
+            html_node.tail = tail
+        else:
+            return fragment
+        if not inherit_ns:
+            return html_node
+        # the copy declares it's namespaces on itself, while the original
+        # element inherited them from it's html tree, which changes how the
+        # namespaces are serialized when the element is moved into xml
+        # export tree (default namespace vs html prefix), so we move the
+        # declarations into a parent element to get the same result
+        parent = self._move_to_document(
+            html_node, self._doctype, html_node.nsmap)
+        etree.cleanup_namespaces(parent)
+        return html_node
+
+    @staticmethod
+    def _move_to_document(html_node, doctype, nsmap=None):
+        """
+        Move given html element into a new document with given doctype, as
+        the only child of a parent element with given namespaces. Returns
+        the parent element.
+        """
+        root = etree.fromstring((doctype or "") + '<fragments/>')
+        parent = etree.SubElement(root, 'fragment', nsmap=nsmap)
+        parent.append(html_node)
+        return parent
+
+    def add_section(self, section, content):
+        """
+        Add html element with content of given section.
+        """
+        super(XmlExportTestCaseDoc, self).add_section(
+            section, self._store_fragment(content))
+
+    def add_test_action(self, action_name, content, action_id):
+        """
+        Add html element with content of some test step or result.
+        """
+        super(XmlExportTestCaseDoc, self).add_test_action(
+            action_name, self._store_fragment(content), action_id)
+
+    def _set_content(self, xml_node, fragment):
+        html_node = self._load_fragment(fragment)
         if self.content_type == self.MIXEDCONTENT:
             xml_node.append(html_node)
         elif self.content_type == self.CDATA:
+            # element of detached or serialized fragment, which doesn't
+            # inherit namespaces of a parent, is serialized as the only
+            # element of a document with the doctype of the original html
+            # document (see _load_fragment()), so that it's serialized in the
+            # same way as an element of the original html document, because
+            # some libxml2 versions serialize following siblings of elements
+            # of xhtml documents as well
+            if self.fragment_type != self.ELEMENT and \
+               html_node.getparent() is None:
+                self._move_to_document(html_node, self._doctype)
             # HACK: drop all namespaces
             # based on https://stackoverflow.com/questions/30232031/
             query = "descendant-or-self::*[namespace-uri()!='']"
@@ -470,6 +630,69 @@ class XmlExportTestCaseDoc(TestCaseDocWithContent):
         """
         self.metadata[attr_name] = content
 
+    def fingerprint(self):
+        """
+        Compute fingerprint (sha256 hex digest) of the test case, which covers
+        it's id, title, metadata, sections and test actions.
+
+        The fingerprint is stable: it doesn't depend on order in which content
+        was added into the document, on fragment type, nor on whitespace
+        only text nodes (such as those added by pretty printing of xml or
+        html). Note that for ``element`` fragment type, the fingerprint needs
+        to be computed before ``build_element_tree()`` is called, which may
+        change the html fragments.
+        """
+        digest = hashlib.sha256()
+
+        def update(*values):
+            # each value is length prefixed, so that the encoding of list of
+            # values is unambiguous
+            for value in values:
+                if value is None:
+                    digest.update(b"-")
+                    continue
+                value_b = u"{0}".format(value).encode('utf-8')
+                digest.update(u"{0}:".format(len(value_b)).encode('ascii'))
+                digest.update(value_b)
+
+        def update_element(element):
+            if callable(element.tag):
+                # ignore comments and processing instructions
+                return
+            update("<", element.tag)
+            for name, value in sorted(element.attrib.items()):
+                update("@", name, value)
+            update("t", self._normalize_text(element.text))
+            for child in element:
+                update_element(child)
+                update("/", self._normalize_text(child.tail))
+            update(">")
+
+        update("id", self.id, "title", self.title)
+        for name, content in sorted(self.metadata.items()):
+            update("meta", name, content)
+        for section, fragment in sorted(self._section_dict.items()):
+            update("section", section.title)
+            update_element(self._load_fragment(fragment))
+        for action_id, step, result in self._test_actions:
+            update("action", action_id)
+            for fragment in (step, result):
+                if fragment is None:
+                    update(None)
+                else:
+                    update_element(self._load_fragment(fragment))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _normalize_text(text):
+        """
+        Normalize text (or tail) of an element for computing of fingerprint,
+        so that whitespace only text is the same as no text at all.
+        """
+        if text is None or len(text.strip()) == 0:
+            return None
+        return text
+
     def build_element_tree(self):
         """
         Generate element tree representation of xml document.
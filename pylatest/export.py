@@ -22,9 +22,14 @@ docutils rendered html representation of all sections of a test case document.
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import hashlib
+import io
+import json
+
 from lxml import etree
 
 from pylatest.document import XmlExportTestCaseDoc
+from pylatest.utils import write_atomic
 
 
 # xml namespaces
@@ -105,18 +110,28 @@ def get_title(tree):
     return el_list[0].text
 
 
-def build_xml_testcase_doc(html_source, content_type=None, testcase_id=None):
+def build_xml_testcase_doc(
+        html_source,
+        content_type=None,
+        testcase_id=None,
+        fragment_type=None):
     """
     Create xml export document (instance of XmlExportTestCaseDoc) for given
     test case html source string.
+
+    Use ``detached`` or ``serialized`` fragment type (see
+    ``XmlExportTestCaseDoc.FRAGMENT_TYPES``) when the document is going to be
+    kept in memory for a longer time, so that the html tree parsed from the
+    source string doesn't stay alive with it.
     """
     # return empty doc for empty input string
     if len(html_source) == 0:
-        return XmlExportTestCaseDoc()
+        return XmlExportTestCaseDoc(fragment_type=fragment_type)
 
     html_tree = etree.fromstring(html_source.encode("utf8"))
     title = get_title(html_tree)
-    doc = XmlExportTestCaseDoc(title, content_type, testcase_id)
+    doc = XmlExportTestCaseDoc(
+        title, content_type, testcase_id, fragment_type=fragment_type)
 
     # extract metadata from html_tree
     for attr_name, content in get_metadata(html_tree):
@@ -172,3 +187,169 @@ def build_xml_export_doc(
     for tc in testcases:
         xml_tree.append(tc)
     return xml_tree
+
+
+def load_xml_schema(filename):
+    """
+    Load and compile XML Schema from given file, so that it could be used to
+    validate many xml export documents.
+    """
+    with open(filename, "rb") as schema_file:
+        schema_doc = etree.parse(schema_file)
+    return etree.XMLSchema(schema_doc)
+
+
+def validate_xml_export_doc(schema, xml_tree):
+    """
+    Validate xml export document (element tree) using given compiled XML
+    Schema. Returns list of error messages (empty when the document is valid).
+    """
+    if schema.validate(xml_tree):
+        return []
+    return [
+        "{0}: {1}".format(error.path, error.message)
+        for error in schema.error_log]
+
+
+def get_config_fingerprint(config_dict):
+    """
+    Compute fingerprint (sha256 hex digest) of given dict with configuration
+    of xml export, which can't contain anything but json serializable values.
+    """
+    content = json.dumps(config_dict, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ExportManifest(object):
+    """
+    Manifest of xml export build, with fingerprints of all exported test cases
+    (see ``XmlExportTestCaseDoc.fingerprint()``) and fingerprint of export
+    configuration, which makes it possible to find test cases which changed
+    since previous build.
+    """
+
+    VERSION = 1
+
+    ADDED = "added"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    REMOVED = "removed"
+
+    def __init__(self, config_fingerprint=None):
+        self.config_fingerprint = config_fingerprint
+        # docname -> dict with testcase id and fingerprint
+        self.testcases = {}
+
+    def __len__(self):
+        return len(self.testcases)
+
+    def add(self, docname, testcase_id, fingerprint):
+        """
+        Add test case of given document into the manifest.
+        """
+        self.testcases[docname] = {
+            'id': testcase_id,
+            'fingerprint': fingerprint,
+            }
+
+    def get_status(self, docname, previous):
+        """
+        Return status of test case of given document compared to previous
+        manifest (which can be None when there is no previous manifest).
+        """
+        if previous is None or docname not in previous.testcases:
+            return self.ADDED
+        if previous.config_fingerprint != self.config_fingerprint:
+            # all test cases are exported again when configuration changes
+            return self.CHANGED
+        if previous.testcases[docname] != self.testcases[docname]:
+            return self.CHANGED
+        return self.UNCHANGED
+
+    def compare(self, previous):
+        """
+        Compare this manifest with previous one (or None), returning dict with
+        lists of added, changed and removed test cases (each one represented
+        by a dict with docname and testcase id) and number of unchanged ones.
+        """
+        delta = {
+            self.ADDED: [],
+            self.CHANGED: [],
+            self.REMOVED: [],
+            self.UNCHANGED: 0,
+            }
+        for docname in sorted(self.testcases):
+            status = self.get_status(docname, previous)
+            if status == self.UNCHANGED:
+                delta[status] += 1
+                continue
+            delta[status].append({
+                'docname': docname,
+                'id': self.testcases[docname]['id'],
+                })
+        if previous is not None:
+            for docname in sorted(previous.testcases):
+                if docname in self.testcases:
+                    continue
+                delta[self.REMOVED].append({
+                    'docname': docname,
+                    'id': previous.testcases[docname]['id'],
+                    })
+        return delta
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load manifest from given json file. Returns None when the file
+        doesn't exist or can't be used.
+        """
+        try:
+            with io.open(filename, encoding='utf-8') as manifest_file:
+                data = json.load(manifest_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != cls.VERSION:
+            return None
+        manifest = cls(data.get('config'))
+        manifest.testcases = data.get('testcases', {})
+        return manifest
+
+    def save(self, filename):
+        """
+        Write manifest into given json file (atomically, so that the previous
+        manifest is never lost by an interrupted build).
+        """
+        data = {
+            'version': self.VERSION,
+            'config': self.config_fingerprint,
+            'testcases': self.testcases,
+            }
+        content = json.dumps(data, indent=2, sort_keys=True)
+        write_atomic(filename, content.encode('utf-8'))
+
+
+def pack_shards(sizes, max_count=0, max_bytes=0, base_size=0):
+    """
+    Split a list of items with given sizes (in given order) into shards of
+    consecutive items, so that each shard has at most max_count items and
+    total size (base_size plus sizes of its items) of at most max_bytes,
+    where zero means no limit. An item which doesn't fit into max_bytes on
+    its own gets a shard of its own.
+
+    Returns list of (start, end) index ranges of the shards.
+    """
+    shards = []
+    start = 0
+    shard_size = base_size
+    for i, size in enumerate(sizes):
+        is_full = max_count > 0 and i - start >= max_count
+        if max_bytes > 0 and shard_size + size > max_bytes:
+            is_full = True
+        if is_full and i > start:
+            shards.append((start, i))
+            start = i
+            shard_size = base_size
+        shard_size += size
+    if start < len(sizes):
+        shards.append((start, len(sizes)))
+    return shards
@@ -3,6 +3,12 @@
 """
 Commandline script module for pylatest docutils clients.
 
+Besides the usual docutils front-end interface (processing of one input file
+into one output file), html clients can render many input files into an
+output directory in one run, see ``batch_publish()`` function, and html and
+preview clients can watch input file and render it again after each change,
+see ``watch_publish()`` and ``watch_preview()`` functions.
+
 See: https://docutils.readthedocs.io/en/sphinx-docs/api/cmdline-tool.html
 """
 
@@ -22,21 +28,277 @@ See: https://docutils.readthedocs.io/en/sphinx-docs/api/cmdline-tool.html
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+from __future__ import print_function
+import argparse
+import errno
+import multiprocessing
 import os
+import subprocess
+import sys
+import time
+
+from docutils.utils import SystemMessage
 
+from pylatest.utils import write_atomic
+from pylatest.watch import watch
+from pylatest.xdocutils.core import PylatestPublisher
 from pylatest.xdocutils.core import pylatest_publish_cmdline
 
 
+# file extensions of output files for docutils writers supported in batch mode
+OUTPUT_EXTENSIONS = {
+    'html': '.html',
+    }
+
+# publisher of a worker process (or of the main process when no worker pool
+# is used), see _init_worker() function
+_publisher = None
+
+
+def _init_worker(writer_name, use_plain):
+    """
+    Initialize worker process for batch mode, so that docutils publisher is
+    created and set up just once in each worker process.
+    """
+    global _publisher
+    _publisher = PylatestPublisher(
+        writer_name=writer_name, use_plain=use_plain)
+
+
+def _render_file(task):
+    """
+    Render single input file into output file. Returns tuple with path of the
+    input file and error message (None when the file was rendered).
+    """
+    src_path, dst_path = task
+    try:
+        with open(src_path, 'rb') as src_file:
+            rst_source = src_file.read()
+        output = _publisher.publish_string(rst_source, source_path=src_path)
+        try:
+            os.makedirs(os.path.dirname(dst_path))
+        except OSError as ex:
+            if ex.errno != errno.EEXIST:
+                raise
+        with open(dst_path, 'wb') as dst_file:
+            dst_file.write(output)
+    except SystemMessage as ex:
+        # severe docutils error (eg. broken include directive) affects this
+        # file only
+        return src_path, str(ex)
+    except Exception as ex:
+        return src_path, str(ex)
+    return src_path, None
+
+
+def get_common_dir(paths):
+    """
+    Return absolute path of the longest common directory of given files.
+    """
+    dir_lists = [
+        os.path.dirname(os.path.abspath(path)).split(os.sep) for path in paths]
+    common = dir_lists[0]
+    for dir_list in dir_lists[1:]:
+        for i, (a, b) in enumerate(zip(common, dir_list)):
+            if a != b:
+                common = common[:i]
+                break
+        else:
+            common = common[:min(len(common), len(dir_list))]
+    return os.sep.join(common) or os.sep
+
+
+def get_output_path(src_path, src_dir, output_dir, writer_name):
+    """
+    Return path of output file for given input file, so that directory
+    structure of input files (relative to src_dir) is mirrored in output_dir.
+    """
+    rel_path = os.path.relpath(os.path.abspath(src_path), src_dir)
+    filename = os.path.splitext(rel_path)[0] + OUTPUT_EXTENSIONS[writer_name]
+    return os.path.join(output_dir, filename)
+
+
+def is_uptodate(src_path, dst_path):
+    """
+    Check if the output file exists and is newer than the input file.
+    """
+    try:
+        return os.path.getmtime(dst_path) >= os.path.getmtime(src_path)
+    except OSError:
+        return False
+
+
+def batch_publish(argv=None, writer_name='html', use_plain=False):
+    """
+    Render many input rst files into output directory (mirroring directory
+    structure of input files) in a single run, using pool of worker processes.
+    Input files with output newer than the input file are skipped.
+    """
+    parser = argparse.ArgumentParser(
+        description="Render pylatest rst files into {0} files.".format(
+            writer_name))
+    parser.add_argument(
+        "--output-dir", action="store", required=True,
+        help="path of directory where output files will be created")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=multiprocessing.cpu_count(),
+        help="number of worker processes (default: number of cpus)")
+    parser.add_argument(
+        "-f", "--force", action="store_true", default=False,
+        help="render all input files, even when output is up to date")
+    parser.add_argument(
+        "sources", nargs="+", metavar="source",
+        help="path of input rst file")
+    args = parser.parse_args(argv)
+
+    src_dir = get_common_dir(args.sources)
+    tasks = []
+    skipped = 0
+    for src_path in args.sources:
+        dst_path = get_output_path(
+            src_path, src_dir, args.output_dir, writer_name)
+        if not args.force and is_uptodate(src_path, dst_path):
+            skipped += 1
+            continue
+        tasks.append((src_path, dst_path))
+
+    if args.jobs > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(
+            min(args.jobs, len(tasks)),
+            initializer=_init_worker,
+            initargs=(writer_name, use_plain))
+        try:
+            results = pool.map(_render_file, tasks, chunksize=8)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _init_worker(writer_name, use_plain)
+        results = [_render_file(task) for task in tasks]
+
+    failed = 0
+    for src_path, error in results:
+        if error is not None:
+            failed += 1
+            print("Error: {0}: {1}".format(src_path, error), file=sys.stderr)
+    msg = "{0} rendered, {1} up to date, {2} failed".format(
+        len(tasks) - failed, skipped, failed)
+    print(msg, file=sys.stderr)
+    return 1 if failed > 0 else 0
+
+
+def watch_publish(argv=None, writer_name='html', use_plain=False):
+    """
+    Render input rst file into output file immediately and then each time
+    content of the input file changes, until interrupted by the user.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Render pylatest rst file into {0} file "
+            "each time it changes.").format(writer_name))
+    parser.add_argument(
+        "--watch", action="store_true", required=True,
+        help="watch the input file and render it after each change")
+    parser.add_argument("source", help="path of input rst file")
+    parser.add_argument("destination", help="path of output file")
+    args = parser.parse_args(argv)
+
+    publisher = PylatestPublisher(writer_name=writer_name, use_plain=use_plain)
+
+    def render(rst_source):
+        try:
+            output = publisher.publish_string(
+                rst_source, source_path=args.source)
+            write_atomic(args.destination, output)
+        except SystemMessage as ex:
+            # severe docutils error (eg. broken include directive while the
+            # file is edited) is reported, and the file is watched further
+            print("Error: {0}: {1}".format(args.source, ex), file=sys.stderr)
+            return
+        except Exception as ex:
+            print("Error: {0}: {1}".format(args.source, ex), file=sys.stderr)
+            return
+        msg = "[{0}] {1} rendered into {2}".format(
+            time.strftime("%H:%M:%S"), args.source, args.destination)
+        print(msg, file=sys.stderr)
+
+    watch(args.source, render)
+    return 0
+
+
+def watch_preview(argv=None):
+    """
+    Show man page representation of input rst file immediately and then each
+    time content of the input file changes, until interrupted by the user.
+    """
+    parser = argparse.ArgumentParser(
+        description="Preview pylatest rst file each time it changes.")
+    parser.add_argument(
+        "--watch", action="store_true", required=True,
+        help="watch the input file and show it again after each change")
+    parser.add_argument("source", help="path of input rst file")
+    args = parser.parse_args(argv)
+
+    publisher = PylatestPublisher(writer_name='manpage')
+
+    def render(rst_source):
+        try:
+            output = publisher.publish_string(
+                rst_source, source_path=args.source)
+        except SystemMessage as ex:
+            # see watch_publish() above
+            print("Error: {0}: {1}".format(args.source, ex), file=sys.stderr)
+            return
+        except Exception as ex:
+            print("Error: {0}: {1}".format(args.source, ex), file=sys.stderr)
+            return
+        # clear the terminal screen and show formatted man page without pager
+        sys.stdout.write("\033[H\033[2J")
+        sys.stdout.flush()
+        man = subprocess.Popen(
+            ['/usr/bin/man', "-P", "cat", "-l", "-"], stdin=subprocess.PIPE)
+        man.communicate(output)
+
+    watch(args.source, render)
+    return 0
+
+
+def is_watch_mode(argv):
+    """
+    Check if watch mode is requested in given command line arguments.
+    """
+    return "--watch" in argv
+
+
+def is_batch_mode(argv):
+    """
+    Check if batch mode (output directory instead of output file) is requested
+    in given command line arguments.
+    """
+    for arg in argv:
+        if arg == "--output-dir" or arg.startswith("--output-dir="):
+            return True
+    return False
+
+
 def pylatest2html():
     """
     Pylatest client which generates html output. It is similar to ``rst2html``,
     but it knows how to handle pylatest rst directives and doesn't produce
     embedded css code.
     """
+    if is_watch_mode(sys.argv[1:]):
+        return watch_publish(writer_name='html')
+    if is_batch_mode(sys.argv[1:]):
+        return batch_publish(writer_name='html')
     pylatest_publish_cmdline(writer_name='html')
 
 
 def pylatest2htmlplain():
+    if is_watch_mode(sys.argv[1:]):
+        return watch_publish(writer_name='html', use_plain=True)
+    if is_batch_mode(sys.argv[1:]):
+        return batch_publish(writer_name='html', use_plain=True)
     pylatest_publish_cmdline(writer_name='html', use_plain=True)
 
 
@@ -54,7 +316,12 @@ def pylatest_preview():
     Constructs a pipe which would look like this::
 
         pylatest-rst2man testcase.rst | man -l -
+
+    With ``--watch`` option, the preview is shown again after each change of
+    the input file instead.
     """
+    if is_watch_mode(sys.argv[1:]):
+        return watch_preview()
     r_fd, w_fd = os.pipe()
     pid = os.fork()
     if pid == 0:
@@ -27,7 +27,7 @@ import inspect
 import os
 import sys
 
-from pylatest.document import TestCaseDoc, RstTestCaseDoc, Section
+from pylatest.document import TestCaseDoc, RstTestCaseDoc
 from pylatest.rstsource import find_actions, find_sections
 from pylatest.xdocutils.core import register_all
 
@@ -168,7 +168,7 @@ class TestCaseDocFragments(object):
         # find pylatest document sections/directives in every fragment
         for lineno, doc_str in self.docstrings.items():
             doc_str_lines = doc_str.splitlines()
-            for rst_act in find_actions(doc_str):
+            for rst_act in find_actions(doc_str, fast=True):
                 content = extract_content(
                     doc_str_lines, rst_act.start_line, rst_act.end_line)
                 doc.add_test_action(
@@ -176,11 +176,11 @@ class TestCaseDocFragments(object):
                     content,
                     rst_act.action_id,
                     lineno)
-            for rst_sct in find_sections(doc_str):
+            for rst_sct in find_sections(doc_str, fast=True):
                 if rst_sct.title is None:
                     section = TestCaseDoc._HEAD
                 else:
-                    section = Section(rst_sct.title)
+                    section = TestCaseDoc.find_section(rst_sct.title)
                 content = extract_content(
                     doc_str_lines, rst_sct.start_line, rst_sct.end_line)
                 doc.add_section(section, content, lineno)
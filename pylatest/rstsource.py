@@ -20,9 +20,14 @@ Helper functions for processing of rst source text strings.
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
-from docutils.core import publish_doctree
+import re
+import time
+import unicodedata
+
 from docutils import nodes
+from docutils.readers import standalone
 
+from pylatest.xdocutils.core import PylatestPublisher
 from pylatest.xdocutils.nodes import test_action_node
 
 
@@ -35,7 +40,33 @@ def _debug(nodetree):
         print("{}\t{}".format(node.line, node.tagname))
 
 
+# publisher for parsing of rst sources, created when it's needed for the 1st
+# time (see publish_doctree() function below)
+_doctree_publisher = None
+
+
+def publish_doctree(rst_source):
+    """
+    Parse given rst source string and return it's docutils node tree.
+
+    Standard docutils reader is used, without any pylatest transforms, so that
+    the node tree contains unmodified test action nodes.
+    """
+    global _doctree_publisher
+    if _doctree_publisher is None:
+        _doctree_publisher = PylatestPublisher(
+            writer_name='null',
+            reader=standalone.Reader(),
+            settings_overrides={})
+    return _doctree_publisher.publish_doctree(rst_source)
+
+
 class RstSection(object):
+    """
+    Location of a section in rst source text.
+    """
+
+    __slots__ = ('title', 'start_line', 'end_line')
 
     def __init__(self, title, start_line, end_line=None):
         self.title = title
@@ -53,6 +84,11 @@ class RstSection(object):
 
 
 class RstTestAction(object):
+    """
+    Location of a test action directive in rst source text.
+    """
+
+    __slots__ = ('action_id', 'action_name', 'start_line', 'end_line')
 
     def __init__(self, action_id, action_name, start_line, end_line=None):
         self.action_id = action_id
@@ -88,12 +124,19 @@ def get_last_line_num(str_value):
     return last_line
 
 
-def find_sections(rst_source):
+def find_sections(rst_source, fast=False):
     """
     Finds all top level sections in given rst document.
+
+    When fast is True, lexical scanner is tried first (see scan_sections()
+    function) and the document is parsed only when the scanner gives up.
     """
+    if fast:
+        sections = scan_sections(rst_source)
+        if sections is not None:
+            return sections
     # parse rst_source string to get rst node tree
-    nodetree = publish_doctree(source=rst_source)
+    nodetree = publish_doctree(rst_source)
     # shortcut: immediatelly return for empty doc (so that we can assume
     # nonempty nodetree later)
     if len(rst_source) == 0 or len(nodetree) == 0:
@@ -139,9 +182,53 @@ def find_sections(rst_source):
     return sections
 
 
-def find_actions(rst_source):
+def _build_next_siblings(nodetree):
+    """
+    Return dict which maps id of each node of given node tree to it's next
+    sibling node (nodes without next sibling are not included).
+
+    Using this map instead of ``node.traverse(siblings=True)`` (which lists
+    all following nodes and locates position of the node in it's parent via
+    linear search) keeps processing of large documents linear.
+    """
+    next_siblings = {}
+    for node in nodetree.traverse(nodes.Element):
+        children = node.children
+        for i in range(len(children) - 1):
+            next_siblings[id(children[i])] = children[i + 1]
+    return next_siblings
+
+
+def _find_following_node(node, next_siblings):
+    """
+    Return the first node following given node in the document, which is not
+    it's descendant, or None when there is no such node.
+
+    This is the same node as the 1st node returned by ``node.traverse(
+    include_self=False, descend=False, ascend=True)``.
+    """
+    while node is not None:
+        next_node = next_siblings.get(id(node))
+        if next_node is not None:
+            return next_node
+        node = node.parent
+    return None
+
+
+def find_actions(rst_source, fast=False):
+    """
+    Finds all test actions in given rst document.
+
+    When fast is True, lexical scanner is tried first (see scan_actions()
+    function) and the document is parsed only when the scanner gives up.
+    """
+    if fast:
+        actions = scan_actions(rst_source)
+        if actions is not None:
+            return actions
     # parse rst_source string to get rst node tree
-    nodetree = publish_doctree(source=rst_source)
+    nodetree = publish_doctree(rst_source)
+    next_siblings = _build_next_siblings(nodetree)
 
     actions = []
     for node in nodetree.traverse(test_action_node):
@@ -163,13 +250,8 @@ def find_actions(rst_source):
         # to get end line of a content of the directive node, we have to do
         # another hack (docutils node objects doesn't contain any information
         # about end line ) - we use next sibling node as a hint
-        next_siblings = node.traverse(
-            include_self=False,
-            descend=False,
-            siblings=True,
-            )
-        if len(next_siblings) > 0:
-            next_node = next_siblings[0]
+        next_node = next_siblings.get(id(node))
+        if next_node is not None:
             if next_node.tagname == "test_action_node":
                 end_line = next_node.children[0].line - 4
             elif next_node.tagname == "section":
@@ -180,13 +262,8 @@ def find_actions(rst_source):
             # when there are no next sibling nodes (this is the last directive
             # node in given subtree), we need to get to go up in the node tree
             # to get to the next node
-            following_nodes = node.traverse(
-                include_self=False,
-                descend=False,
-                ascend=True,
-                siblings=False,
-                )
-            if len(following_nodes) > 0:
+            next_node = _find_following_node(node, next_siblings)
+            if next_node is not None:
                 # there are other nodes in the document tree after this node,
                 # but on the higher level, see this example:
                 #
@@ -199,7 +276,6 @@ def find_actions(rst_source):
                 #             And that's all!
                 # <paragraph>
                 #     There is some other text after the directive.
-                next_node = following_nodes[0]
                 # type of next node needs to be considered to give corrent
                 # end line number
                 if next_node.tagname == "section":
@@ -214,3 +290,478 @@ def find_actions(rst_source):
         action = RstTestAction(action_id, action_name, start_line, end_line)
         actions.append(action)
     return actions
+
+
+#
+# Lexical scanner
+#
+# Functions below find sections and test actions in rst source without
+# running docutils parser, by looking at lines of the source only. This is
+# much faster, but it's possible only for simple documents: the scanner
+# recognizes section titles, field lists and pylatest test action directives
+# placed directly in the document body (not nested in other constructs), and
+# gives up (returning None) when it finds anything it can't reliably
+# interpret in the same way as docutils would. Results of the scanner must be
+# the same as results of find_sections() and find_actions() functions.
+#
+
+# section title adornment line (any non alphanumeric 7bit ascii character)
+ADORNMENT_RE = re.compile(r'^([!-/:-@\[-`{-~])\1*$')
+# start of explicit markup block (comment, directive, target, ...)
+_EXPLICIT_RE = re.compile(r'^\.\.( |$)')
+# field list marker (simplified, names with markup are not recognized)
+FIELD_RE = re.compile(r'^:([^:\s\\`][^:\\`]*):( +(.*))?$')
+# line which could be interpreted as a start of enumerated list item
+_ENUMERATOR_RE = re.compile(r'^\(?[0-9A-Za-z#]+[.)]( |$)')
+# bullet or enumerated list item marker
+_LIST_MARKER_RE = re.compile(r'^([-*+]|\(?[0-9A-Za-z#]+[.)]) +')
+# test action directives in a form recognized by the scanner
+_OLD_ACTION_RE = re.compile(r'^\.\. (test_step|test_result):: +([0-9]+)$')
+_ACTION_RE = re.compile(r'^\.\. test_action::$')
+# any mention of test action directive
+_ANY_ACTION_RE = re.compile(r'test_(step|result|action) *::', re.IGNORECASE)
+# characters which could start inline markup in a section title
+_TITLE_MARKUP_CHARS = frozenset('`*_|\\')
+
+
+class RstBlock(object):
+    """
+    Block of lines of rst source starting in the 1st column, as found by
+    scan_blocks() function.
+    """
+
+    __slots__ = ('kind', 'line', 'data')
+
+    def __init__(self, kind, line, data=None):
+        # one of: title, action, paragraph, field, explicit, indented, other
+        self.kind = kind
+        # 0-based index of the 1st line of the block (of a title text for a
+        # section title)
+        self.line = line
+        # kind specific data: tuple (title text, adornment character, True
+        # for title with overline, title level) for a title, list of field
+        # names (lowercased) for a field list and list of action tuples (see
+        # _scan_action_block() function) for a test action
+        self.data = data
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+
+def column_width(text):
+    """
+    Return width of given text in columns (in the same way as docutils).
+    """
+    width = len(text)
+    for char in text:
+        if unicodedata.east_asian_width(char) in 'WF':
+            width += 1
+        elif unicodedata.combining(char):
+            width -= 1
+    return width
+
+
+def is_plain_text(text):
+    """
+    Check that given (stripped) line starts a paragraph of plain text.
+    """
+    return (
+        len(text) > 0 and
+        text[0].isalnum() and
+        _ENUMERATOR_RE.match(text) is None)
+
+
+def is_plain_title(text):
+    """
+    Check that given section title doesn't contain any inline markup, so that
+    it's text is the same as text of title node created by docutils.
+    """
+    return is_plain_text(text) and _TITLE_MARKUP_CHARS.isdisjoint(text)
+
+
+def split_lines(rst_source):
+    """
+    Split rst source into list of lines in the same way as docutils does, or
+    return None if the source contains characters which docutils would handle
+    in a special way.
+    """
+    for char in '\t\v\f\r':
+        if char in rst_source:
+            return None
+    lines = rst_source.splitlines()
+    # check that there are no other line separators than '\n'
+    if len(lines) != get_last_line_num(rst_source) and len(rst_source) > 0:
+        return None
+    return [line.rstrip() for line in lines]
+
+
+def _scan_action_block(lines, start, end):
+    """
+    Scan test action directive block and return list of tuples describing
+    action nodes created by the directive: action name, action id and 1-based
+    line number of the 1st paragraph of the action content. Returns None when
+    the block can't be reliably processed.
+    """
+    for line in lines[start + 1:end]:
+        # nested directives or unindented lines
+        if _ANY_ACTION_RE.search(line) or (line and _indent(line) == 0):
+            return None
+    content = [line for line in lines[start + 1:end] if line]
+    if len(content) == 0:
+        return None
+    base = min(_indent(line) for line in content)
+    match = _OLD_ACTION_RE.match(lines[start])
+    if match is not None:
+        # there have to be blank line between directive and it's content,
+        # otherwise the content would be considered as directive arguments
+        if lines[start + 1]:
+            return None
+        first = start + 1
+        while not lines[first]:
+            first += 1
+        if _indent(lines[first]) != base:
+            return None
+        if not _check_paragraph(lines, first, end, base):
+            return None
+        action_id = int(match.group(2))
+        return [(match.group(1), action_id, first + 1)]
+    # test_action directive: content has to be a field list
+    actions = []
+    num = start + 1
+    while num < end:
+        line = lines[num]
+        if not line:
+            num += 1
+            continue
+        field_match = FIELD_RE.match(line.strip())
+        if _indent(line) != base or field_match is None:
+            return None
+        name = field_match.group(1)
+        if not name.isalpha() or not name.islower():
+            return None
+        body_text = field_match.group(3)
+        # find end of the field body
+        body_end = num + 1
+        while body_end < end and \
+                (not lines[body_end] or _indent(lines[body_end]) > base):
+            # fields nested in the body would be considered as test actions
+            # by the directive as well
+            if FIELD_RE.match(lines[body_end].strip()):
+                return None
+            body_end += 1
+        body = [line for line in lines[num + 1:body_end] if line]
+        body_indent = min(_indent(line) for line in body) if body else None
+        if body_text:
+            # paragraph starts on the same line as field marker, the rest of
+            # the paragraph needs to have the same indentation as the rest of
+            # the field body
+            if not is_plain_text(body_text) or \
+               ADORNMENT_RE.match(body_text):
+                return None
+            para_line = num
+            cont = num + 1
+            while cont < body_end and lines[cont]:
+                if (_indent(lines[cont]) != body_indent or
+                        ADORNMENT_RE.match(lines[cont].strip())):
+                    return None
+                cont += 1
+        else:
+            # paragraph starts on the next line
+            para_line = num + 1
+            if para_line >= body_end or not lines[para_line] or \
+               _indent(lines[para_line]) != body_indent:
+                return None
+            if not _check_paragraph(lines, para_line, body_end, body_indent):
+                return None
+        num = body_end
+        actions.append(("test_" + name, None, para_line + 1))
+    if len(actions) == 0:
+        return None
+    return actions
+
+
+def _check_paragraph(lines, first, end, indent):
+    """
+    Check that lines starting on given line form a simple paragraph with
+    given indentation.
+    """
+    if not is_plain_text(lines[first].strip()):
+        return False
+    num = first
+    while num < end and lines[num]:
+        if (_indent(lines[num]) != indent or
+                ADORNMENT_RE.match(lines[num].strip())):
+            return False
+        num += 1
+    return True
+
+
+def _strip_markers(text):
+    """
+    Strip field list, bullet list and enumerated list markers from the
+    beginning of given (stripped) line.
+    """
+    while True:
+        field_match = FIELD_RE.match(text)
+        if field_match is not None:
+            text = field_match.group(3) or ""
+            continue
+        marker_match = _LIST_MARKER_RE.match(text)
+        if marker_match is not None:
+            text = text[marker_match.end():]
+            continue
+        return text
+
+
+def _is_literal(lines, num):
+    """
+    Check if given line is a part of indented literal block.
+    """
+    indent = _indent(lines[num])
+    while num > 0:
+        num -= 1
+        if lines[num] and _indent(lines[num]) < indent:
+            return lines[num].endswith("::")
+    return False
+
+
+def scan_blocks(lines):
+    """
+    Split lines of rst source into blocks starting in the 1st column and
+    return list of RstBlock objects, or None when the source contains anything
+    ambiguous.
+    """
+    blocks = []
+    num = 0
+    count = len(lines)
+    while num < count:
+        line = lines[num]
+        if not line:
+            num += 1
+            continue
+        next_line = lines[num + 1] if num + 1 < count else ""
+        # section title with overline
+        if _indent(line) == 0 and ADORNMENT_RE.match(line):
+            if _EXPLICIT_RE.match(line):
+                # a comment consisting of two dots only
+                pass
+            elif (num + 2 < count and
+                    next_line and
+                    not ADORNMENT_RE.match(next_line.strip()) and
+                    lines[num + 2] == line and
+                    (num + 3 == count or not lines[num + 3])):
+                title = next_line.strip()
+                if (not is_plain_title(title) or
+                        column_width(title) > len(line)):
+                    return None
+                blocks.append(
+                    RstBlock('title', num + 1, (title, line[0], True)))
+                num += 3
+                continue
+            else:
+                # transition or something else
+                return None
+        # section title without overline
+        if (next_line and
+                _indent(next_line) == 0 and
+                ADORNMENT_RE.match(next_line) and
+                not _EXPLICIT_RE.match(next_line)):
+            if (_indent(line) > 0 or
+                    not is_plain_title(line) or
+                    column_width(line) > len(next_line) or
+                    (num + 2 < count and lines[num + 2])):
+                return None
+            blocks.append(RstBlock('title', num, (line, next_line[0], False)))
+            num += 2
+            continue
+        # find end of the block: blank line followed by unindented line
+        end = num + 1
+        while end < count:
+            if not lines[end]:
+                nonblank = end
+                while nonblank < count and not lines[nonblank]:
+                    nonblank += 1
+                if nonblank == count or _indent(lines[nonblank]) == 0:
+                    break
+                end = nonblank
+            end += 1
+        for block_num in range(num, end):
+            block_line = lines[block_num]
+            text = _strip_markers(block_line.strip())
+            if text != block_line.strip() and ADORNMENT_RE.match(text):
+                # adornment line as a body of field or list item
+                return None
+            if (not ADORNMENT_RE.match(block_line.strip()) or
+                    _EXPLICIT_RE.match(block_line.strip())):
+                continue
+            # unindented adornment line is not a part of any valid section
+            # title here, while indented one could be interpreted as section
+            # title or transition nested in other construct, unless it's in
+            # a literal block
+            if not _is_literal(lines, block_num):
+                return None
+        if _OLD_ACTION_RE.match(line) or _ACTION_RE.match(line):
+            actions = _scan_action_block(lines, num, end)
+            if actions is None:
+                return None
+            blocks.append(RstBlock('action', num, actions))
+        elif any(_ANY_ACTION_RE.search(bl) for bl in lines[num:end]):
+            return None
+        elif _EXPLICIT_RE.match(line):
+            blocks.append(RstBlock('explicit', num))
+        elif line.startswith(':') and not FIELD_RE.match(line):
+            # field name with markup or other unusual characters
+            return None
+        elif FIELD_RE.match(line):
+            names = []
+            for block_line in lines[num:end]:
+                if block_line and _indent(block_line) == 0:
+                    field_match = FIELD_RE.match(block_line)
+                    if field_match is None:
+                        return None
+                    body_text = field_match.group(3)
+                    if body_text and not body_text[0].isalnum():
+                        return None
+                    names.append(field_match.group(1).lower())
+            blocks.append(RstBlock('field', num, names))
+        elif _indent(line) > 0:
+            blocks.append(RstBlock('indented', num))
+        elif is_plain_text(line) and \
+                (not next_line or _indent(next_line) == 0):
+            blocks.append(RstBlock('paragraph', num))
+        else:
+            blocks.append(RstBlock('other', num))
+        num = end
+    # check that title levels are consistent
+    styles = []
+    level = 0
+    for block in blocks:
+        if block.kind != 'title':
+            continue
+        style = block.data[1:]
+        if style in styles:
+            block_level = styles.index(style) + 1
+            if block_level > level + 1:
+                return None
+        elif len(styles) == level:
+            styles.append(style)
+            block_level = level + 1
+        else:
+            return None
+        level = block_level
+        block.data = block.data + (block_level,)
+    return blocks
+
+
+def scan_sections(rst_source):
+    """
+    Finds all top level sections in given rst document via lexical scanner,
+    without parsing the document. Returns None when the document contains
+    anything which the scanner can't handle, otherwise the result is the same
+    as result of ``find_sections()`` function.
+    """
+    lines = split_lines(rst_source)
+    if lines is None:
+        return None
+    blocks = scan_blocks(lines)
+    if blocks is None:
+        return None
+    if len(blocks) == 0:
+        return []
+    titles = [b for b in blocks if b.kind == 'title']
+    for block in blocks:
+        if block.kind == 'title':
+            break
+        if block.kind == 'explicit':
+            # comments and targets are ignored by docutils when it looks for
+            # document title
+            return None
+    # when there is just one top level section at the beginning of the
+    # document, docutils promotes it's title into document title
+    doc_title = None
+    contains_meta = False
+    if blocks[0].kind == 'title' and \
+       len([b for b in titles if b.data[3] == 1]) == 1:
+        doc_title = blocks[0].data[0]
+        top_titles = [b for b in titles if b.data[3] == 2]
+        next_block = blocks[1] if len(blocks) > 1 else None
+        if next_block is not None:
+            if next_block.kind == 'explicit':
+                return None
+            if next_block.kind == 'title' and len(top_titles) == 1:
+                # lone subsection would be promoted to document subtitle
+                return None
+            if next_block.kind == 'field':
+                # field list just after title is converted into docinfo
+                if 'abstract' in next_block.data or \
+                   'dedication' in next_block.data:
+                    return None
+                contains_meta = True
+    else:
+        top_titles = [b for b in titles if b.data[3] == 1]
+    last_line = get_last_line_num(rst_source)
+    sections = []
+    prev_section = None
+    for block in top_titles:
+        section = RstSection(block.data[0], block.line + 1)
+        sections.append(section)
+        if prev_section is not None:
+            prev_section.end_line = block.line - 1
+        prev_section = section
+    if prev_section is not None:
+        prev_section.end_line = last_line
+    if contains_meta:
+        if len(sections) == 0:
+            sections.append(RstSection(None, 1, last_line))
+        else:
+            sections.append(RstSection(None, 1, sections[0].start_line - 2))
+    if len(sections) == 0 and doc_title is not None and \
+       rst_source[0].isalpha():
+        sections.append(RstSection(doc_title, 1, last_line))
+    return sections
+
+
+def scan_actions(rst_source):
+    """
+    Finds all test actions in given rst document via lexical scanner, without
+    parsing the document. Returns None when the document contains anything
+    which the scanner can't handle, otherwise the result is the same as result
+    of ``find_actions()`` function.
+    """
+    lines = split_lines(rst_source)
+    if lines is None:
+        return None
+    blocks = scan_blocks(lines)
+    if blocks is None:
+        return None
+    # action id of test_action directive is generated in the same way as
+    # TestActionDirective does, see pylatest.xdocutils.directives
+    auto_id = int(time.time() * 1000000)
+    actions = []
+    for index, block in enumerate(blocks):
+        if block.kind != 'action':
+            continue
+        next_block = blocks[index + 1] if index + 1 < len(blocks) else None
+        if next_block is None:
+            last_end_line = get_last_line_num(rst_source)
+        elif next_block.kind == 'title':
+            last_end_line = next_block.line - 1
+        elif next_block.kind == 'action':
+            last_end_line = next_block.data[0][2] - 4
+        elif next_block.kind == 'paragraph':
+            last_end_line = next_block.line - 1
+        else:
+            return None
+        if block.data[0][1] is None:
+            auto_id += 1
+        for num, (action_name, action_id, para_line) in enumerate(block.data):
+            if action_id is None:
+                action_id = auto_id
+            if num + 1 < len(block.data):
+                end_line = block.data[num + 1][2] - 4
+            else:
+                end_line = last_end_line
+            actions.append(
+                RstTestAction(action_id, action_name, para_line - 2, end_line))
+    return actions
@@ -0,0 +1,68 @@
+# -*- coding: utf8 -*-
+
+"""
+Helper functions for writing of output files, shared by pylatest command
+line tools and sphinx builders.
+"""
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import hashlib
+import os
+import stat
+import tempfile
+
+
+def write_atomic(path, data, mode=0o644):
+    """
+    Write given data (bytes) into a file in an atomic way, so that other
+    processes (eg. web browser) never see partially written file. The file
+    is created with given permission bits.
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=dirname, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        # mkstemp() creates file readable by owner only
+        os.chmod(tmp_path, mode)
+        # os.replace() is not available in python 2, but os.rename() is
+        # atomic on unix there as well
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def has_same_content(path, data):
+    """
+    Check whether given file exists and contains given data (bytes). Size of
+    the file is compared first, so that the file is read only when the size
+    matches, and then sha256 hash of it's content is compared.
+    """
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size != len(data):
+        return False
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as data_file:
+        for chunk in iter(lambda: data_file.read(64 * 1024), b''):
+            file_hash.update(chunk)
+    return file_hash.digest() == hashlib.sha256(data).digest()
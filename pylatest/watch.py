@@ -0,0 +1,194 @@
+# -*- coding: utf8 -*-
+
+"""
+Watching of source files for changes, used by ``--watch`` mode of pylatest
+command line tools.
+
+On Linux, changes are detected via inotify (using ctypes, so that no
+additional dependency is required), on other systems or when inotify is not
+available, state of the file is polled periodically.
+"""
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import time
+
+
+# inotify constants, see inotify(7) and /usr/include/linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+# header of inotify event: wd, mask, cookie, len
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def content_hash(data):
+    """
+    Return hash of given content (bytes) of a file.
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+class PollingWatcher(object):
+    """
+    Detects changes of a file by checking it's state periodically.
+    """
+
+    def __init__(self, path, interval=0.5, debounce=0.2):
+        self.path = path
+        self.interval = interval
+        self.debounce = debounce
+        self._state = self._get_state()
+
+    def _get_state(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime, stat.st_size, stat.st_ino)
+
+    def wait(self):
+        """
+        Block until the file changes.
+        """
+        while True:
+            time.sleep(self.interval)
+            state = self._get_state()
+            if state != self._state:
+                break
+        # wait until the file stops changing
+        while True:
+            time.sleep(self.debounce)
+            new_state = self._get_state()
+            if new_state == state:
+                break
+            state = new_state
+        self._state = state
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(object):
+    """
+    Detects changes of a file via inotify.
+
+    Whole directory of the file is watched, because many editors don't
+    modify the file in place, but write a new file and rename it instead.
+    """
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, path, debounce=0.2):
+        self.path = path
+        self.debounce = debounce
+        self._name = os.path.basename(path).encode('utf-8')
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init'):
+            raise OSError("inotify is not available")
+        self._fd = libc.inotify_init()
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init() failed")
+        dirname = os.path.dirname(os.path.abspath(path)).encode('utf-8')
+        wd = libc.inotify_add_watch(self._fd, dirname, self.MASK)
+        if wd < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch() failed")
+
+    def _read_events(self, timeout):
+        """
+        Read available inotify events and return True if any of them is
+        related to the watched file. Returns False when no event arrives
+        within given timeout (None means to wait forever).
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        buf = os.read(self._fd, 64 * 1024)
+        offset = 0
+        matched = False
+        while offset < len(buf):
+            _, _, _, name_len = INOTIFY_EVENT.unpack_from(buf, offset)
+            offset += INOTIFY_EVENT.size
+            name = buf[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name == self._name:
+                matched = True
+        return matched
+
+    def wait(self):
+        """
+        Block until the file changes.
+        """
+        while not self._read_events(None):
+            pass
+        # wait until there are no more events for debounce period
+        while self._read_events(self.debounce):
+            pass
+
+    def close(self):
+        os.close(self._fd)
+
+
+def get_watcher(path):
+    """
+    Return watcher object for given file, using inotify when available.
+    """
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError):
+        return PollingWatcher(path)
+
+
+def watch(path, render, watcher=None):
+    """
+    Call render function with content (bytes) of given file immediately and
+    then each time the content changes, until the process is interrupted.
+    """
+    if watcher is None:
+        watcher = get_watcher(path)
+    last_hash = None
+    try:
+        while True:
+            try:
+                with open(path, 'rb') as src_file:
+                    data = src_file.read()
+            except (IOError, OSError):
+                # file could be missing for a moment during save
+                data = None
+            if data is not None:
+                data_hash = content_hash(data)
+                if data_hash != last_hash:
+                    last_hash = data_hash
+                    render(data)
+            watcher.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
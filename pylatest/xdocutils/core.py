@@ -3,7 +3,8 @@
 """
 Pylatest docutils core module.
 
-This module contains pylatest publisher convenience functions ``publish_*`` and
+This module contains pylatest publisher convenience functions ``publish_*``,
+reusable ``PylatestPublisher`` class for processing of many rst sources and
 functions to register custom pylatest directives and roles.
 
 Without these functions, docutils would not undersdand pylatest docutils
@@ -36,9 +37,14 @@ See related docutils documentation:
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import copy
+
 from docutils import core
+from docutils import io
 from docutils import nodes
+from docutils import writers
 from docutils.parsers import rst
+from docutils.writers import null
 from docutils.writers.html4css1 import HTMLTranslator
 
 from pylatest.xdocutils.directives import OldTestActionDirective
@@ -135,3 +141,120 @@ def pylatest_publish_parts(*args, **kwargs):
     register_all(use_plain)
     kwargs = wrapper(kwargs, use_plain)
     return core.publish_parts(*args, **kwargs)
+
+
+class PylatestPublisher(object):
+    """
+    Reusable pylatest publisher for processing of many rst sources.
+
+    Functions ``pylatest_publish_*`` (as well as ``publish_*`` functions from
+    ``docutils.core``) register pylatest extensions, create new reader, parser
+    and writer objects and process docutils settings (which includes creating
+    option parser and reading of docutils config files) during each call.
+    This is negligible when a single document is processed, but it dominates
+    processing time of small documents when many of them are processed.
+
+    This publisher does all this just once, when the publisher is created,
+    and then reuses it for each rst source. Only docutils settings are copied
+    for each source, because docutils stores some per document values there.
+
+    Example of usage::
+
+        publisher = PylatestPublisher(writer_name='html', use_plain=True)
+        for parts in publisher.render_many(rst_sources):
+            print(parts['body'])
+    """
+
+    def __init__(
+            self,
+            writer_name='html',
+            use_plain=False,
+            reader=None,
+            settings_overrides=None):
+        """
+        Create publisher for given docutils writer.
+
+        By default, reader is selected based on use_plain argument (the same
+        way as ``pylatest_publish_*`` functions do), but any docutils reader
+        object can be specified via reader argument. When settings_overrides
+        dict is not specified, ``HTML_OVERRIDES`` are used.
+        """
+        register_all(use_plain)
+        if reader is None:
+            reader = PlainReader() if use_plain else NoPlainReader()
+        if settings_overrides is None:
+            settings_overrides = HTML_OVERRIDES
+        self.reader = reader
+        self.parser = rst.Parser()
+        self.writer = writers.get_writer_class(writer_name)()
+        # writer used when only document tree is requested (see
+        # docutils.core.publish_doctree() function)
+        self._null_writer = null.Writer()
+        # build docutils settings, with option parser and config files
+        # processing, just once
+        # propagate exceptions (eg. severe system messages) to the caller
+        # instead of exiting, as docutils does when it's used programmatically
+        # (see process_programmatic_settings() in docutils.core)
+        defaults = dict(settings_overrides)
+        defaults.setdefault('traceback', True)
+        pub = core.Publisher(self.reader, self.parser, self.writer)
+        self.settings = pub.get_settings(**defaults)
+
+    def _publish(self, source, source_path, writer, destination_class):
+        """
+        Process given rst source using given writer and return docutils
+        publisher object with the results.
+        """
+        pub = core.Publisher(
+            self.reader,
+            self.parser,
+            writer,
+            source_class=io.StringInput,
+            destination_class=destination_class,
+            settings=copy.copy(self.settings))
+        pub.set_source(source, source_path)
+        pub.set_destination(None, None)
+        pub.publish(enable_exit_status=False)
+        return pub
+
+    def publish_parts(self, source, source_path=None):
+        """
+        Process given rst source and return dict with parts of the output
+        document, see ``docutils.core.publish_parts()``.
+        """
+        pub = self._publish(source, source_path, self.writer, io.StringOutput)
+        # writer object reuses the same dict for parts of each document
+        return dict(pub.writer.parts)
+
+    def publish_string(self, source, source_path=None):
+        """
+        Process given rst source and return the output document, encoded
+        according to ``output_encoding`` setting (so that unless the encoding
+        is set to ``unicode``, bytes are returned on python 3), see
+        ``docutils.core.publish_string()``.
+        """
+        pub = self._publish(source, source_path, self.writer, io.StringOutput)
+        return pub.destination.destination
+
+    def publish_doctree(self, source, source_path=None):
+        """
+        Process given rst source and return it's document tree (writer is not
+        used at all), see ``docutils.core.publish_doctree()``.
+        """
+        pub = self._publish(
+            source, source_path, self._null_writer, io.NullOutput)
+        return pub.document
+
+    def render_many(self, sources):
+        """
+        Process given rst sources (an iterable of rst strings, or tuples with
+        rst string and it's source path) and return list of dicts with parts
+        of the output documents, in the same order.
+        """
+        results = []
+        for source in sources:
+            if isinstance(source, tuple):
+                results.append(self.publish_parts(*source))
+            else:
+                results.append(self.publish_parts(source))
+        return results
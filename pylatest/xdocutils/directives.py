@@ -186,9 +186,23 @@ class RequirementListDirective(rst.Directive):
 
     See pylatest_resolve_requirements handler (and RequiremenIndexingTransform
     transform class) for actuall code which generates the list.
+
+    The list can be limited to requirements with given key prefix and/or
+    matching given glob pattern, and split into pages with given number of
+    requirements per page.
     """
 
+    option_spec = {
+        'prefix': rst.directives.unchanged_required,
+        'pattern': rst.directives.unchanged_required,
+        'per-page': rst.directives.positive_int,
+        }
+
     def run(self):
         # just return a placeholder node which will be replaced by actual
         # content later
-        return [pylatest.xdocutils.nodes.requirementlist_node()]
+        node = pylatest.xdocutils.nodes.requirementlist_node()
+        node['prefix'] = self.options.get('prefix')
+        node['pattern'] = self.options.get('pattern')
+        node['per_page'] = self.options.get('per-page')
+        return [node]
@@ -27,6 +27,7 @@ from docutils import nodes
 from docutils import transforms
 
 from pylatest.xdocutils.nodes import test_action_node
+from pylatest.xdocutils.utils import get_requirement_key
 from pylatest.xdocutils.utils import get_testcase_requirements
 import pylatest.document
 
@@ -206,10 +207,7 @@ class RequiremenIndexingTransform(transforms.Transform):
         for req_node in requirements:
             # enforce req_node (rst node) identity based on sheer url for
             # references or plain text representation for other rst nodes
-            if req_node.tagname == "reference":
-                req_key = req_node['refuri']
-            else:
-                req_key = req_node.astext()
+            req_key = get_requirement_key(req_node)
             # create new empty entry for current requirement (req_node) in
             # env.pylatest_requirements dict if there is no such entry so far
             env.pylatest_requirements.setdefault(req_key, (req_node, set()))
@@ -169,3 +169,14 @@ def get_testcase_requirements(doctree):
                     item = item[0]
                 requirements.append(item)
     return requirements
+
+
+def get_requirement_key(req_node):
+    """
+    Get key which identifies given requirement node (as returned by
+    ``get_testcase_requirements()``), which is url for references or plain
+    text representation for other rst nodes.
+    """
+    if req_node.tagname == "reference":
+        return req_node['refuri']
+    return req_node.astext()
@@ -45,26 +45,214 @@
 #    OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+from collections import OrderedDict
 from os import path
 import codecs
-import logging
+import csv
+import errno
+import gzip
+import hashlib
+import io
+import json
+from multiprocessing.pool import ThreadPool
+import multiprocessing
+import os
+import sys
+import threading
+from xml.sax.saxutils import escape
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import docutils.nodes
 from docutils.io import StringOutput
 from docutils.frontend import OptionParser
 from lxml import etree
 from sphinx.builders import Builder
+from sphinx.errors import ConfigError
+from sphinx.util import logging
 from sphinx.util.osutil import ensuredir, os_path
 from sphinx.writers.html import HTMLWriter, HTMLTranslator
 from sphinx.highlighting import PygmentsBridge
 
+from pylatest.document import TestActions, TestCaseDoc
 from pylatest.xdocutils.nodes import test_action_node
+from pylatest.xdocutils.utils import get_field_list
+from pylatest.xdocutils.utils import get_requirement_key
 from pylatest.xdocutils.utils import get_testcase_id
+from pylatest.xdocutils.utils import get_testcase_requirements
 from pylatest.export import build_xml_testcase_doc, build_xml_export_doc
+from pylatest.export import load_xml_schema, validate_xml_export_doc
+from pylatest.export import ExportManifest, get_config_fingerprint
+from pylatest.export import pack_shards
+from pylatest.utils import has_same_content, write_atomic
+from pylatest.xsphinx.profiling import PhaseTimer, NullPhaseTimer
 
 
 logger = logging.getLogger(__name__)
 
 
+def is_testcase_doctree(doctree):
+    """
+    Check if given doctree is a test case document.
+    """
+    # hack: test case is a document with some test actions
+    for node in doctree.traverse(test_action_node):
+        return True
+    return False
+
+
+def get_testcase_lookup(doctree, docname, lookup_method):
+    """
+    Get test case id of given document and lookup method which should be
+    used to find the test case based on the id, with respect to given value
+    of ``pylatest_export_lookup_method`` option.
+
+    Note that the id field is removed from field list of the doctree.
+    """
+    # set test case id based on selected lookup method
+    if lookup_method == "custom":
+        return "/" + docname, 'custom'
+    elif lookup_method == "id":
+        # get test case id from a field list
+        # if the id can't be found there, testcase id attribute is omitted
+        return get_testcase_id(doctree), 'id'
+    elif lookup_method == "id,custom":
+        # custom lookup method is used, unless explicit id is specified
+        # in the rst file
+        testcase_id = get_testcase_id(doctree)
+        if testcase_id is None:
+            return "/" + docname, 'custom'
+        return testcase_id, 'id'
+    else:
+        # TODO: report the error in a better way?
+        msg = "pylatest_export_lookup_method value is invalid"
+        raise Exception(msg)
+
+
+def _freeze(value):
+    """
+    Convert given argument of highlight_block() into hashable value.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class CachingPygmentsBridge(PygmentsBridge):
+    """
+    Sphinx highlighter which remembers highlighted output of the most
+    recently used code blocks, so that the same code snippet (repeated in
+    many test cases) is highlighted by pygments just once.
+
+    The cache is bounded (least recently used code blocks are dropped when
+    more than ``cache_size`` items is cached) and can be shared by many
+    threads. When ``highlight`` is False, code blocks are not highlighted at
+    all and plain ``<pre>`` elements are produced instead.
+
+    Note that pygments warnings (eg. about unknown lexer) are reported for
+    the first occurrence of given code block only.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.cache_size = kwargs.pop('cache_size', 1024)
+        self.highlight = kwargs.pop('highlight', True)
+        PygmentsBridge.__init__(self, *args, **kwargs)
+        # highlighted code blocks, key -> output (in order of usage)
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def highlight_block(self, source, lang, *args, **kwargs):
+        if not self.highlight:
+            # PygmentsBridge.unhighlighted() is not available in newer sphinx
+            # releases, so that plain html is created here directly
+            return '<pre>' + escape(source) + '</pre>\n'
+        if self.cache_size <= 0:
+            return PygmentsBridge.highlight_block(
+                self, source, lang, *args, **kwargs)
+        # location (docname and line) is used for warnings only
+        key_kwargs = dict(kwargs)
+        key_kwargs.pop('location', None)
+        key = (source, lang, _freeze(args), _freeze(key_kwargs))
+        with self.cache_lock:
+            hlsource = self.cache.pop(key, None)
+            if hlsource is not None:
+                self.hits += 1
+                self.cache[key] = hlsource
+                return hlsource
+        hlsource = PygmentsBridge.highlight_block(
+            self, source, lang, *args, **kwargs)
+        with self.cache_lock:
+            self.misses += 1
+            self.cache[key] = hlsource
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return hlsource
+
+
+class OutputWriter(object):
+    """
+    Writes output files in a background thread, so that rendering of next
+    document overlaps with writing of the previous one.
+
+    Files to write are passed via bounded queue, so that when the writing is
+    slower than rendering, the builder waits instead of keeping all the
+    content in memory. Errors are collected and reported by ``close()``.
+    """
+
+    def __init__(self, write_func, queue_size):
+        """
+        Start writer thread which uses given function to write a file (with
+        output filename and content arguments).
+        """
+        self.write_func = write_func
+        self.queue = queue.Queue(maxsize=queue_size)
+        # list of (docname, output filename, exception) tuples
+        self.errors = []
+        self.thread = threading.Thread(
+            target=self._run, name="pylatest-output-writer")
+        # don't block exit of python interpreter when the build fails
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            docname, outfilename, content_b = item
+            # any error is just recorded, so that the thread keeps draining
+            # the queue (otherwise the builder would wait for a free slot in
+            # the queue forever)
+            try:
+                ensuredir(path.dirname(outfilename))
+                self.write_func(outfilename, content_b)
+            except Exception as err:
+                self.errors.append((docname, outfilename, err))
+
+    def write(self, docname, outfilename, content_b):
+        """
+        Queue given content of given document for writing into output file,
+        waiting when the queue is full.
+        """
+        self.queue.put((docname, outfilename, content_b))
+
+    def close(self):
+        """
+        Wait until all queued files are written, stop the writer thread and
+        return list of errors.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        return self.errors
+
+
 class XmlExportBuilder(Builder):
     """
     Builds XML export file with html content.
@@ -99,11 +287,81 @@ class XmlExportBuilder(Builder):
         self.fignumbers = {}
         # currently written docname
         self.current_docname = None  # type: unicode
-        # sphinx highlighter, from StandaloneHTMLBuilder.init_highlighter()
-        self.highlighter = PygmentsBridge(
+        # sphinx highlighter, from StandaloneHTMLBuilder.init_highlighter(),
+        # with a cache shared by all documents of the build
+        self.highlighter = CachingPygmentsBridge(
             'html',
             'sphinx',
-            self.config.trim_doctest_flags)
+            self.config.trim_doctest_flags,
+            cache_size=self.config.pylatest_export_highlight_cache_size,
+            highlight=self.config.pylatest_export_highlight)
+        # background writer of output files, started in prepare_writing()
+        self.output_writer = None
+        # compressed xml export files have gzip file extension
+        if self.config.pylatest_export_compress:
+            self.out_suffix = XmlExportBuilder.out_suffix + '.gz'
+        # timing of individual phases of write_doc() for each document,
+        # the null timer is used when the timing report is not requested
+        if self.config.pylatest_export_timing_report:
+            self.timer = PhaseTimer()
+        else:
+            self.timer = NullPhaseTimer()
+        # xml schema used to validate each xml export document, compiled just
+        # once here and then reused for all documents of the build
+        self.schema = None
+        if self.config.pylatest_export_schema:
+            schema_file = path.join(
+                self.app.confdir, self.config.pylatest_export_schema)
+            try:
+                self.schema = load_xml_schema(schema_file)
+            except (IOError, OSError, etree.LxmlError) as err:
+                msg = "can't load pylatest_export_schema {0}: {1}".format(
+                    schema_file, err)
+                raise ConfigError(msg)
+        # manifest with fingerprints of test cases exported in this build,
+        # and the manifest of the previous build (if any)
+        self.manifest = None
+        self.prev_manifest = None
+        # names of all documents processed by write_doc() in this build
+        self.written_docs = set()
+        if self.config.pylatest_export_delta and \
+                not self.config.pylatest_export_manifest:
+            msg = "pylatest_export_delta requires pylatest_export_manifest"
+            raise ConfigError(msg)
+        if self.config.pylatest_export_manifest:
+            self.manifest = ExportManifest(
+                get_config_fingerprint(self.get_export_config()))
+            self.prev_manifest = ExportManifest.load(path.join(
+                self.outdir, self.config.pylatest_export_manifest))
+        # index of xml export files written in this build, docname -> dict
+        # with details about the test case and it's xml export file
+        self.index = None
+        if self.config.pylatest_export_index:
+            self.index = {}
+        # test cases of sharded xml export files, shard key (top level
+        # directory or None, lookup method) -> list of shard items
+        self.shards = None
+        if self.config.pylatest_export_shards:
+            self.shards = {}
+            # shard key -> properties of xml export files of the shard
+            self.shard_properties = {}
+
+    def get_export_config(self):
+        """
+        Return dict with values of config options which affect content of
+        xml export documents (with the exception of pretty printing).
+        """
+        return {
+            'project_id': self.config.pylatest_project_id,
+            'valid_export_metadata':
+                sorted(self.config.pylatest_valid_export_metadata),
+            'content_type': self.config.pylatest_export_content_type,
+            'lookup_method': self.config.pylatest_export_lookup_method,
+            'dry_run': self.config.pylatest_export_dry_run,
+            'response_properties':
+                self.config.pylatest_export_response_properties,
+            'highlight': self.config.pylatest_export_highlight,
+            }
 
     # TODO: proper implementation
     def get_target_uri(self, docname, typ=None):
@@ -140,44 +398,26 @@ class XmlExportBuilder(Builder):
         # disable splitting field list table rows with too long field names,
         # fixing https://gitlab.com/mbukatov/pylatest/issues/44
         self.settings.field_name_limit = 0
+        # files are written in background thread, unless disabled
+        queue_size = self.config.pylatest_export_write_queue_size
+        if queue_size > 0 and self.output_writer is None:
+            self.output_writer = OutputWriter(self._write_output, queue_size)
 
     def write_doc(self, docname, doctree):
         # type: (unicode, nodes.Node) -> None
         """Where you actually write something to the filesystem."""
+        self.written_docs.add(docname)
 
-        # hack: check if the document is a test case
-        is_testcase_doc = False
-        for node in doctree.traverse(test_action_node):
-            is_testcase_doc = True
-            break
         # we will produce xml export output for test cases only
-        if not is_testcase_doc:
+        if not is_testcase_doctree(doctree):
             return
 
         # initialize dict with properties for xml export file
         properties = {}
 
         # set test case id based on selected lookup method
-        if self.app.config.pylatest_export_lookup_method == "custom":
-            testcase_id = "/" + docname
-            properties['lookup-method'] = 'custom'
-        elif self.app.config.pylatest_export_lookup_method == "id":
-            # get test case id from a field list
-            # if the id can't be found there, testcase id attribute is omitted
-            testcase_id = get_testcase_id(doctree)
-            properties['lookup-method'] = 'id'
-        elif self.app.config.pylatest_export_lookup_method == "id,custom":
-            # custom lookup method is used, unless explicit id is specified
-            # in the rst file
-            testcase_id = get_testcase_id(doctree)
-            properties['lookup-method'] = 'id'
-            if testcase_id is None:
-                testcase_id = "/" + docname
-                properties['lookup-method'] = 'custom'
-        else:
-            # TODO: report the error in a better way?
-            msg = "pylatest_export_lookup_method value is invalid"
-            raise Exception(msg)
+        testcase_id, properties['lookup-method'] = get_testcase_lookup(
+            doctree, docname, self.app.config.pylatest_export_lookup_method)
 
         # set test case id based on selected lookup method
         if self.app.config.pylatest_export_dry_run:
@@ -187,49 +427,404 @@ class XmlExportBuilder(Builder):
         destination = StringOutput(encoding='utf-8')  # TODO: what is this?
         doctree.settings = self.settings
         self.current_docname = docname
-        self.writer.write(doctree, destination)
+        with self.timer.phase(docname, 'html'):
+            self.writer.write(doctree, destination)
 
         # generate content of target xml file based on html output
-        tc_doc = build_xml_testcase_doc(
-            html_source=self.writer.output,
-            content_type=self.app.config.pylatest_export_content_type,
-            testcase_id=testcase_id,
-            )
+        with self.timer.phase(docname, 'parse'):
+            tc_doc = build_xml_testcase_doc(
+                html_source=self.writer.output,
+                content_type=self.app.config.pylatest_export_content_type,
+                testcase_id=testcase_id,
+                )
 
         # validate and drop invalid metadata if needed
-        if len(self.app.config.pylatest_valid_export_metadata) > 0:
-            for name in list(tc_doc.metadata.keys()):
-                if name not in self.app.config.pylatest_valid_export_metadata:
-                    del tc_doc.metadata[name]
+        with self.timer.phase(docname, 'filter'):
+            valid_metadata = self.app.config.pylatest_valid_export_metadata
+            if len(valid_metadata) > 0:
+                for name in list(tc_doc.metadata.keys()):
+                    if name not in valid_metadata:
+                        del tc_doc.metadata[name]
+
+        # compute fingerprint of the test case (before the element tree is
+        # built, since it moves html fragments into the tree) and in delta
+        # mode, skip test cases which haven't changed since previous build
+        if self.manifest is not None:
+            with self.timer.phase(docname, 'fingerprint'):
+                self.manifest.add(docname, testcase_id, tc_doc.fingerprint())
+            status = self.manifest.get_status(docname, self.prev_manifest)
+            if self.config.pylatest_export_delta and \
+                    status == ExportManifest.UNCHANGED:
+                self.remove_output(docname)
+                return
+
+        # entry of the index file, without details about the output file
+        index_entry = None
+        if self.index is not None:
+            index_entry = {
+                'id': testcase_id,
+                'lookup_method': properties['lookup-method'],
+                'title': tc_doc.title,
+                'requirements': [
+                    get_requirement_key(req_node)
+                    for req_node in get_testcase_requirements(doctree)],
+                }
 
         # create xml export document with single test case
-        export_doc = build_xml_export_doc(
+        with self.timer.phase(docname, 'tree'):
+            export_doc = build_xml_export_doc(
+                project_id=self.app.config.pylatest_project_id,
+                testcases=[tc_doc.build_element_tree()],
+                properties=properties,
+                response_properties=                                     # noqa
+                    self.app.config.pylatest_export_response_properties, # noqa
+                )
+
+        # validate the element tree (before serialization, so that the xml
+        # export document doesn't need to be parsed again)
+        if self.schema is not None:
+            with self.timer.phase(docname, 'validate'):
+                errors = validate_xml_export_doc(self.schema, export_doc)
+            for error in errors:
+                logger.warning(
+                    "xml export is not valid: %s", error, location=docname)
+
+        with self.timer.phase(docname, 'serialize'):
+            content_b = etree.tostring(
+                export_doc,
+                xml_declaration=True,
+                encoding='utf-8',
+                pretty_print=self.app.config.pylatest_export_pretty_print)
+
+        # in sharded mode, the test case is written later in finish()
+        if self.shards is not None:
+            self.add_shard_item(
+                docname, export_doc, properties, len(content_b), index_entry)
+            return
+
+        # write content into file (when the background writer is used,
+        # the phase covers just waiting for a free slot in it's queue)
+        with self.timer.phase(docname, 'write'):
+            outfilename = path.join(
+                self.outdir, os_path(docname) + self.out_suffix)
+            if self.output_writer is not None:
+                self.output_writer.write(docname, outfilename, content_b)
+            else:
+                ensuredir(path.dirname(outfilename))
+                try:
+                    self._write_output(outfilename, content_b)
+                except (IOError, OSError) as err:
+                    logger.warning(
+                        "error writing file %s: %s", outfilename, err)
+                    self.discard_output(docname)
+                    return
+
+        if self.index is not None:
+            with self.timer.phase(docname, 'index'):
+                self.index[docname] = dict(
+                    index_entry,
+                    path=docname + self.out_suffix,
+                    size=len(content_b),
+                    sha256=hashlib.sha256(content_b).hexdigest())
+
+    def get_export_header(self, properties):
+        """
+        Create xml export document without any test cases, with given
+        properties and other details based on config.
+        """
+        return build_xml_export_doc(
             project_id=self.app.config.pylatest_project_id,
-            testcases=[tc_doc.build_element_tree()],
             properties=properties,
             response_properties=                                     # noqa
                 self.app.config.pylatest_export_response_properties, # noqa
             )
+
+    def add_shard_item(self, docname, export_doc, properties, size,
+                       index_entry):
+        """
+        Add test case from given xml export document (with single test case
+        and given serialized size) into a shard, based on it's top level
+        directory (if enabled) and lookup method.
+        """
+        group = None
+        if self.config.pylatest_export_shard_by_dir and "/" in docname:
+            group = docname.split("/", 1)[0]
+        key = (group, properties['lookup-method'])
+        if key not in self.shard_properties:
+            # size of xml export document without any test cases, which is
+            # the same for all test cases of the shard (since properties of
+            # the shard are not empty, serialized size of xml export document
+            # is the size of this header plus sizes of all test cases)
+            header = etree.tostring(
+                self.get_export_header(properties),
+                xml_declaration=True,
+                encoding='utf-8',
+                pretty_print=self.app.config.pylatest_export_pretty_print)
+            self.shard_properties[key] = (properties, len(header))
+        header_size = self.shard_properties[key][1]
+        testcase = export_doc[-1]
+        self.shards.setdefault(key, []).append(
+            (docname, testcase, size - header_size, index_entry))
+
+    def get_shard_path(self, key, num):
+        """
+        Get path (relative to output directory, using slash as a separator)
+        of xml export file of given shard.
+        """
+        group, lookup_method = key
+        name = "testcases"
+        if self.app.config.pylatest_export_lookup_method == "id,custom":
+            name += "-" + lookup_method
+        name += "-{0:04d}".format(num) + self.out_suffix
+        if group is None:
+            return "shards/" + name
+        return "shards/" + group + "/" + name
+
+    def _write_shard(self, task):
+        """
+        Serialize and write xml export file of a single shard, returning
+        shard path, size and sha256 hash of the xml content and error message
+        (None when no error happened).
+        """
+        shard_path, export_doc = task
         content_b = etree.tostring(
             export_doc,
             xml_declaration=True,
             encoding='utf-8',
             pretty_print=self.app.config.pylatest_export_pretty_print)
-        content = content_b.decode('utf-8')
+        outfilename = path.join(self.outdir, os_path(shard_path))
+        try:
+            ensuredir(path.dirname(outfilename))
+            self._write_output(outfilename, content_b)
+        except (IOError, OSError) as err:
+            return shard_path, None, None, str(err)
+        sha256 = hashlib.sha256(content_b).hexdigest()
+        return shard_path, len(content_b), sha256, None
+
+    def remove_stale_shards(self, shard_paths):
+        """
+        Remove files of shards from previous builds, which are not going to
+        be written again (files of other shards are kept, so that shards
+        which didn't change are not rewritten).
+        """
+        shards_dir = path.join(self.outdir, "shards")
+        for dirpath, dirnames, filenames in os.walk(shards_dir):
+            for filename in filenames:
+                shard_file = path.join(dirpath, filename)
+                shard_path = path.relpath(shard_file, self.outdir)
+                if shard_path.replace(os.sep, "/") in shard_paths:
+                    continue
+                try:
+                    os.unlink(shard_file)
+                except OSError as err:
+                    logger.warning(
+                        "error removing file %s: %s", shard_file, err)
+
+    def write_shards(self):
+        """
+        Split test cases into shards (limited by number of test cases and
+        size of xml export file) and write the shards in parallel.
+
+        Test cases are ordered by docname, so that the same set of test
+        cases always produces the same shards.
+        """
+        max_count = self.config.pylatest_export_shard_max_testcases
+        max_bytes = self.config.pylatest_export_shard_max_bytes
+        tasks = []
+        # shard path -> list of docnames of test cases in the shard
+        shard_docs = {}
+        for key in sorted(self.shards, key=lambda k: (k[0] or "", k[1])):
+            items = sorted(self.shards[key], key=lambda item: item[0])
+            properties, header_size = self.shard_properties[key]
+            ranges = pack_shards(
+                [item[2] for item in items],
+                max_count=max_count,
+                max_bytes=max_bytes,
+                base_size=header_size)
+            for num, (start, end) in enumerate(ranges, 1):
+                shard_items = items[start:end]
+                if max_bytes > 0 and \
+                        header_size + shard_items[0][2] > max_bytes:
+                    logger.warning(
+                        "xml export of %s exceeds "
+                        "pylatest_export_shard_max_bytes", shard_items[0][0])
+                shard_path = self.get_shard_path(key, num)
+                # the tree is built here, so that worker threads just
+                # serialize it and write it into a file
+                export_doc = self.get_export_header(properties)
+                for _, testcase, _, _ in shard_items:
+                    export_doc.append(testcase)
+                tasks.append((shard_path, export_doc))
+                shard_docs[shard_path] = shard_items
+        self.remove_stale_shards(shard_docs)
+        if len(tasks) == 0:
+            return
+        pool = ThreadPool(min(len(tasks), multiprocessing.cpu_count()))
+        try:
+            results = pool.map(self._write_shard, tasks)
+        finally:
+            pool.close()
+            pool.join()
+        for shard_path, size, sha256, error in results:
+            if error is not None:
+                logger.warning(
+                    "error writing shard %s: %s", shard_path, error)
+                for docname, _, _, _ in shard_docs[shard_path]:
+                    self.discard_output(docname)
+                continue
+            if self.index is None:
+                continue
+            for docname, _, _, index_entry in shard_docs[shard_path]:
+                self.index[docname] = dict(
+                    index_entry, path=shard_path, size=size, sha256=sha256)
 
-        # write content into file
+    def _write_output(self, outfilename, content_b):
+        """
+        Write given xml content (bytes) into output file, compressing it when
+        ``pylatest_export_compress`` is enabled.
+
+        Output file which already has the same content is left untouched (so
+        that tools like rsync don't transfer it again), other files are
+        replaced atomically (so that partially written xml is never seen).
+        Returns True when the file was written.
+        """
+        if self.config.pylatest_export_compress:
+            # name and mtime are not stored in the gzip header, so that
+            # the output is the same for the same content
+            gzip_buffer = io.BytesIO()
+            with gzip.GzipFile(
+                    filename='',
+                    mode='wb',
+                    compresslevel=self.config.pylatest_export_compress_level,
+                    fileobj=gzip_buffer,
+                    mtime=0) as gzip_file:
+                gzip_file.write(content_b)
+            data = gzip_buffer.getvalue()
+        else:
+            data = content_b
+        if has_same_content(outfilename, data):
+            return False
+        write_atomic(outfilename, data)
+        return True
+
+    def remove_output(self, docname):
+        """
+        Remove xml export file of given document from the output directory
+        (if it exists), so that in delta mode, the output directory contains
+        only test cases which were added or changed.
+        """
         outfilename = path.join(
             self.outdir, os_path(docname) + self.out_suffix)
-        ensuredir(path.dirname(outfilename))
         try:
-            with codecs.open(outfilename, 'w', 'utf-8') as f:  # type: ignore
+            os.unlink(outfilename)
+        except OSError as err:
+            if err.errno != errno.ENOENT:
+                logger.warning(
+                    "error removing file %s: %s", outfilename, err)
+
+    def finish_manifest(self):
+        """
+        Write manifest of this build and in delta mode, a report with lists
+        of added, changed and removed test cases into the output directory.
+        """
+        # test cases of documents which were not processed in this build
+        # (but still exist) are kept in the manifest as they were
+        if self.prev_manifest is not None:
+            for docname, entry in self.prev_manifest.testcases.items():
+                if docname in self.written_docs or \
+                        docname not in self.env.found_docs:
+                    continue
+                self.manifest.testcases[docname] = entry
+        delta = self.manifest.compare(self.prev_manifest)
+        manifest_file = path.join(
+            self.outdir, self.config.pylatest_export_manifest)
+        try:
+            self.manifest.save(manifest_file)
+        except (IOError, OSError) as err:
+            logger.warning(
+                "error writing manifest %s: %s", manifest_file, err)
+        delta_name = self.config.pylatest_export_delta
+        if not delta_name:
+            return
+        for item in delta[ExportManifest.REMOVED]:
+            self.remove_output(item['docname'])
+        delta_file = path.join(self.outdir, delta_name)
+        content = json.dumps(delta, indent=2, sort_keys=True)
+        try:
+            with codecs.open(delta_file, 'w', 'utf-8') as f:
                 f.write(content)
         except (IOError, OSError) as err:
+            logger.warning(
+                "error writing delta report %s: %s", delta_file, err)
+
+    def write_index(self):
+        """
+        Write index of xml export files written in this build into the output
+        directory, either as a single json object (mapping docnames to index
+        entries) or in json lines format (one json object per line, with
+        docname included in each object), based on file extension.
+        """
+        index_file = path.join(self.outdir, self.config.pylatest_export_index)
+        if index_file.endswith(".jsonl"):
+            lines = []
+            for docname in sorted(self.index):
+                entry = dict(self.index[docname], docname=docname)
+                lines.append(json.dumps(entry, sort_keys=True) + "\n")
+            content = "".join(lines)
+        else:
+            content = json.dumps(self.index, indent=2, sort_keys=True)
+        try:
+            write_atomic(index_file, content.encode('utf-8'))
+        except (IOError, OSError) as err:
+            logger.warning("error writing index %s: %s", index_file, err)
+
+    def finish_output_writer(self):
+        """
+        Wait until background writer writes all queued files and report
+        files which it failed to write.
+        """
+        errors = self.output_writer.close()
+        self.output_writer = None
+        for docname, outfilename, err in errors:
             logger.warning("error writing file %s: %s", outfilename, err)
+            self.discard_output(docname)
+
+    def discard_output(self, docname):
+        """
+        Forget xml export of given document, which failed to be written.
+
+        The document is dropped from the index (which should list only files
+        which were actually written) and it's test case is not updated in the
+        manifest (previous entry is kept if there is any), so that delta mode
+        doesn't consider the test case unchanged in the next build.
+        """
+        if self.index is not None:
+            self.index.pop(docname, None)
+        if self.manifest is not None:
+            self.manifest.testcases.pop(docname, None)
+            # finish_manifest() keeps previous entries of unwritten documents
+            self.written_docs.discard(docname)
 
     def finish(self):
         # type: () -> None
-        pass
+        if self.output_writer is not None:
+            self.finish_output_writer()
+        if self.shards is not None:
+            self.write_shards()
+        if self.manifest is not None:
+            self.finish_manifest()
+        if self.index is not None:
+            self.write_index()
+        report_name = self.config.pylatest_export_timing_report
+        if report_name and len(self.timer) > 0:
+            report_file = path.join(self.outdir, report_name)
+            try:
+                self.timer.write_report(
+                    report_file,
+                    slowest=self.config.pylatest_export_timing_slowest)
+            except (IOError, OSError) as err:
+                logger.warning(
+                    "error writing timing report %s: %s", report_file, err)
 
     @property
     def math_renderer_name(self):
@@ -257,3 +852,205 @@ class XmlExportBuilder(Builder):
         here.
         """
         pass
+
+
+class RequirementCoverageBuilder(Builder):
+    """
+    Writes reverse index of requirements (as built by
+    RequiremenIndexingTransform during reading of documents) into json and
+    csv files, without rendering of any document.
+    """
+    # the builder's name, for the -b command line option
+    name = 'pylatest-coverage'
+    # the builder doesn't produce any document output
+    format = ''
+
+    def init(self):
+        pass
+
+    def get_outdated_docs(self):
+        # the coverage files are always written again, based on the env
+        return "requirement coverage files"
+
+    def get_target_uri(self, docname, typ=None):
+        return ''
+
+    def write(self, *ignored):
+        # there is no per document output, so that doctrees are not even
+        # loaded from the env (the index is written in finish() instead)
+        pass
+
+    def get_coverage(self):
+        """
+        Get tuple of two dicts: requirement key to sorted list of docnames of
+        test cases which cover it, and docname to sorted list of requirement
+        keys.
+        """
+        requirements = {}
+        testcases = {}
+        index = getattr(self.env, 'pylatest_requirements', {})
+        for req_key, (req_node, docnames) in index.items():
+            if len(docnames) == 0:
+                continue
+            requirements[req_key] = sorted(docnames)
+            for docname in docnames:
+                testcases.setdefault(docname, []).append(req_key)
+        for req_keys in testcases.values():
+            req_keys.sort()
+        return requirements, testcases
+
+    def finish(self):
+        # type: () -> None
+        requirements, testcases = self.get_coverage()
+        json_name = self.config.pylatest_coverage_json
+        if json_name:
+            content = json.dumps(
+                {'requirements': requirements, 'testcases': testcases},
+                indent=2,
+                sort_keys=True)
+            self._write_file(json_name, content.encode('utf-8'))
+        csv_name = self.config.pylatest_coverage_csv
+        if csv_name:
+            rows = [("requirement", "docname")]
+            for req_key in sorted(requirements):
+                for docname in requirements[req_key]:
+                    rows.append((req_key, docname))
+            self._write_file(csv_name, format_csv(rows))
+
+    def _write_file(self, name, content_b):
+        filename = path.join(self.outdir, name)
+        try:
+            ensuredir(path.dirname(filename))
+            write_atomic(filename, content_b)
+        except (IOError, OSError) as err:
+            logger.warning("error writing file %s: %s", filename, err)
+
+
+class JsonBuilder(Builder):
+    """
+    Writes basic details of test case documents (title, id, metadata from
+    field list, sections and number of test actions) into json files.
+
+    The details are taken directly from the doctree, without rendering any
+    html, so that this is much faster than xml export.
+    """
+    # the builder's name, for the -b command line option
+    name = 'pylatest-json'
+    # the builder doesn't produce any document output
+    format = ''
+    out_suffix = '.json'
+
+    def init(self):
+        # json lines entries, docname -> entry (when json lines is enabled)
+        self.entries = {}
+
+    def get_outdated_docs(self):
+        # type: () -> Iterator[unicode]
+        for docname in self.env.found_docs:
+            yield docname
+
+    def get_target_uri(self, docname, typ=None):
+        # type: (unicode, unicode) -> unicode
+        return docname + self.out_suffix
+
+    def prepare_writing(self, docnames):
+        # type: (Set[unicode]) -> None
+        pass
+
+    def build_entry(self, docname, doctree):
+        """
+        Build dict with details of given test case document.
+        """
+        testcase_id, lookup_method = get_testcase_lookup(
+            doctree, docname, self.config.pylatest_export_lookup_method)
+        # metadata from field list, with test_defaults already applied (but
+        # without id, which is removed by get_testcase_lookup())
+        metadata = {}
+        field_list = get_field_list(doctree)
+        if field_list is not None:
+            for field in field_list.traverse(docutils.nodes.field):
+                metadata[field[0].astext()] = field[1].astext()
+        title_node = doctree.next_node(docutils.nodes.title)
+        # titles of sections of the test case
+        sections = []
+        if len(doctree) > 0 and doctree[0].tagname == 'section':
+            sections = [
+                node[0].astext() for node in doctree[0].children
+                if node.tagname == 'section']
+        test_actions = TestActions(enforce_id=False)
+        for node in doctree.traverse(test_action_node):
+            test_actions.add(
+                node['action_name'], node, node.attributes.get('action_id'))
+        steps = len([a for a in test_actions if a[1] is not None])
+        results = len([a for a in test_actions if a[2] is not None])
+        # the same rules as TestCaseDocWithContent.missing_sections() uses
+        missing_sections = []
+        for section in TestCaseDoc.SECTIONS:
+            if section.title in sections:
+                continue
+            if section == TestCaseDoc.STEPS and len(test_actions) > 0:
+                continue
+            missing_sections.append(section.title)
+        return {
+            'docname': docname,
+            'id': testcase_id,
+            'lookup_method': lookup_method,
+            'title': title_node.astext() if title_node is not None else None,
+            'metadata': metadata,
+            'requirements': [
+                get_requirement_key(req_node)
+                for req_node in get_testcase_requirements(doctree)],
+            'sections': sections,
+            'missing_sections': missing_sections,
+            'actions': len(test_actions),
+            'steps': steps,
+            'results': results,
+            }
+
+    def write_doc(self, docname, doctree):
+        # type: (unicode, nodes.Node) -> None
+        if not is_testcase_doctree(doctree):
+            return
+        entry = self.build_entry(docname, doctree)
+        if self.config.pylatest_json_lines:
+            self.entries[docname] = entry
+            return
+        content = json.dumps(entry, indent=2, sort_keys=True)
+        outfilename = path.join(
+            self.outdir, os_path(docname) + self.out_suffix)
+        self._write_file(outfilename, content.encode('utf-8'))
+
+    def finish(self):
+        # type: () -> None
+        if not self.config.pylatest_json_lines:
+            return
+        lines = [
+            json.dumps(self.entries[docname], sort_keys=True) + "\n"
+            for docname in sorted(self.entries)]
+        outfilename = path.join(self.outdir, self.config.pylatest_json_lines)
+        self._write_file(outfilename, "".join(lines).encode('utf-8'))
+
+    def _write_file(self, outfilename, content_b):
+        try:
+            ensuredir(path.dirname(outfilename))
+            if not has_same_content(outfilename, content_b):
+                write_atomic(outfilename, content_b)
+        except (IOError, OSError) as err:
+            logger.warning("error writing file %s: %s", outfilename, err)
+
+
+def format_csv(rows):
+    """
+    Format given rows (tuples of unicode strings) as utf-8 encoded csv.
+    """
+    # csv module of python 2 works with bytes only
+    if sys.version_info[0] < 3:
+        csv_buffer = io.BytesIO()
+        writer = csv.writer(csv_buffer, lineterminator='\n')
+        for row in rows:
+            writer.writerow([value.encode('utf-8') for value in row])
+        return csv_buffer.getvalue()
+    csv_buffer = io.StringIO()
+    writer = csv.writer(csv_buffer, lineterminator='\n')
+    writer.writerows(rows)
+    return csv_buffer.getvalue().encode('utf-8')
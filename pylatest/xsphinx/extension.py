@@ -16,16 +16,40 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import fnmatch
+import json
 import os.path
+import sqlite3
 
 import docutils.nodes
+from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.util import logging
 
 from pylatest.xdocutils import directives
 from pylatest.xdocutils import htmltranslator
 from pylatest.xdocutils import nodes
 from pylatest.xdocutils import roles
 from pylatest.xdocutils import transforms
+from pylatest.xdocutils.utils import get_field_list, get_requirement_key
+from pylatest.xdocutils.utils import get_testcase_requirements
+from pylatest.catalog import Catalog
+from pylatest.document import TestActions
 from pylatest.xsphinx import builders
+from pylatest.xsphinx.profiling import PhaseTimer
+from pylatest.xsphinx.profiling import profiled_handler, profiled_transform
+
+
+logger = logging.getLogger(__name__)
+
+
+def _transform(app, transform_class):
+    """
+    Return given transform class, or it's profiled variant when
+    ``pylatest_profile`` option is enabled.
+    """
+    if app.config.pylatest_profile:
+        return profiled_transform(transform_class)
+    return transform_class
 
 
 def pylatest_transform_handler(app, doctree, docname):
@@ -33,13 +57,17 @@ def pylatest_transform_handler(app, doctree, docname):
     This handler fuction adds pylatest transforms based on value of
     app.builder.
     """
-    if isinstance(app.builder, builders.XmlExportBuilder):
+    if isinstance(
+            app.builder,
+            (builders.XmlExportBuilder, builders.JsonBuilder)):
         # pylatest transforms for plain format
-        app.add_post_transform(transforms.TestActionsPlainIdTransform)
+        app.add_post_transform(
+            _transform(app, transforms.TestActionsPlainIdTransform))
     else:
         # pylatest transforms for human readable html output,
         # translates pylatest nodes into nice sections or tables
-        app.add_post_transform(transforms.TestActionsTableTransform)
+        app.add_post_transform(
+            _transform(app, transforms.TestActionsTableTransform))
 
 
 def pylatest_requirements_transform_handler(app):
@@ -47,47 +75,303 @@ def pylatest_requirements_transform_handler(app):
     Add transform which builds reversed index for test case requirements
     in ``env.pylatest_requirements``.
     """
-    app.add_transform(transforms.RequiremenIndexingTransform)
+    app.add_transform(
+        _transform(app, transforms.RequiremenIndexingTransform))
 
 
-def pylatest_resolve_requirements(app, doctree, docname):
+def pylatest_requirements_purge(app, env, docname):
     """
-    Generate list of requirements (for each ``requirementlist`` directive)
-    based on reverse index of requirements as created by
-    RequiremenIndexingTransform.
+    Drop given document from reverse index of requirements, before the
+    document is read again (or after it was removed).
     """
-    env = app.builder.env
+    if not hasattr(env, "pylatest_requirements"):
+        return
+    for req_key in list(env.pylatest_requirements.keys()):
+        cases = env.pylatest_requirements[req_key][1]
+        cases.discard(docname)
+        if len(cases) == 0:
+            del env.pylatest_requirements[req_key]
+
+
+def pylatest_requirements_merge(app, env, docnames, other):
+    """
+    Merge reverse index of requirements built in a parallel read worker
+    process.
+    """
+    if not hasattr(other, "pylatest_requirements"):
+        return
+    if not hasattr(env, "pylatest_requirements"):
+        env.pylatest_requirements = {}
+    for req_key, (req_node, cases) in other.pylatest_requirements.items():
+        cases = cases & set(docnames)
+        if len(cases) == 0:
+            continue
+        env.pylatest_requirements.setdefault(req_key, (req_node, set()))
+        env.pylatest_requirements[req_key][1].update(cases)
 
+
+def build_requirementlist_template(env):
+    """
+    Build list item node for each requirement (sorted by text of the
+    requirement) with list of test cases covering the requirement (sorted by
+    docname), based on reverse index of requirements as created by
+    RequiremenIndexingTransform.
+
+    Returns list of tuples with requirement key, the list item node and list
+    of sorted docnames of test cases. References to test cases in the list
+    item don't have uri specified, since it depends on the document where the
+    list is used.
+    """
     # check if there is no reversed index for requirements
     if not hasattr(env, "pylatest_requirements"):
         env.pylatest_requirements = {}
 
-    for node in doctree.traverse(nodes.requirementlist_node):
-        content_node = docutils.nodes.bullet_list()
-        for req_node, cases in sorted(
-                env.pylatest_requirements.values(),
-                key=lambda item: item[0].astext()):
-            req_item_node = docutils.nodes.list_item()
-            req_item_para_node = docutils.nodes.paragraph()
-            req_item_para_node += req_node
-            req_item_node += req_item_para_node
-            case_list_node = docutils.nodes.bullet_list()
-            for case in sorted(cases):
-                case_item_node = docutils.nodes.list_item()
-                par_node = docutils.nodes.paragraph()
-                # building reference to test case document manually, the link
-                # text is absolute docname (instead of document title as used
-                # in doc rst role)
-                ref_node = docutils.nodes.reference('', "/" + case)
-                ref_node['internal'] = True
-                ref_node['refuri'] = app.builder.get_relative_uri(
-                    docname, case)
-                par_node += ref_node
-                case_item_node += par_node
-                case_list_node += case_item_node
-            req_item_node += case_list_node
-            content_node += req_item_node
-        node.replace_self(content_node)
+    items = []
+    for req_key, (req_node, cases) in sorted(
+            env.pylatest_requirements.items(),
+            key=lambda item: item[1][0].astext()):
+        req_item_node = docutils.nodes.list_item()
+        req_item_para_node = docutils.nodes.paragraph()
+        # requirement node is copied, so that the node stored in the index
+        # is not moved into the tree
+        req_item_para_node += req_node.deepcopy()
+        req_item_node += req_item_para_node
+        case_list_node = docutils.nodes.bullet_list()
+        sorted_cases = sorted(cases)
+        for case in sorted_cases:
+            case_item_node = docutils.nodes.list_item()
+            par_node = docutils.nodes.paragraph()
+            # building reference to test case document manually, the link
+            # text is absolute docname (instead of document title as used
+            # in doc rst role)
+            ref_node = docutils.nodes.reference('', "/" + case)
+            ref_node['internal'] = True
+            par_node += ref_node
+            case_item_node += par_node
+            case_list_node += case_item_node
+        req_item_node += case_list_node
+        items.append((req_key, req_item_node, sorted_cases))
+    return items
+
+
+def pylatest_requirementlist_init(app, env):
+    """
+    Build template of requirement list once per build, when all documents
+    are read (so that the reverse index of requirements is complete).
+    """
+    app.builder.pylatest_requirementlist = build_requirementlist_template(env)
+    return []
+
+
+def get_requirementlist_items(app, options):
+    """
+    Get items of requirement list template (see
+    ``build_requirementlist_template()``) with requirement keys matching
+    prefix and pattern from given options of ``requirementlist`` directive.
+    """
+    items = getattr(app.builder, "pylatest_requirementlist", None)
+    if items is None:
+        # the template was not built during this build
+        items = build_requirementlist_template(app.builder.env)
+        app.builder.pylatest_requirementlist = items
+    prefix = options.get('prefix')
+    pattern = options.get('pattern')
+    if prefix is not None:
+        items = [item for item in items if item[0].startswith(prefix)]
+    if pattern is not None:
+        items = [
+            item for item in items if fnmatch.fnmatchcase(item[0], pattern)]
+    return items
+
+
+def is_paged_requirementlist(app, options):
+    """
+    Check if requirement list with given options is split into pages, which
+    is possible for html builders only.
+    """
+    return bool(options.get('per_page')) and \
+        isinstance(app.builder, StandaloneHTMLBuilder)
+
+
+def get_requirementlist_pagename(docname, list_index, page):
+    """
+    Get pagename of given page (numbered from 1) of given requirement list
+    (numbered from 0) in given document. The first page is the document
+    itself.
+    """
+    if page == 1:
+        return docname
+    if list_index == 0:
+        return "{0}-page-{1}".format(docname, page)
+    return "{0}-{1}-page-{2}".format(docname, list_index + 1, page)
+
+
+def render_requirementlist(app, items, pagename):
+    """
+    Create bullet list node with clones of given requirement list items, with
+    uris of test case references relative to given page.
+    """
+    content_node = docutils.nodes.bullet_list()
+    for req_key, req_item_node, cases in items:
+        req_item_node = req_item_node.deepcopy()
+        case_list_node = req_item_node[1]
+        for case_item_node, case in zip(case_list_node.children, cases):
+            ref_node = case_item_node[0][0]
+            ref_node['refuri'] = app.builder.get_relative_uri(pagename, case)
+        content_node += req_item_node
+    return content_node
+
+
+def get_requirementlist_page_count(items, per_page):
+    """
+    Get number of pages of requirement list with given items (there is
+    always at least one page, even when the list is empty).
+    """
+    return max(1, (len(items) + per_page - 1) // per_page)
+
+
+def render_requirementlist_page(app, docname, list_index, items, per_page,
+                                page):
+    """
+    Create nodes of given page of paged requirement list with given items,
+    with navigation links to other pages.
+    """
+    pages = get_requirementlist_page_count(items, per_page)
+    pagename = get_requirementlist_pagename(docname, list_index, page)
+    nav_node = docutils.nodes.paragraph(classes=["pylatest-pages"])
+    nav_node += docutils.nodes.Text("Pages:")
+    for num in range(1, pages + 1):
+        nav_node += docutils.nodes.Text(" ")
+        if num == page:
+            nav_node += docutils.nodes.strong(text=str(num))
+            continue
+        ref_node = docutils.nodes.reference('', str(num))
+        ref_node['internal'] = True
+        ref_node['refuri'] = app.builder.get_relative_uri(
+            pagename,
+            get_requirementlist_pagename(docname, list_index, num))
+        nav_node += ref_node
+    page_items = items[(page - 1) * per_page:page * per_page]
+    return [
+        nav_node,
+        render_requirementlist(app, page_items, pagename),
+        nav_node.deepcopy(),
+        ]
+
+
+def pylatest_resolve_requirements(app, doctree, docname):
+    """
+    Generate list of requirements (for each ``requirementlist`` directive)
+    by cloning items of the template of requirement list built by
+    ``pylatest_requirementlist_init()``, with uris of test case references
+    relative to given document.
+
+    Paged requirement list contains just the first page here, other pages
+    are generated by ``pylatest_requirementlist_pages()``.
+    """
+    for list_index, node in enumerate(
+            doctree.traverse(nodes.requirementlist_node)):
+        options = node.attributes
+        items = get_requirementlist_items(app, options)
+        if is_paged_requirementlist(app, options):
+            node.replace_self(render_requirementlist_page(
+                app, docname, list_index, items, options['per_page'], 1))
+        else:
+            node.replace_self(render_requirementlist(app, items, docname))
+
+
+def pylatest_requirementlist_read(app, doctree):
+    """
+    Store options of ``requirementlist`` directives in the document into
+    ``env.pylatest_requirementlists``, so that other pages of paged
+    requirement lists can be generated later.
+    """
+    env = app.builder.env
+    if not hasattr(env, "pylatest_requirementlists"):
+        env.pylatest_requirementlists = {}
+    options_list = [
+        {
+            'prefix': node.get('prefix'),
+            'pattern': node.get('pattern'),
+            'per_page': node.get('per_page'),
+        }
+        for node in doctree.traverse(nodes.requirementlist_node)]
+    if len(options_list) > 0:
+        env.pylatest_requirementlists[env.docname] = options_list
+
+
+def pylatest_requirementlist_purge(app, env, docname):
+    if hasattr(env, "pylatest_requirementlists"):
+        env.pylatest_requirementlists.pop(docname, None)
+
+
+def pylatest_requirementlist_merge(app, env, docnames, other):
+    if not hasattr(other, "pylatest_requirementlists"):
+        return
+    if not hasattr(env, "pylatest_requirementlists"):
+        env.pylatest_requirementlists = {}
+    for docname in docnames:
+        if docname in other.pylatest_requirementlists:
+            env.pylatest_requirementlists[docname] = \
+                other.pylatest_requirementlists[docname]
+
+
+def pylatest_requirementlist_pages(app):
+    """
+    Generate html pages (other than the first one) of paged requirement
+    lists.
+    """
+    env = app.builder.env
+    requirementlists = getattr(env, "pylatest_requirementlists", {})
+    for docname in sorted(requirementlists):
+        if docname not in env.all_docs:
+            continue
+        if docname in env.titles:
+            title = env.titles[docname].astext()
+        else:
+            title = docname
+        for list_index, options in enumerate(requirementlists[docname]):
+            if not is_paged_requirementlist(app, options):
+                continue
+            items = get_requirementlist_items(app, options)
+            per_page = options['per_page']
+            pages = get_requirementlist_page_count(items, per_page)
+            for page in range(2, pages + 1):
+                container_node = docutils.nodes.container()
+                container_node.extend(render_requirementlist_page(
+                    app, docname, list_index, items, per_page, page))
+                body = app.builder.render_partial(container_node)['fragment']
+                context = {
+                    'title': "{0} ({1}/{2})".format(title, page, pages),
+                    'body': body,
+                    }
+                pagename = get_requirementlist_pagename(
+                    docname, list_index, page)
+                yield pagename, context, 'page.html'
+
+
+def get_defaults_dirnames(defaults, docname):
+    """
+    Get list of directories with test_defaults (as stored in
+    ``env.pylatest_defaults``) applicable for given document, in the order in
+    which the defaults should be applied.
+    """
+    # get dir name part of current source rst file's docname
+    dirname = os.path.dirname(docname)
+
+    # check which defaults are applicable
+    tmp_dir_names = []
+    for name in defaults.keys():
+        if os.path.commonprefix([dirname, name]) == name:
+            if name == '':
+                level = 0
+            else:
+                level = len(list(name.split('/')))
+            tmp_dir_names.append((level, name))
+    # and sort dir names by level: defaults nested deep in the tree are used
+    # first so that the top level defautls override the nested ones
+    return [
+        v for l, v in sorted(tmp_dir_names, key=lambda x: x[0], reverse=True)]
 
 
 def pylatest_resolve_defaults(app, doctree, docname):
@@ -127,25 +411,8 @@ def pylatest_resolve_defaults(app, doctree, docname):
         return
     field_list = doctree[0][1]
 
-    # get dir name part of current source rst file's docname
-    dirname = os.path.dirname(docname)
-
-    # check which defaults are applicable
-    tmp_dir_names = []
-    for name in env.pylatest_defaults.keys():
-        if os.path.commonprefix([dirname, name]) == name:
-            if name == '':
-                level = 0
-            else:
-                level = len(list(name.split('/')))
-            tmp_dir_names.append((level, name))
-    # and sort dir names by level: defaults nested deep in the tree are used
-    # first so that the top level defautls override the nested ones
-    def_dir_names = [
-        v for l, v in sorted(tmp_dir_names, key=lambda x: x[0], reverse=True)]
-
     # push default values (if any) into field_list
-    for dir_name in def_dir_names:
+    for dir_name in get_defaults_dirnames(env.pylatest_defaults, docname):
         # get field list items, which are already directly present in test case
         field_list_tc = {}  # field_name string -> field_body node
         for field in field_list.traverse(docutils.nodes.field):
@@ -169,6 +436,192 @@ def pylatest_resolve_defaults(app, doctree, docname):
                 field_list += field
 
 
+def pylatest_catalog_read(app, doctree):
+    """
+    Collect details of a test case for the catalog (when ``pylatest_catalog``
+    is enabled) into ``env.pylatest_catalog``, so that the catalog can be
+    updated when all documents are read.
+    """
+    if not app.config.pylatest_catalog:
+        return
+    env = app.builder.env
+    if not hasattr(env, "pylatest_catalog"):
+        env.pylatest_catalog = {}
+        env.pylatest_catalog_changed = set()
+    # pair test steps and results into test actions, using the same action
+    # ids as xml export does (duplicate ids are not reported here, so that
+    # the catalog doesn't break the build)
+    test_actions = TestActions(enforce_id=False)
+    for node in doctree.traverse(nodes.test_action_node):
+        test_actions.add(
+            node['action_name'], node, node.attributes.get('action_id'))
+    actions = []
+    for action_id, step_node, result_node in test_actions:
+        actions.append((
+            action_id,
+            step_node.astext() if step_node is not None else None,
+            result_node.astext() if result_node is not None else None,
+            ))
+    # only test case documents are cataloged
+    if len(actions) == 0:
+        return
+    testcase_id = None
+    metadata = {}
+    field_list = get_field_list(doctree)
+    if field_list is not None:
+        for field in field_list.traverse(docutils.nodes.field):
+            name = field[0].astext()
+            if name == "id":
+                testcase_id = field[1].astext()
+            else:
+                metadata[name] = field[1].astext()
+    title_node = doctree.next_node(docutils.nodes.title)
+    source = os.path.relpath(env.doc2path(env.docname), env.srcdir)
+    env.pylatest_catalog[env.docname] = {
+        'testcase_id': testcase_id,
+        'title': title_node.astext() if title_node is not None else None,
+        'source': source.replace(os.sep, "/"),
+        'actions': actions,
+        'metadata': metadata,
+        'requirements': sorted(set(
+            get_requirement_key(req_node)
+            for req_node in get_testcase_requirements(doctree))),
+        }
+    env.pylatest_catalog_changed.add(env.docname)
+
+
+def pylatest_catalog_purge(app, env, docname):
+    """
+    Drop catalog details of a document which is going to be read again
+    (or which was removed).
+    """
+    if not hasattr(env, "pylatest_catalog"):
+        return
+    env.pylatest_catalog.pop(docname, None)
+    env.pylatest_catalog_changed.add(docname)
+
+
+def pylatest_catalog_merge(app, env, docnames, other):
+    """
+    Merge catalog details collected in a parallel read worker process.
+    """
+    if not hasattr(other, "pylatest_catalog"):
+        return
+    if not hasattr(env, "pylatest_catalog"):
+        env.pylatest_catalog = {}
+        env.pylatest_catalog_changed = set()
+    for docname in docnames:
+        if docname in other.pylatest_catalog:
+            env.pylatest_catalog[docname] = other.pylatest_catalog[docname]
+    env.pylatest_catalog_changed.update(docnames)
+
+
+def pylatest_catalog_update(app, env):
+    """
+    Update sqlite catalog of test cases with documents read in this build,
+    metadata of the test cases are stored with test_defaults applied.
+
+    When test_defaults changed since last update of the catalog, metadata
+    of all test cases are updated.
+    """
+    if not app.config.pylatest_catalog:
+        return []
+    records = getattr(env, "pylatest_catalog", {})
+    changed = getattr(env, "pylatest_catalog_changed", set())
+    defaults = getattr(env, "pylatest_defaults", {})
+    defaults_json = json.dumps(defaults, sort_keys=True)
+    filename = os.path.join(app.doctreedir, app.config.pylatest_catalog)
+    try:
+        catalog = Catalog(filename)
+    except sqlite3.Error as err:
+        logger.warning("error opening catalog %s: %s", filename, err)
+        return []
+    try:
+        with catalog.transaction():
+            db_docnames = catalog.get_docnames()
+            if catalog.get_property("defaults") != defaults_json:
+                update_docnames = set(records)
+            else:
+                update_docnames = \
+                    (changed | (set(records) - db_docnames)) & set(records)
+            for docname in db_docnames - set(records):
+                catalog.remove(docname)
+            for docname in sorted(update_docnames):
+                record = records[docname]
+                metadata = dict(record['metadata'])
+                for dirname in get_defaults_dirnames(defaults, docname):
+                    metadata.update(defaults[dirname])
+                catalog.update(
+                    docname,
+                    record['testcase_id'],
+                    record['title'],
+                    record['source'],
+                    record['actions'],
+                    metadata,
+                    record['requirements'])
+            catalog.set_property("defaults", defaults_json)
+    except sqlite3.Error as err:
+        logger.warning("error updating catalog %s: %s", filename, err)
+        return []
+    finally:
+        catalog.close()
+    changed.clear()
+    return []
+
+
+def pylatest_profile_init(app):
+    """
+    Initialize storage for profiling data of pylatest handlers and transforms
+    when ``pylatest_profile`` is enabled. Data from previous builds (stored in
+    pickled env) are dropped.
+    """
+    if app.config.pylatest_profile:
+        app.env.pylatest_profile = PhaseTimer()
+    elif hasattr(app.env, 'pylatest_profile'):
+        del app.env.pylatest_profile
+
+
+def pylatest_profile_merge(app, env, docnames, other):
+    """
+    Merge profiling data collected in a parallel read worker process.
+
+    Only data of documents read by the worker are merged, because env of the
+    worker process also contains data merged from previous workers.
+    """
+    if hasattr(other, 'pylatest_profile'):
+        env.pylatest_profile.merge(other.pylatest_profile, docnames)
+
+
+def pylatest_profile_report(app, exception):
+    """
+    Report time spent in pylatest handlers and transforms, either into the
+    build log (when ``pylatest_profile`` is True), or into a json file (when
+    ``pylatest_profile`` contains a file name).
+    """
+    if exception is not None or not app.config.pylatest_profile:
+        return
+    timer = getattr(app.env, 'pylatest_profile', None)
+    if timer is None or len(timer) == 0:
+        return
+    if app.config.pylatest_profile is True:
+        report = timer.build_report(slowest=10)
+        logger.info("pylatest profile (%d documents):", report['documents'])
+        for name in report['phase_order']:
+            phase = report['phases'][name]
+            logger.info(
+                "  %-32s %8.3fs wall %8.3fs cpu in %d documents",
+                name, phase['wall'], phase['cpu'], phase['count'])
+        for doc in report['slowest']:
+            logger.info("  %-32s %8.3fs wall", doc['docname'], doc['wall'])
+    else:
+        report_file = os.path.join(app.outdir, app.config.pylatest_profile)
+        try:
+            timer.write_report(report_file)
+        except (IOError, OSError) as err:
+            logger.warning(
+                "error writing profile report %s: %s", report_file, err)
+
+
 def setup(app):
     # pylatest roles
     app.add_role("rhbz", roles.redhat_bugzilla_role)
@@ -188,17 +641,42 @@ def setup(app):
         app.add_node(node_class, html=(visit_func, depart_func))
 
     # pylatest transforms are added based on app.builder value
-    app.connect('doctree-resolved', pylatest_transform_handler)
+    app.connect(
+        'doctree-resolved', profiled_handler(pylatest_transform_handler))
 
     # propagate values from test_defautls directive
-    app.connect('doctree-resolved', pylatest_resolve_defaults)
+    app.connect(
+        'doctree-resolved', profiled_handler(pylatest_resolve_defaults))
 
     # transforms and handlers related to requirements processing
     app.connect('builder-inited', pylatest_requirements_transform_handler)
-    app.connect('doctree-resolved', pylatest_resolve_requirements)
+    app.connect(
+        'doctree-resolved', profiled_handler(pylatest_resolve_requirements))
+    app.connect('env-purge-doc', pylatest_requirements_purge)
+    app.connect('env-merge-info', pylatest_requirements_merge)
+    app.connect('env-updated', pylatest_requirementlist_init)
+    app.connect('doctree-read', pylatest_requirementlist_read)
+    app.connect('env-purge-doc', pylatest_requirementlist_purge)
+    app.connect('env-merge-info', pylatest_requirementlist_merge)
+    app.connect('html-collect-pages', pylatest_requirementlist_pages)
+
+    # sqlite catalog of test cases
+    app.connect('doctree-read', pylatest_catalog_read)
+    app.connect('env-purge-doc', pylatest_catalog_purge)
+    app.connect('env-merge-info', pylatest_catalog_merge)
+    app.connect('env-updated', pylatest_catalog_update)
+
+    # profiling of pylatest handlers and transforms
+    app.connect('builder-inited', pylatest_profile_init)
+    app.connect('env-merge-info', pylatest_profile_merge)
+    app.connect('build-finished', pylatest_profile_report)
 
     # builder for xmlexport output
     app.add_builder(builders.XmlExportBuilder)
+    # builder for requirement coverage files
+    app.add_builder(builders.RequirementCoverageBuilder)
+    # builder for json files with details of test cases
+    app.add_builder(builders.JsonBuilder)
 
     # pylatest configuration
     app.add_config_value('pylatest_project_id', default=None, rebuild='html')
@@ -209,6 +687,26 @@ def setup(app):
     app.add_config_value('pylatest_export_lookup_method', "custom", 'html')
     app.add_config_value('pylatest_export_dry_run', False, 'html')
     app.add_config_value('pylatest_export_response_properties', None, 'html')
+    app.add_config_value('pylatest_export_schema', None, 'html')
+    app.add_config_value('pylatest_export_manifest', None, '')
+    app.add_config_value('pylatest_export_delta', None, '')
+    app.add_config_value('pylatest_export_index', None, '')
+    app.add_config_value('pylatest_export_shards', False, '')
+    app.add_config_value('pylatest_export_shard_max_testcases', 0, '')
+    app.add_config_value('pylatest_export_shard_max_bytes', 0, '')
+    app.add_config_value('pylatest_export_shard_by_dir', False, '')
+    app.add_config_value('pylatest_export_compress', False, 'html')
+    app.add_config_value('pylatest_export_highlight', True, 'html')
+    app.add_config_value('pylatest_export_highlight_cache_size', 1024, '')
+    app.add_config_value('pylatest_export_write_queue_size', 64, '')
+    app.add_config_value('pylatest_export_compress_level', 6, 'html')
+    app.add_config_value('pylatest_export_timing_report', None, '')
+    app.add_config_value('pylatest_export_timing_slowest', 10, '')
+    app.add_config_value('pylatest_profile', None, '')
+    app.add_config_value('pylatest_catalog', None, 'env')
+    app.add_config_value('pylatest_coverage_json', 'coverage.json', '')
+    app.add_config_value('pylatest_coverage_csv', 'coverage.csv', '')
+    app.add_config_value('pylatest_json_lines', None, '')
 
     # pylatest css tweaks
     app.add_stylesheet('pylatest.css')
@@ -0,0 +1,254 @@
+# -*- coding: utf8 -*-
+
+"""
+Timing and profiling helpers for pylatest Sphinx builders and handlers.
+
+All helpers here are designed so that they can be replaced with a null
+implementation when profiling is not enabled, so that the code paths which
+use them don't need to check the configuration over and over again.
+"""
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from contextlib import contextmanager
+import functools
+import io
+import json
+import time
+
+
+# python 2 doesn't have perf_counter() and process_time() functions, but
+# time.clock() measures cpu time there (on unix)
+try:
+    wall_clock = time.perf_counter
+    cpu_clock = time.process_time
+except AttributeError:
+    wall_clock = time.time
+    cpu_clock = time.clock
+
+
+def percentile(values, pct):
+    """
+    Return given percentile (nearest-rank method) of a list of values, or
+    None for an empty list.
+    """
+    if len(values) == 0:
+        return None
+    ordered = sorted(values)
+    rank = int(round(pct / 100.0 * (len(ordered) - 1)))
+    return ordered[rank]
+
+
+class PhaseTimer(object):
+    """
+    Collects wall and cpu time spent in named phases of processing of each
+    document.
+
+    Example of usage::
+
+        timer = PhaseTimer()
+        with timer.phase("foo/test_bar", "html"):
+            do_something()
+    """
+
+    def __init__(self):
+        # docname -> phase name -> [wall time, cpu time]
+        self.records = {}
+        # list of phase names in order in which they were seen first
+        self.phases = []
+
+    def __len__(self):
+        return len(self.records)
+
+    @contextmanager
+    def phase(self, docname, name):
+        wall_start = wall_clock()
+        cpu_start = cpu_clock()
+        try:
+            yield
+        finally:
+            self.add(
+                docname,
+                name,
+                wall_clock() - wall_start,
+                cpu_clock() - cpu_start)
+
+    def add(self, docname, name, wall, cpu):
+        """
+        Add wall and cpu time spent in given phase of a document.
+        """
+        if name not in self.phases:
+            self.phases.append(name)
+        doc_record = self.records.setdefault(docname, {})
+        phase_record = doc_record.setdefault(name, [0.0, 0.0])
+        phase_record[0] += wall
+        phase_record[1] += cpu
+
+    def merge(self, other, docnames=None):
+        """
+        Merge timing data from other PhaseTimer object into this one (eg.
+        when the other timer was used in a parallel worker process). When
+        docnames are specified, only data of these documents are merged.
+        """
+        for docname, doc_record in other.records.items():
+            if docnames is not None and docname not in docnames:
+                continue
+            for name, (wall, cpu) in doc_record.items():
+                self.add(docname, name, wall, cpu)
+
+    def doc_total(self, docname):
+        """
+        Return total wall and cpu time spent on given document.
+        """
+        wall = sum(r[0] for r in self.records[docname].values())
+        cpu = sum(r[1] for r in self.records[docname].values())
+        return wall, cpu
+
+    def build_report(self, slowest=10):
+        """
+        Generate a report (a dict ready to be dumped as json) with totals and
+        percentiles for each phase and list of the slowest documents.
+        """
+        phases = {}
+        for name in self.phases:
+            walls = []
+            cpus = []
+            for doc_record in self.records.values():
+                if name in doc_record:
+                    walls.append(doc_record[name][0])
+                    cpus.append(doc_record[name][1])
+            phases[name] = {
+                'count': len(walls),
+                'wall': sum(walls),
+                'cpu': sum(cpus),
+                'wall_p50': percentile(walls, 50),
+                'wall_p90': percentile(walls, 90),
+                'wall_p99': percentile(walls, 99),
+                'wall_max': max(walls) if walls else None,
+                }
+        doc_totals = [
+            (docname, self.doc_total(docname)) for docname in self.records]
+        doc_walls = [wall for _, (wall, _) in doc_totals]
+        doc_totals.sort(key=lambda item: (-item[1][0], item[0]))
+        slowest_docs = []
+        for docname, (wall, cpu) in doc_totals[:slowest]:
+            slowest_docs.append({
+                'docname': docname,
+                'wall': wall,
+                'cpu': cpu,
+                'phases': dict(
+                    (name, {'wall': r[0], 'cpu': r[1]})
+                    for name, r in self.records[docname].items()),
+                })
+        report = {
+            'documents': len(self.records),
+            'phase_order': list(self.phases),
+            'total': {
+                'wall': sum(doc_walls),
+                'cpu': sum(cpu for _, (_, cpu) in doc_totals),
+                'wall_p50': percentile(doc_walls, 50),
+                'wall_p90': percentile(doc_walls, 90),
+                'wall_p99': percentile(doc_walls, 99),
+                },
+            'phases': phases,
+            'slowest': slowest_docs,
+            }
+        return report
+
+    def write_report(self, filename, slowest=10):
+        """
+        Write json report into given file.
+        """
+        report = self.build_report(slowest)
+        content = json.dumps(report, indent=2, sort_keys=True)
+        with io.open(filename, 'w', encoding='utf-8') as report_file:
+            # json.dumps() returns str in python 2
+            if not isinstance(content, type(u'')):
+                content = content.decode('utf-8')
+            report_file.write(content)
+
+
+class _NullContext(object):
+    """
+    Context manager which does nothing at all.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class NullPhaseTimer(object):
+    """
+    Drop-in replacement of PhaseTimer which doesn't measure anything, used
+    when timing is disabled.
+    """
+
+    _context = _NullContext()
+
+    def __len__(self):
+        return 0
+
+    def phase(self, docname, name):
+        return self._context
+
+    def add(self, docname, name, wall, cpu):
+        pass
+
+
+def profiled_handler(handler):
+    """
+    Wrap given sphinx event handler (which is called with ``app, doctree,
+    docname`` arguments) so that time spent in the handler is recorded in
+    ``env.pylatest_profile`` when ``pylatest_profile`` option is enabled.
+    """
+    @functools.wraps(handler)
+    def wrapper(app, doctree, docname):
+        timer = getattr(app.env, 'pylatest_profile', None)
+        if timer is None or not app.config.pylatest_profile:
+            return handler(app, doctree, docname)
+        with timer.phase(docname, handler.__name__):
+            return handler(app, doctree, docname)
+    return wrapper
+
+
+# transform class -> profiled subclass of the transform
+_profiled_transforms = {}
+
+
+def profiled_transform(transform_class):
+    """
+    Return a subclass of given docutils transform which records time spent in
+    it's ``apply()`` method in ``env.pylatest_profile``.
+
+    This works in sphinx context only, because the transform needs to
+    access sphinx build environment via document settings.
+    """
+    if transform_class in _profiled_transforms:
+        return _profiled_transforms[transform_class]
+
+    def apply(self, **kwargs):
+        env = self.document.settings.env
+        with env.pylatest_profile.phase(env.docname, transform_class.__name__):
+            transform_class.apply(self, **kwargs)
+
+    profiled_class = type(
+        transform_class.__name__, (transform_class,), {'apply': apply})
+    _profiled_transforms[transform_class] = profiled_class
+    return profiled_class
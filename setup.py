@@ -58,6 +58,9 @@ setup(
             'pylatest-rst2htmlplain=pylatest.main:pylatest2htmlplain',
             'pylatest-rst2pseudoxml=pylatest.main:pylatest2pseudoxml',
             'pylatest-preview=pylatest.main:pylatest_preview',
+            'pylatest-convertdirectives=pylatest.convertdirectives:main',
+            'pylatest-query=pylatest.catalog:main',
+            'pylatest-search=pylatest.catalog:search_main',
             ],
         },
     # https://packaging.python.org/specifications/core-metadata/#project-url-multiple-use
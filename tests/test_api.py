@@ -0,0 +1,193 @@
+# -*- coding: utf8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import os
+import textwrap
+
+import pytest
+
+import pylatest.api as api
+from pylatest.document import TestCaseDoc
+
+
+TESTCASE = textwrap.dedent(u"""\
+    Test Foo
+    ********
+
+    :author: joe.foo@example.com
+    :component: foo
+    :description: this is just a very long description, which doesn't
+                  fit on a single line
+
+    Description
+    ===========
+
+    This is just demonstration.
+
+    Test Steps
+    ==========
+
+    .. test_action::
+       :step: List files in the volume: ``ls -a /mnt/helloworld``
+       :result: There are no files, output should be empty.
+
+    .. test_action::
+       :step: Do this.
+       :result: And this should happen.
+    """)
+
+
+# headers which can be parsed without docutils
+QUICK_HEADERS = [
+    TESTCASE.replace(":author:", ":owner:"),
+    u"Test Foo\n********\n",
+    u"========\nTest Foo\n========\n\n:owner: joe\n:id: FOO-001\n",
+    u"Test Foo\n********\n\n:owner: joe\n\nDescription\n===========\n",
+    u"Test Foo\n********\n\n:owner: joe\n\n:id: FOO-001\n",
+    u"Test Foo\n********\n\n:owner:\n   joe\n   and alice\n",
+    u"Test Foo\n********\n\n:link: http://example.com\n",
+    ]
+
+# headers which parse_header() can't handle
+DOCUTILS_HEADERS = [
+    TESTCASE,
+    u"Test Foo\n********\n\nDescription\n===========\n\nNothing.\n",
+    u"Test *Foo*\n**********\n",
+    u"Test Foo\n********\n\n:owner: ``joe``\n",
+    u"Test Foo\n********\n\n:owner: *x*\n",
+    u"Test Foo\n********\n\n:docs: `docs <http://x>`_\n",
+    u"Test Foo\n********\n\n:owner: x\\_y\n",
+    u"Test Foo\n********\n\n:Author: joe\n",
+    u"Test Foo\n********\n\n:authors: a; b\n",
+    u"Test Foo\n********\n\n:owner: joe\n:version: 1.0\n",
+    u"Test Foo\n********\n\nSub\n===\n\n:author: joe\n",
+    u"Test Foo\n********\n\nSub\n===\n\n:owner: joe\n",
+    u"Test Foo\n***\n\n:author: joe\n",
+    u"Test Foo\n********\n\n:owner: a\n  b\n    c\n",
+    u"Test Foo\n********\n\n.. comment\n\n:owner: joe\n",
+    u"Just a paragraph.\n",
+    ]
+
+HEADERS = QUICK_HEADERS + DOCUTILS_HEADERS
+
+
+@pytest.fixture
+def clean_cache():
+    api.clear_cache()
+    yield
+    api.clear_cache()
+
+
+def write_file(path, content):
+    with io.open(str(path), 'w', encoding='utf-8') as rst_file:
+        rst_file.write(content)
+
+
+@pytest.mark.parametrize("rst_source", HEADERS)
+def test_parse_header_same_as_docutils(rst_source):
+    header = api.parse_header(rst_source)
+    assert header is None or header == api.parse_header_doctree(rst_source)
+    doc = api.LazyTestCaseDoc("test_foo.rst", rst_source)
+    assert (doc.title, doc.metadata) == api.parse_header_doctree(rst_source)
+
+
+@pytest.mark.parametrize("rst_source", QUICK_HEADERS)
+def test_parse_header(rst_source):
+    assert api.parse_header(rst_source) is not None
+
+
+@pytest.mark.parametrize("rst_source", DOCUTILS_HEADERS)
+def test_parse_header_gives_up(rst_source):
+    assert api.parse_header(rst_source) is None
+
+
+def test_parse_header_doctree_markup():
+    rst_source = u"Test *Foo*\n**********\n\n:author: ``joe``\n"
+    title, metadata = api.parse_header_doctree(rst_source)
+    assert title == "Test Foo"
+    assert metadata == {"author": "joe"}
+
+
+def test_load_header(tmpdir, clean_cache):
+    rst_file = tmpdir.join("test_foo.rst")
+    write_file(rst_file, TESTCASE)
+    doc = api.load(str(rst_file))
+    assert doc.path == str(rst_file)
+    assert doc.title == "Test Foo"
+    assert list(doc.metadata.keys()) == ["author", "component", "description"]
+    assert doc.metadata["component"] == "foo"
+    # sections and actions are not processed unless accessed
+    assert doc._sections_cache is None
+    assert doc._actions_cache is None
+
+
+def test_load_sections_and_actions(tmpdir, clean_cache):
+    rst_file = tmpdir.join("test_foo.rst")
+    write_file(rst_file, TESTCASE)
+    doc = api.load(str(rst_file))
+    assert set(doc.sections) == set([
+        TestCaseDoc._HEAD, TestCaseDoc.DESCR, TestCaseDoc.STEPS])
+    assert doc.missing_sections == [TestCaseDoc.SETUP, TestCaseDoc.TEARD]
+    assert doc.get_section(TestCaseDoc.DESCR) == \
+        "Description\n===========\n\nThis is just demonstration.\n"
+    assert len(doc.test_actions) == 2
+    results = [result for _, _, result in doc.test_actions]
+    assert "And this should happen." in results[1]
+
+
+def test_load_cache(tmpdir, clean_cache):
+    rst_file = tmpdir.join("test_foo.rst")
+    write_file(rst_file, TESTCASE)
+    doc = api.load(str(rst_file))
+    assert api.load(str(rst_file)) is doc
+    # relative path of the same file is cached as well
+    with tmpdir.as_cwd():
+        assert api.load("test_foo.rst") is doc
+    # the file is loaded again when it changes
+    write_file(rst_file, TESTCASE.replace("Test Foo", "Test Bar"))
+    mtime = os.stat(str(rst_file)).st_mtime + 10
+    os.utime(str(rst_file), (mtime, mtime))
+    new_doc = api.load(str(rst_file))
+    assert new_doc is not doc
+    assert new_doc.title == "Test Bar"
+    api.clear_cache()
+    assert api.load(str(rst_file)) is not new_doc
+
+
+def test_load_cache_size(tmpdir, clean_cache, monkeypatch):
+    monkeypatch.setattr(api, "CACHE_SIZE", 2)
+    paths = []
+    for name in ("test_one.rst", "test_two.rst", "test_three.rst"):
+        rst_file = tmpdir.join(name)
+        write_file(rst_file, TESTCASE)
+        paths.append(str(rst_file))
+    doc_one = api.load(paths[0])
+    doc_two = api.load(paths[1])
+    # recently used document is kept, while the least recently used one is
+    # dropped when the cache is full
+    assert api.load(paths[0]) is doc_one
+    api.load(paths[2])
+    assert len(api._cache) == 2
+    assert api.load(paths[0]) is doc_one
+    assert api.load(paths[1]) is not doc_two
+
+
+def test_load_missing_file(tmpdir, clean_cache):
+    with pytest.raises(OSError):
+        api.load(str(tmpdir.join("missing.rst")))
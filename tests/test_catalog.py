@@ -0,0 +1,278 @@
+# -*- coding: utf8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import json
+import sqlite3
+
+import pytest
+
+from pylatest.catalog import Catalog, CatalogVersionError, parse_condition
+import pylatest.catalog as catalog_module
+
+
+@pytest.fixture
+def catalog_file(tmpdir):
+    """
+    Create catalog file with few test cases.
+    """
+    filename = tmpdir.join("pylatest.db").strpath
+    catalog = Catalog(filename)
+    with catalog.transaction():
+        catalog.update(
+            "foo/test_one", "FOO-1", "Test One", "foo/test_one.rst",
+            [
+                (1, "List files: ls -a /mnt/volume", "Output is empty."),
+                (2, "Mount the volume.", None),
+            ],
+            {"author": "joe@example.com", "component": "foo"},
+            ["https://example.com/1"])
+        catalog.update(
+            "foo/test_two", None, "Test Two", "foo/test_two.rst",
+            [(1, "Run ls -l in home directory.", "File list is shown.")],
+            {"author": "alice@example.com", "component": "foo"},
+            [])
+        catalog.update(
+            "bar/test_ten", None, "Test Ten", "bar/test_ten.rst",
+            [
+                (1, "Create a file.", "File exists."),
+                (2, "Remove the file.", "Output of ls -a is empty."),
+                (3, "Check the log.", None),
+            ],
+            {"author": "joe@example.com", "component": "bar"},
+            ["https://example.com/1", "https://example.com/2"])
+    catalog.close()
+    return filename
+
+
+@pytest.mark.parametrize("condition, exp", [
+    ("author=joe@example.com", ("author", "=", "joe@example.com")),
+    ("component~foo*", ("component", "~", "foo*")),
+    ("title=a~b", ("title", "=", "a~b")),
+    ("title~a=b", ("title", "~", "a=b")),
+    ])
+def test_parse_condition(condition, exp):
+    assert parse_condition(condition) == exp
+
+
+@pytest.mark.parametrize("condition", ["author", "=foo", ""])
+def test_parse_condition_invalid(condition):
+    with pytest.raises(ValueError):
+        parse_condition(condition)
+
+
+def test_catalog_query(catalog_file):
+    catalog = Catalog(catalog_file)
+    rows = catalog.query([("author", "=", "joe@example.com")])
+    assert [row['docname'] for row in rows] == [
+        "bar/test_ten", "foo/test_one"]
+    rows = catalog.query([
+        ("author", "=", "joe@example.com"), ("component", "~", "f*")])
+    assert [row['testcase_id'] for row in rows] == ["FOO-1"]
+    rows = catalog.query(requirement="https://example.com/2")
+    assert [row['docname'] for row in rows] == ["bar/test_ten"]
+    assert len(catalog.query()) == 3
+    assert catalog.query([("author", "=", "nobody")]) == []
+    catalog.close()
+
+
+def test_catalog_update_remove(catalog_file):
+    catalog = Catalog(catalog_file)
+    with catalog.transaction():
+        catalog.update(
+            "foo/test_one", None, "Test One", "foo/test_one.rst",
+            [(1, "Unmount the volume.", None)],
+            {"author": "alice@example.com"}, [])
+        catalog.remove("bar/test_ten")
+        catalog.remove("missing")
+    assert catalog.get_docnames() == set(["foo/test_one", "foo/test_two"])
+    assert catalog.get_metadata("foo/test_one") == {
+        "author": "alice@example.com"}
+    assert catalog.get_requirements("foo/test_one") == []
+    assert catalog.query(requirement="https://example.com/1") == []
+    # full text search index is updated as well
+    assert [row['docname'] for row in catalog.search("volume")] == [
+        "foo/test_one"]
+    assert [row['docname'] for row in catalog.search("ls")] == [
+        "foo/test_two"]
+    catalog.close()
+
+
+def test_catalog_search(catalog_file):
+    catalog = Catalog(catalog_file)
+    rows = catalog.search('"ls -a"')
+    assert [(row['docname'], row['action_id']) for row in rows] == [
+        ("bar/test_ten", 2), ("foo/test_one", 1)]
+    assert rows[1]['step'] == "List files: ls -a /mnt/volume"
+    assert rows[1]['result'] == "Output is empty."
+    assert rows[1]['snippet'].startswith("List files: [ls")
+    # search in given column only
+    rows = catalog.search('"ls -a"', column="step")
+    assert [row['docname'] for row in rows] == ["foo/test_one"]
+    rows = catalog.search("empty", column="result")
+    assert [row['docname'] for row in rows] == [
+        "bar/test_ten", "foo/test_one"]
+    # all terms must match
+    rows = catalog.search("ls home")
+    assert [row['docname'] for row in rows] == ["foo/test_two"]
+    with pytest.raises(ValueError):
+        catalog.search("ls", column="title")
+    with pytest.raises(sqlite3.OperationalError):
+        catalog.search('"unterminated')
+    catalog.close()
+
+
+def test_catalog_schema_version(catalog_file):
+    conn = sqlite3.connect(catalog_file)
+    conn.execute("PRAGMA user_version = 1000")
+    conn.commit()
+    conn.close()
+    # catalog with unknown schema version is recreated from scratch
+    catalog = Catalog(catalog_file)
+    assert catalog.get_docnames() == set()
+    catalog.close()
+
+
+def test_catalog_readonly(catalog_file):
+    catalog = Catalog(catalog_file, readonly=True)
+    assert catalog.get_docnames() == set([
+        "foo/test_one", "foo/test_two", "bar/test_ten"])
+    assert catalog.fts is not None
+    with pytest.raises(sqlite3.OperationalError):
+        with catalog.transaction():
+            catalog.remove("foo/test_one")
+    catalog.close()
+
+
+def test_catalog_readonly_schema_version(catalog_file):
+    conn = sqlite3.connect(catalog_file)
+    conn.execute("PRAGMA user_version = 1000")
+    conn.commit()
+    conn.close()
+    # catalog with unknown schema version is reported, not recreated
+    with pytest.raises(CatalogVersionError):
+        Catalog(catalog_file, readonly=True)
+    conn = sqlite3.connect(catalog_file)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 1000
+    assert conn.execute("SELECT count(*) FROM testcases").fetchone()[0] == 3
+    conn.close()
+
+
+def test_catalog_search_fts4(tmpdir, monkeypatch):
+    # pretend that fts5 extension is not available
+    monkeypatch.setattr(catalog_module, "FTS_MODULES", ("fts4",))
+    filename = tmpdir.join("pylatest.db").strpath
+    catalog = Catalog(filename)
+    assert catalog.fts == "fts4"
+    with catalog.transaction():
+        catalog.update(
+            "test_one", None, "Test One", "test_one.rst",
+            [(1, "Run ls -a.", "Output is empty.")], {}, [])
+    rows = catalog.search("ls", column="step")
+    assert [(row['docname'], row['action_id']) for row in rows] == [
+        ("test_one", 1)]
+    assert rows[0]['snippet'] == "Run [ls] -a."
+    catalog.close()
+    # module of existing table is detected
+    monkeypatch.setattr(catalog_module, "FTS_MODULES", ("fts5", "fts4"))
+    catalog = Catalog(filename)
+    assert catalog.fts == "fts4"
+    with catalog.transaction():
+        catalog.remove("test_one")
+    assert catalog.search("ls") == []
+    catalog.close()
+
+
+def test_main(catalog_file, capsys):
+    assert catalog_module.main([catalog_file, "component=foo"]) == 0
+    out, _ = capsys.readouterr()
+    assert out == (
+        "foo/test_one\tFOO-1\tTest One\n"
+        "foo/test_two\t\tTest Two\n")
+    assert catalog_module.main(["--count", catalog_file]) == 0
+    out, _ = capsys.readouterr()
+    assert out == "3\n"
+
+
+def test_main_json(catalog_file, capsys):
+    retcode = catalog_module.main([
+        "--json", "-r", "https://example.com/2", catalog_file])
+    assert retcode == 0
+    out, _ = capsys.readouterr()
+    assert json.loads(out) == [{
+        "docname": "bar/test_ten",
+        "testcase_id": None,
+        "title": "Test Ten",
+        "source": "bar/test_ten.rst",
+        "actions": 3,
+        "metadata": {"author": "joe@example.com", "component": "bar"},
+        "requirements": ["https://example.com/1", "https://example.com/2"],
+        }]
+
+
+def test_search_main(catalog_file, capsys):
+    assert catalog_module.search_main([catalog_file, "--step", "ls"]) == 0
+    out, _ = capsys.readouterr()
+    assert out == (
+        "foo/test_one\t1\tList files: [ls] -a /mnt/volume\n"
+        "foo/test_two\t1\tRun [ls] -l in home directory.\n")
+    assert catalog_module.search_main(["-l", catalog_file, "file*"]) == 0
+    out, _ = capsys.readouterr()
+    assert out == "bar/test_ten\nfoo/test_one\nfoo/test_two\n"
+
+
+def test_search_main_json(catalog_file, capsys):
+    assert catalog_module.search_main(["-j", catalog_file, "mount"]) == 0
+    out, _ = capsys.readouterr()
+    assert json.loads(out) == [{
+        "docname": "foo/test_one",
+        "action_id": 2,
+        "step": "Mount the volume.",
+        "result": None,
+        }]
+
+
+def test_search_main_invalid_query(catalog_file, capsys):
+    assert catalog_module.search_main([catalog_file, '"ls']) == 1
+    _, err = capsys.readouterr()
+    assert "search failed" in err
+
+
+def test_main_missing_catalog(tmpdir, capsys):
+    filename = tmpdir.join("missing.db").strpath
+    assert catalog_module.main([filename]) == 1
+    _, err = capsys.readouterr()
+    assert "not found" in err
+    assert catalog_module.search_main([filename, "ls"]) == 1
+    assert not tmpdir.join("missing.db").check()
+
+
+def test_main_schema_version(catalog_file, capsys):
+    conn = sqlite3.connect(catalog_file)
+    conn.execute("PRAGMA user_version = 1000")
+    conn.commit()
+    conn.close()
+    assert catalog_module.main([catalog_file]) == 1
+    _, err = capsys.readouterr()
+    assert "schema version 1000" in err
+    assert catalog_module.search_main([catalog_file, "ls"]) == 1
+    _, err = capsys.readouterr()
+    assert "schema version 1000" in err
+    # catalog is kept as it is
+    conn = sqlite3.connect(catalog_file)
+    assert conn.execute("SELECT count(*) FROM testcases").fetchone()[0] == 3
+    conn.close()
@@ -0,0 +1,193 @@
+# -*- coding: utf8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import textwrap
+
+import pytest
+
+from pylatest.xdocutils.core import register_all
+import pylatest.convertdirectives as convertdirectives
+
+
+OLD_SOURCE = textwrap.dedent('''\
+    Test Steps
+    ==========
+
+    .. test_step:: 1
+
+        List files in the volume: ``ls -a /mnt/helloworld``
+
+    .. test_result:: 1
+
+        There are no files, output should be empty.
+
+    .. test_step:: 2
+
+        Donec et mollis dolor::
+
+            $ foo --extra sth
+
+    Teardown
+    ========
+
+    Nothing to do.
+    ''')
+
+NEW_SOURCE = textwrap.dedent('''\
+    Test Steps
+    ==========
+
+    .. test_action::
+       :step:
+           List files in the volume: ``ls -a /mnt/helloworld``
+       :result:
+           There are no files, output should be empty.
+
+    .. test_action::
+       :step:
+           Donec et mollis dolor::
+
+               $ foo --extra sth
+
+    Teardown
+    ========
+
+    Nothing to do.
+    ''')
+
+
+@pytest.fixture(autouse=True)
+def register():
+    register_all(use_plain=True)
+
+
+@pytest.fixture
+def rst_tree(tmpdir):
+    """
+    Create directory tree with rst files, some of them with old directives.
+    """
+    tmpdir.join("src", "foo", "test_old.rst").write(OLD_SOURCE, ensure=True)
+    tmpdir.join("src", "foo", "test_new.rst").write(NEW_SOURCE, ensure=True)
+    tmpdir.join("src", "bar", "test_old.rst").write(OLD_SOURCE, ensure=True)
+    tmpdir.join("src", ".hidden", "test_old.rst").write(
+        OLD_SOURCE, ensure=True)
+    tmpdir.join("src", "bar", "notes.txt").write(OLD_SOURCE, ensure=True)
+    return tmpdir
+
+
+def test_convert_directives():
+    assert convertdirectives.convert_directives(OLD_SOURCE) == NEW_SOURCE
+
+
+def test_convert_directives_result_without_step():
+    src = textwrap.dedent('''\
+    .. test_result:: 1
+
+        There are no files, output should be empty.
+    ''')
+    with pytest.raises(ValueError):
+        convertdirectives.convert_directives(src)
+
+
+def test_convert_directives_nested():
+    src = textwrap.dedent('''\
+    * Foo.
+
+      .. test_step:: 1
+
+          List files in the volume: ``ls -a /mnt/helloworld``
+    ''')
+    with pytest.raises(ValueError):
+        convertdirectives.convert_directives(src)
+
+
+def test_find_rst_files(rst_tree):
+    src_dir = rst_tree.join("src").strpath
+    exp_files = [
+        os.path.join(src_dir, "bar", "test_old.rst"),
+        os.path.join(src_dir, "foo", "test_new.rst"),
+        os.path.join(src_dir, "foo", "test_old.rst"),
+        ]
+    assert list(convertdirectives.find_rst_files([src_dir])) == exp_files
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main(rst_tree, jobs, capsys):
+    src_dir = rst_tree.join("src")
+    old_file = src_dir.join("foo", "test_old.rst")
+    old_file.chmod(0o600)
+    new_file = src_dir.join("foo", "test_new.rst")
+    new_mtime = new_file.mtime()
+    retcode = convertdirectives.main(["-j", jobs, src_dir.strpath])
+    assert retcode == 0
+    assert old_file.read() == NEW_SOURCE
+    assert src_dir.join("bar", "test_old.rst").read() == NEW_SOURCE
+    # file permissions are preserved
+    assert old_file.stat().mode & 0o777 == 0o600
+    # files without old directives are not touched
+    assert new_file.mtime() == new_mtime
+    assert src_dir.join(".hidden", "test_old.rst").read() == OLD_SOURCE
+    assert src_dir.join("bar", "notes.txt").read() == OLD_SOURCE
+    out, err = capsys.readouterr()
+    assert "2 converted, 1 without deprecated directives, 0 failed" in err
+    assert old_file.strpath in out
+
+
+def test_main_dry_run(rst_tree, capsys):
+    src_dir = rst_tree.join("src")
+    retcode = convertdirectives.main(["-n", "-j", "1", src_dir.strpath])
+    assert retcode == 0
+    assert src_dir.join("foo", "test_old.rst").read() == OLD_SOURCE
+    out, err = capsys.readouterr()
+    assert "2 to convert" in err
+
+
+def test_main_failed(rst_tree, capsys):
+    src_dir = rst_tree.join("src")
+    broken_file = src_dir.join("foo", "test_broken.rst")
+    broken_file.write(".. test_result:: 1\n\n    Foo.\n")
+    retcode = convertdirectives.main(["-j", "1", src_dir.strpath])
+    assert retcode == 1
+    # failed file is left untouched, while other files are converted
+    assert broken_file.read() == ".. test_result:: 1\n\n    Foo.\n"
+    assert src_dir.join("foo", "test_old.rst").read() == NEW_SOURCE
+    out, err = capsys.readouterr()
+    assert "{0}: test_result 1 without test_step".format(
+        broken_file.strpath) in err
+    assert "2 converted, 1 without deprecated directives, 1 failed" in err
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_severe_error(rst_tree, jobs, capsys):
+    src_dir = rst_tree.join("src")
+    # inline markup in the title makes sure that the file is parsed via
+    # docutils (which fails on the include), not just scanned
+    broken_source = "Test *Foo*\n==========\n\n" + OLD_SOURCE + \
+        "\n.. include:: /nonexistent.rst\n"
+    broken_file = src_dir.join("foo", "test_broken.rst")
+    broken_file.write(broken_source)
+    retcode = convertdirectives.main(["-j", jobs, src_dir.strpath])
+    assert retcode == 1
+    # severe docutils error is reported as failure of the single file
+    assert broken_file.read() == broken_source
+    assert src_dir.join("foo", "test_old.rst").read() == NEW_SOURCE
+    assert src_dir.join("bar", "test_old.rst").read() == NEW_SOURCE
+    out, err = capsys.readouterr()
+    assert "{0}: ".format(broken_file.strpath) in err
+    assert "2 converted, 1 without deprecated directives, 1 failed" in err
@@ -177,6 +177,11 @@ class TestSection(unittest.TestCase):
         ''')
         assert s1.get_rst_header() == exp_output
 
+    def test_section_slots(self):
+        s1 = Section("Description")
+        assert not hasattr(s1, "__dict__")
+        assert repr(s1) == "Section(Description)"
+
 
 class TestTestCaseDoc(unittest.TestCase):
     """
@@ -200,6 +205,16 @@ class TestTestCaseDoc(unittest.TestCase):
         assert not TestCaseDoc.has_section(title="Requirements")
         assert not TestCaseDoc.has_section("Foo Bar")
 
+    def test_find_section(self):
+        # predefined section objects are reused
+        assert TestCaseDoc.find_section("Description") is TestCaseDoc.DESCR
+        assert TestCaseDoc.find_section("Test Steps") is TestCaseDoc.STEPS
+        assert TestCaseDoc.find_section("__header__") is TestCaseDoc._HEAD
+        # new object is created for any other section
+        section = TestCaseDoc.find_section("Foo Bar")
+        assert section == Section("Foo Bar")
+        assert section.html_id == "foo bar"
+
 
 class TestRstTestCaseDoc(unittest.TestCase):
 
@@ -640,6 +655,37 @@ class TestXmlExportTestCaseDoc(unittest.TestCase):
         with pytest.raises(pylatest.document.PylatestDocumentError):
             tc = XmlExportTestCaseDoc(content_type="foo")
 
+    def test_xmltestcasedoc_bad_fragmenttype(self):
+        assert "foo" not in XmlExportTestCaseDoc.FRAGMENT_TYPES
+        with pytest.raises(pylatest.document.PylatestDocumentError):
+            tc = XmlExportTestCaseDoc(fragment_type="foo")
+
+    def test_xmltestcasedoc_fragment_serialized(self):
+        tc = XmlExportTestCaseDoc(
+            fragment_type=XmlExportTestCaseDoc.SERIALIZED)
+        html_tree = etree.fromstring(
+            '<div xmlns="http://www.w3.org/1999/xhtml">'
+            '<p>This is a description</p><p>And this is not.</p></div>')
+        tc.add_section(XmlExportTestCaseDoc.DESCR, html_tree[0])
+        # only the fragment itself is stored (with it's tail text and flag
+        # whether the namespaces were inherited from the source tree)
+        assert tc.get_section(XmlExportTestCaseDoc.DESCR) == (
+            b'<p xmlns="http://www.w3.org/1999/xhtml">'
+            b'This is a description</p>', None, True)
+
+    def test_xmltestcasedoc_fragment_detached(self):
+        tc = XmlExportTestCaseDoc(
+            fragment_type=XmlExportTestCaseDoc.DETACHED)
+        html_tree = etree.fromstring(
+            '<div xmlns="http://www.w3.org/1999/xhtml">'
+            '<p>This is a description</p><p>And this is not.</p></div>')
+        tc.add_section(XmlExportTestCaseDoc.DESCR, html_tree[0])
+        content = tc.get_section(XmlExportTestCaseDoc.DESCR)
+        # the stored element is a copy, without any link to source tree
+        assert content is not html_tree[0]
+        assert content.getroottree().getroot() is not html_tree
+        assert content.getparent().tag == "fragments"
+
 
 class TestXmlExportTestCaseDocBuild(unittest.TestCase):
 
@@ -858,3 +904,86 @@ class TestXmlExportTestCaseDocBuild(unittest.TestCase):
         </testcase>
         ''')
         assert tc.build_xml_string() == exp_xml
+
+    def test_xmltestcasedoc_build_xml_fragment_types(self):
+        """
+        Check that all fragment types produce the same xml export document,
+        and that the build can be repeated for compact fragment types.
+        """
+        results = []
+        for fragment_type in XmlExportTestCaseDoc.FRAGMENT_TYPES:
+            tc = XmlExportTestCaseDoc(fragment_type=fragment_type)
+            tc.add_section(
+                XmlExportTestCaseDoc.DESCR,
+                etree.fromstring('<p xmlns="http://www.w3.org/1999/xhtml">This is a description</p>'))
+            tc.add_test_action(
+                "test_step",
+                etree.fromstring('<p xmlns="http://www.w3.org/1999/xhtml">Step.</p>'),
+                1)
+            results.append(tc.build_xml_string())
+            if fragment_type != XmlExportTestCaseDoc.ELEMENT:
+                assert tc.build_xml_string() == results[-1]
+        assert results[0] == results[1] == results[2]
+
+
+class TestXmlExportTestCaseDocFingerprint(unittest.TestCase):
+
+    def build_doc(self, description, fragment_type=None, title="Foo"):
+        tc = XmlExportTestCaseDoc(
+            title=title, testcase_id="/foo", fragment_type=fragment_type)
+        tc.add_metadata("component", "bar")
+        tc.add_metadata("importance", "high")
+        tc.add_section(XmlExportTestCaseDoc.DESCR, etree.fromstring(
+            '<div xmlns="http://www.w3.org/1999/xhtml">{0}</div>'.format(
+                description)))
+        tc.add_test_action("test_step", etree.fromstring(
+            '<p xmlns="http://www.w3.org/1999/xhtml">Step.</p>'), 1)
+        tc.add_test_action("test_result", etree.fromstring(
+            '<p xmlns="http://www.w3.org/1999/xhtml">Result.</p>'), 1)
+        return tc
+
+    def test_xmltestcasedoc_fingerprint_stable(self):
+        fingerprint = self.build_doc("<p>Description.</p>").fingerprint()
+        assert len(fingerprint) == 64
+        # doesn't change when computed again, nor with other fragment types
+        for fragment_type in XmlExportTestCaseDoc.FRAGMENT_TYPES:
+            tc = self.build_doc("<p>Description.</p>", fragment_type)
+            assert tc.fingerprint() == fingerprint
+            assert tc.fingerprint() == fingerprint
+
+    def test_xmltestcasedoc_fingerprint_whitespace(self):
+        fingerprint = self.build_doc("<p>Description.</p>").fingerprint()
+        tc = self.build_doc("\n  <p>Description.</p>\n")
+        assert tc.fingerprint() == fingerprint
+        # but whitespace in actual text is not ignored
+        tc = self.build_doc("<p>Description. </p>")
+        assert tc.fingerprint() != fingerprint
+
+    def test_xmltestcasedoc_fingerprint_metadata_order(self):
+        tc1 = XmlExportTestCaseDoc()
+        tc1.add_metadata("component", "bar")
+        tc1.add_metadata("importance", "high")
+        tc2 = XmlExportTestCaseDoc()
+        tc2.add_metadata("importance", "high")
+        tc2.add_metadata("component", "bar")
+        assert tc1.fingerprint() == tc2.fingerprint()
+
+    def test_xmltestcasedoc_fingerprint_changes(self):
+        fingerprints = set([
+            self.build_doc("<p>Description.</p>").fingerprint(),
+            self.build_doc("<p>Description!</p>").fingerprint(),
+            self.build_doc("<p>Description.</p>", title="Bar").fingerprint(),
+            self.build_doc("<p class='x'>Description.</p>").fingerprint(),
+            self.build_doc("<p>Descr<b>iption.</b></p>").fingerprint(),
+            self.build_doc("<p>Descr</p><p>iption.</p>").fingerprint(),
+            XmlExportTestCaseDoc().fingerprint(),
+            XmlExportTestCaseDoc(testcase_id="/foo").fingerprint(),
+            ])
+        assert len(fingerprints) == 8
+
+    def test_xmltestcasedoc_fingerprint_action_changes(self):
+        tc1 = self.build_doc("<p>Description.</p>")
+        tc2 = self.build_doc("<p>Description.</p>")
+        tc2.add_test_action("test_step", etree.fromstring(
+            '<p xmlns="http://www.w3.org/1999/xhtml">Step.</p>'), 2)
+        assert tc1.fingerprint() != tc2.fingerprint()
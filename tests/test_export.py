@@ -33,6 +33,19 @@ import pylatest.export as export
 HTML = "{%s}" % export.NS['html']
 
 
+def libxml2_serializes_siblings():
+    """
+    Check if libxml2 serializes following siblings of an element of xhtml
+    document along with the element (which happens with some versions).
+    """
+    html_tree = etree.fromstring(
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" '
+        '"http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">'
+        '<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+        '<p>one</p><p>two</p></body></html>')
+    return b"two" in etree.tostring(html_tree[0][0])
+
+
 @pytest.fixture
 def empty_html_string():
     return textwrap.dedent("""\
@@ -458,6 +471,61 @@ def test_build_xml_testcase_doc_fulltestcase_actions(fulltestcase_html_string):
     assert result_el == None
 
 
+@pytest.mark.parametrize(
+    "content_type", XmlExportTestCaseDoc.CONTENT_TYPES)
+def test_build_xml_testcase_doc_fragment_types(
+        fulltestcase_html_string, content_type):
+    """
+    All fragment types produce the same xml export document from real html.
+    """
+    results = []
+    fingerprints = []
+    for fragment_type in XmlExportTestCaseDoc.FRAGMENT_TYPES:
+        doc = export.build_xml_testcase_doc(
+            fulltestcase_html_string,
+            content_type=content_type,
+            fragment_type=fragment_type)
+        fingerprints.append(doc.fingerprint())
+        results.append(doc.build_xml_string())
+    assert fingerprints[0] == fingerprints[1] == fingerprints[2]
+    if content_type == XmlExportTestCaseDoc.CDATA:
+        # detached and serialized fragments are not affected by the libxml2
+        # issue, while default element fragments keep their original output
+        assert results[1] == results[2]
+        if libxml2_serializes_siblings():
+            pytest.xfail("libxml2 serializes siblings of xhtml elements")
+        # html content in CDATA keeps declaration of xhtml namespace
+        assert '<![CDATA[<div xmlns="http://www.w3.org/1999/xhtml" ' in \
+            results[0]
+    assert results[0] == results[1] == results[2]
+    if content_type == XmlExportTestCaseDoc.MIXEDCONTENT:
+        assert '<html:div xmlns:html="http://www.w3.org/1999/xhtml"' in \
+            results[0]
+
+
+def test_build_xml_testcase_doc_serialized_tail():
+    """
+    Serialized fragment with text after the element (tail) can be loaded.
+    """
+    html_source = textwrap.dedent('''\
+    <html xmlns="http://www.w3.org/1999/xhtml">
+    <body>
+    <h1>Foo</h1>
+    <div class="pylatest_action" action_id="1" action_name="test_step">Step.</div>tail text
+    </body>
+    </html>
+    ''')
+    results = []
+    for fragment_type in XmlExportTestCaseDoc.FRAGMENT_TYPES:
+        doc = export.build_xml_testcase_doc(
+            html_source,
+            content_type=XmlExportTestCaseDoc.PLAINTEXT,
+            fragment_type=fragment_type)
+        results.append(doc.build_xml_string())
+    assert results[0] == results[1] == results[2]
+    assert "Step.tail text" in results[0]
+
+
 def test_build_xml_export_doc_empty():
     export_doc = export.build_xml_export_doc()
     exp_xml = textwrap.dedent('''\
@@ -553,3 +621,55 @@ def test_build_xml_export_doc_testcases_many():
     </testcases>
     ''')
     assert xmltostring(export_doc) == exp_xml
+
+
+def test_export_manifest_load_missing(tmpdir):
+    assert export.ExportManifest.load(tmpdir.join("nope.json").strpath) \
+        is None
+    broken_file = tmpdir.join("broken.json")
+    broken_file.write("{")
+    assert export.ExportManifest.load(broken_file.strpath) is None
+
+
+def test_export_manifest_save_load(tmpdir):
+    manifest = export.ExportManifest("abc")
+    manifest.add("foo", "/foo", "f00")
+    manifest.add("bar", None, "ba7")
+    manifest_file = tmpdir.join("fingerprints.json").strpath
+    manifest.save(manifest_file)
+    loaded = export.ExportManifest.load(manifest_file)
+    assert loaded.config_fingerprint == "abc"
+    assert loaded.testcases == manifest.testcases
+
+
+def test_export_manifest_compare():
+    previous = export.ExportManifest("abc")
+    previous.add("foo", "/foo", "f00")
+    previous.add("bar", "/bar", "ba7")
+    previous.add("baz", "/baz", "ba2")
+    manifest = export.ExportManifest("abc")
+    manifest.add("foo", "/foo", "f00")
+    manifest.add("bar", "/bar", "ba8")
+    manifest.add("qux", "/qux", "90x")
+    assert manifest.compare(previous) == {
+        "added": [{"docname": "qux", "id": "/qux"}],
+        "changed": [{"docname": "bar", "id": "/bar"}],
+        "removed": [{"docname": "baz", "id": "/baz"}],
+        "unchanged": 1,
+        }
+    # without previous manifest, everything is added
+    delta = manifest.compare(None)
+    assert len(delta["added"]) == 3
+    # everything changes with export configuration
+    delta = export.ExportManifest("xyz").compare(previous)
+    assert len(delta["removed"]) == 3
+    manifest.config_fingerprint = "xyz"
+    delta = manifest.compare(previous)
+    assert len(delta["changed"]) == 2
+    assert delta["unchanged"] == 0
+
+
+def test_get_config_fingerprint():
+    fingerprint = export.get_config_fingerprint({"a": 1, "b": [1, 2]})
+    assert fingerprint == export.get_config_fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint != export.get_config_fingerprint({"a": 1, "b": [2]})
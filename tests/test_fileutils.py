@@ -0,0 +1,41 @@
+# -*- coding: utf8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import pylatest.utils as utils
+
+
+def test_write_atomic(tmpdir):
+    path = tmpdir.join("foo.html")
+    utils.write_atomic(str(path), b"one")
+    assert path.read_binary() == b"one"
+    utils.write_atomic(str(path), b"two")
+    assert path.read_binary() == b"two"
+    # no temporary files are left behind
+    assert tmpdir.listdir() == [path]
+
+
+def test_has_same_content(tmpdir):
+    path = tmpdir.join("foo.xml")
+    assert not utils.has_same_content(str(path), b"one")
+    path.write_binary(b"one")
+    assert utils.has_same_content(str(path), b"one")
+    # same size, different content
+    assert not utils.has_same_content(str(path), b"two")
+    assert not utils.has_same_content(str(path), b"three")
+    # directory is never considered the same
+    assert not utils.has_same_content(str(tmpdir), b"")
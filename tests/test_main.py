@@ -0,0 +1,213 @@
+# -*- coding: utf8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import textwrap
+
+import pytest
+
+from pylatest.xdocutils.core import pylatest_publish_parts
+import pylatest.main as main
+
+
+RST_SOURCE = textwrap.dedent('''\
+    Test Steps
+    ==========
+
+    .. test_action::
+       :step: List files in the volume: ``ls -a /mnt/helloworld``
+       :result: There are no files, output should be empty.
+    ''')
+
+
+@pytest.fixture
+def rst_tree(tmpdir):
+    """
+    Create directory tree with few rst files.
+    """
+    for name in ("foo/test_one.rst", "foo/test_two.rst", "bar/test_one.rst"):
+        tmpdir.join("src", name).write(RST_SOURCE, ensure=True)
+    return tmpdir
+
+
+def test_is_batch_mode():
+    assert main.is_batch_mode(["--output-dir", "out", "foo.rst"])
+    assert main.is_batch_mode(["foo.rst", "--output-dir=out"])
+    assert not main.is_batch_mode(["foo.rst", "foo.html"])
+    assert not main.is_batch_mode([])
+
+
+@pytest.mark.parametrize("paths, exp_dir", [
+    (["/foo/bar/a.rst"], "/foo/bar"),
+    (["/foo/bar/a.rst", "/foo/bar/b.rst"], "/foo/bar"),
+    (["/foo/bar/a.rst", "/foo/baz/b.rst"], "/foo"),
+    (["/foo/bar/a.rst", "/foo/bar/baz/b.rst"], "/foo/bar"),
+    (["/foo/a.rst", "/bar/b.rst"], "/"),
+    ])
+def test_get_common_dir(paths, exp_dir):
+    assert main.get_common_dir(paths) == exp_dir
+
+
+def test_get_output_path():
+    output_path = main.get_output_path(
+        "/foo/bar/test_one.rst", "/foo", "/tmp/out", "html")
+    assert output_path == "/tmp/out/bar/test_one.html"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_publish(rst_tree, jobs):
+    src_dir = rst_tree.join("src")
+    out_dir = rst_tree.join("out")
+    sources = [str(p) for p in src_dir.visit("*.rst")]
+    retcode = main.batch_publish(
+        ["--output-dir", str(out_dir), "-j", jobs] + sources,
+        use_plain=True)
+    assert retcode == 0
+    html_files = sorted(p.relto(out_dir) for p in out_dir.visit("*.html"))
+    assert html_files == sorted([
+        os.path.join("foo", "test_one.html"),
+        os.path.join("foo", "test_two.html"),
+        os.path.join("bar", "test_one.html"),
+        ])
+    # output is the same as when the files are rendered one by one
+    exp_html = pylatest_publish_parts(
+        RST_SOURCE.encode("utf-8"),
+        source_path=str(src_dir.join("foo", "test_one.rst")),
+        writer_name='html',
+        use_plain=True)['whole']
+    assert out_dir.join("foo", "test_one.html").read_text("utf-8") == exp_html
+
+
+def test_batch_publish_skip_uptodate(rst_tree, capsys):
+    src_dir = rst_tree.join("src")
+    out_dir = rst_tree.join("out")
+    sources = [str(p) for p in src_dir.visit("*.rst")]
+    argv = ["--output-dir", str(out_dir), "-j", "1"] + sources
+    assert main.batch_publish(argv) == 0
+    # make one source file newer than it's output
+    out_file = out_dir.join("foo", "test_two.html")
+    out_mtime = out_file.mtime()
+    src_dir.join("foo", "test_two.rst").setmtime(out_mtime + 10)
+    capsys.readouterr()
+    assert main.batch_publish(argv) == 0
+    _, err = capsys.readouterr()
+    assert "1 rendered, 2 up to date, 0 failed" in err
+    # and --force renders everything again
+    assert main.batch_publish(argv + ["--force"]) == 0
+    _, err = capsys.readouterr()
+    assert "3 rendered, 0 up to date, 0 failed" in err
+
+
+def test_batch_publish_missing_file(rst_tree, capsys):
+    out_dir = rst_tree.join("out")
+    sources = [
+        str(rst_tree.join("src", "foo", "test_one.rst")),
+        str(rst_tree.join("src", "foo", "missing.rst")),
+        ]
+    retcode = main.batch_publish(
+        ["--output-dir", str(out_dir), "-j", "1"] + sources)
+    assert retcode == 1
+    _, err = capsys.readouterr()
+    assert "missing.rst" in err
+    assert "1 rendered, 0 up to date, 1 failed" in err
+    assert out_dir.join("test_one.html").check()
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_publish_severe_error(rst_tree, jobs, capsys):
+    src_dir = rst_tree.join("src")
+    out_dir = rst_tree.join("out")
+    src_dir.join("foo", "test_bad.rst").write(
+        RST_SOURCE + "\n.. include:: /nonexistent.rst\n")
+    sources = [str(p) for p in src_dir.visit("*.rst")]
+    retcode = main.batch_publish(
+        ["--output-dir", str(out_dir), "-j", jobs] + sources)
+    assert retcode == 1
+    # severe docutils error is reported as failure of the single file
+    _, err = capsys.readouterr()
+    assert "test_bad.rst" in err
+    assert "3 rendered, 0 up to date, 1 failed" in err
+    assert not out_dir.join("foo", "test_bad.html").check()
+    assert out_dir.join("foo", "test_two.html").check()
+    assert out_dir.join("bar", "test_one.html").check()
+
+
+def test_watch_publish(rst_tree, monkeypatch):
+    src_path = str(rst_tree.join("src", "foo", "test_one.rst"))
+    out_path = rst_tree.join("test_one.html")
+
+    def fake_watch(path, render):
+        # render the file just once instead of waiting for changes
+        with open(path, 'rb') as src_file:
+            render(src_file.read())
+
+    monkeypatch.setattr(main, "watch", fake_watch)
+    retcode = main.watch_publish(
+        ["--watch", src_path, str(out_path)], use_plain=True)
+    assert retcode == 0
+    exp_html = pylatest_publish_parts(
+        RST_SOURCE.encode("utf-8"),
+        source_path=src_path,
+        writer_name='html',
+        use_plain=True)['whole']
+    assert out_path.read_text("utf-8") == exp_html
+
+
+BROKEN_SOURCE = RST_SOURCE + "\n.. include:: /nonexistent.rst\n"
+
+
+def test_watch_publish_severe_error(rst_tree, monkeypatch, capsys):
+    src_path = str(rst_tree.join("src", "foo", "test_one.rst"))
+    out_path = rst_tree.join("test_one.html")
+
+    def fake_watch(path, render):
+        # the file is broken for a while during editing
+        render(BROKEN_SOURCE.encode("utf-8"))
+        render(RST_SOURCE.encode("utf-8"))
+
+    monkeypatch.setattr(main, "watch", fake_watch)
+    retcode = main.watch_publish(
+        ["--watch", src_path, str(out_path)], use_plain=True)
+    assert retcode == 0
+    _, err = capsys.readouterr()
+    assert "Error: {0}: ".format(src_path) in err
+    assert "rendered into" in err
+    assert "List files in the volume" in out_path.read_text("utf-8")
+
+
+def test_watch_preview_severe_error(rst_tree, monkeypatch, capsys):
+    src_path = str(rst_tree.join("src", "foo", "test_one.rst"))
+    shown = []
+
+    class FakePopen(object):
+        def __init__(self, args, stdin=None):
+            pass
+
+        def communicate(self, data):
+            shown.append(data)
+
+    def fake_watch(path, render):
+        render(BROKEN_SOURCE.encode("utf-8"))
+        render(RST_SOURCE.encode("utf-8"))
+
+    monkeypatch.setattr(main, "watch", fake_watch)
+    monkeypatch.setattr(main.subprocess, "Popen", FakePopen)
+    assert main.watch_preview(["--watch", src_path]) == 0
+    _, err = capsys.readouterr()
+    assert "Error: {0}: ".format(src_path) in err
+    assert len(shown) == 1
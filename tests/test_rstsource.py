@@ -16,11 +16,15 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import ast
+import io
 import os
 import textwrap
 import unittest
 
-from pylatest.document import TestCaseDoc
+import pytest
+
+from pylatest.document import TestActions, TestCaseDoc
 import pylatest.rstsource as rstsource
 import pylatest.xdocutils.core
 
@@ -332,6 +336,21 @@ class TestFindSections(unittest.TestCase):
         assert rstsource.find_sections(src) == exp_sections
 
 
+class TestRstLocationObjects(unittest.TestCase):
+
+    def test_rstsection_compact(self):
+        section = rstsource.RstSection("Setup", 3, 5)
+        assert not hasattr(section, "__dict__")
+        assert section == rstsource.RstSection("Setup", 3, 5)
+        assert repr(section) == "RstSection('Setup', 3, 5)"
+
+    def test_rsttestaction_compact(self):
+        action = rstsource.RstTestAction(1, "test_step", 3, 5)
+        assert not hasattr(action, "__dict__")
+        assert action == rstsource.RstTestAction(1, "test_step", 3, 5)
+        assert repr(action) == "RstTestAction(1, test_step, 3, 5)"
+
+
 class TestGetLastLine(unittest.TestCase):
 
     def test_get_last_line_num_null(self):
@@ -714,3 +733,212 @@ class TestFindActions(unittest.TestCase):
             rstsource.RstTestAction(5, "test_step", 37, 41),
             ]
         assert rstsource.find_actions(src) == exp_actions
+
+
+class TestScanner(unittest.TestCase):
+    """
+    Tests of lexical scanner (scan_sections() and scan_actions() functions),
+    see also differential tests below.
+    """
+
+    def setUp(self):
+        # commons steps required for all test cases
+        pylatest.xdocutils.core.register_all(use_plain=True)
+
+    def test_scan_sections_simpledoc(self):
+        src = textwrap.dedent('''\
+        Section One
+        ***********
+
+        Foo.
+
+        Section Two
+        ***********
+
+        Bar.
+        ''')
+        exp_sections = [
+            rstsource.RstSection("Section One", 1, 4),
+            rstsource.RstSection("Section Two", 6, 9),
+            ]
+        assert rstsource.scan_sections(src) == exp_sections
+
+    def test_scan_sections_subtitle(self):
+        # document with title and lone subsection, which docutils promotes
+        # into subtitle, is left for docutils to process
+        src = textwrap.dedent('''\
+        Hello World
+        ***********
+
+        Foo
+        ===
+
+        Bar.
+        ''')
+        assert rstsource.scan_sections(src) is None
+        assert rstsource.find_sections(src, fast=True) == \
+            rstsource.find_sections(src)
+
+    def test_scan_sections_inline_markup(self):
+        src = textwrap.dedent('''\
+        Section ``One``
+        ***************
+
+        Foo.
+        ''')
+        assert rstsource.scan_sections(src) is None
+        assert rstsource.find_sections(src, fast=True) == [
+            rstsource.RstSection("Section One", 1, 4),
+            ]
+
+    def test_scan_actions_test_action(self):
+        src = textwrap.dedent('''\
+        Test Steps
+        ==========
+
+        .. test_action::
+           :step: List files in the volume: ``ls -a /mnt/helloworld``
+           :result: There are no files, output should be empty.
+
+        .. test_action::
+           :step:
+               Donec et mollis dolor::
+
+                   $ foo --extra sth
+                   $ bar -vvv
+
+           :result: Maecenas congue ligula ac quam viverra nec
+              consectetur ante hendrerit.
+        ''')
+        actions = rstsource.scan_actions(src)
+        assert [(a.action_name, a.start_line, a.end_line) for a in actions] \
+            == [
+                ("test_step", 3, 2),
+                ("test_result", 4, 6),
+                ("test_step", 8, 11),
+                ("test_result", 13, 16),
+                ]
+        # test step and result of the same directive share action id
+        assert actions[0].action_id == actions[1].action_id
+        assert actions[2].action_id == actions[3].action_id
+        assert actions[0].action_id != actions[2].action_id
+
+    def test_scan_actions_nested(self):
+        # directives nested in other constructs are not recognized
+        src = textwrap.dedent('''\
+        * .. test_step:: 1
+
+             Foo.
+        ''')
+        assert rstsource.scan_actions(src) is None
+
+    def test_scan_actions_ambiguous_next_node(self):
+        # end line of the action depends on line number of the next node,
+        # which scanner knows for paragraphs and sections only
+        src = textwrap.dedent('''\
+        .. test_step:: 1
+
+            Foo.
+
+        * bar
+        ''')
+        assert rstsource.scan_actions(src) is None
+        assert rstsource.find_actions(src, fast=True) == [
+            rstsource.RstTestAction(1, "test_step", 1, 3),
+            ]
+
+
+def _get_dedent_literals(filename):
+    """
+    Extract rst sources used in test cases from given python module (all
+    string literals passed to textwrap.dedent() function).
+    """
+    with io.open(filename, encoding="utf-8") as py_file:
+        tree = ast.parse(py_file.read())
+    sources = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or len(node.args) == 0:
+            continue
+        if getattr(node.func, 'attr', None) != "dedent":
+            continue
+        # ast.Str is replaced by ast.Constant since python 3.8
+        arg = node.args[0]
+        value = getattr(arg, 'value', getattr(arg, 's', None))
+        if isinstance(value, (type(u''), type(''))):
+            sources.append(textwrap.dedent(value))
+    return sources
+
+
+def _get_rst_fixtures():
+    """
+    Collect rst sources from test fixtures and examples from this repository.
+    """
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    fixtures = []
+    for dirpath, dirnames, filenames in os.walk(tests_dir):
+        # skip output of sphinx test builds
+        if "build" in dirnames:
+            dirnames.remove("build")
+        for filename in sorted(filenames):
+            if filename.endswith(".rst"):
+                fixtures.append(os.path.join(dirpath, filename))
+    fixtures.append(os.path.join(
+        tests_dir, os.pardir, "contrib", "testcase.example.rst"))
+    sources = []
+    for filename in sorted(fixtures):
+        with io.open(filename, encoding="utf-8") as rst_file:
+            sources.append(rst_file.read())
+    for module in ("test_rstsource.py", "pysource/test_pysource.py"):
+        sources.extend(
+            _get_dedent_literals(os.path.join(tests_dir, module)))
+    return sources
+
+
+RST_FIXTURES = _get_rst_fixtures()
+
+
+def _normalize_actions(actions):
+    """
+    Replace action ids generated for test_action directives (which are based
+    on current time) with sequence numbers.
+    """
+    auto_ids = {}
+    result = []
+    for action in actions:
+        action_id = action.action_id
+        if action_id > TestActions.MIN_AUTO_ID:
+            action_id = -auto_ids.setdefault(action_id, len(auto_ids) + 1)
+        result.append((
+            action_id, action.action_name, action.start_line, action.end_line))
+    return result
+
+
+@pytest.mark.parametrize("rst_source", RST_FIXTURES)
+def test_scan_sections_differential(rst_source):
+    pylatest.xdocutils.core.register_all(use_plain=True)
+    sections = rstsource.scan_sections(rst_source)
+    if sections is None:
+        pytest.skip("scanner can't process this source")
+    assert sections == rstsource.find_sections(rst_source)
+
+
+@pytest.mark.parametrize("rst_source", RST_FIXTURES)
+def test_scan_actions_differential(rst_source):
+    pylatest.xdocutils.core.register_all(use_plain=True)
+    actions = rstsource.scan_actions(rst_source)
+    if actions is None:
+        pytest.skip("scanner can't process this source")
+    assert _normalize_actions(actions) == \
+        _normalize_actions(rstsource.find_actions(rst_source))
+
+
+def test_scanner_coverage():
+    """
+    Make sure that the scanner is actually able to process most of the
+    fixtures, so that the differential tests above are meaningful.
+    """
+    sections = [rstsource.scan_sections(src) for src in RST_FIXTURES]
+    actions = [rstsource.scan_actions(src) for src in RST_FIXTURES]
+    assert sum(1 for s in sections if s is not None) > len(RST_FIXTURES) / 2
+    assert sum(1 for a in actions if a is not None) > len(RST_FIXTURES) / 2
+    assert sum(1 for a in actions if a) > 20
@@ -0,0 +1,92 @@
+# -*- coding: utf8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import pylatest.watch as watch
+
+
+class FakeWatcher(object):
+    """
+    Watcher which instead of waiting for changes of the file modifies the
+    file itself, using given list of new contents.
+    """
+
+    def __init__(self, path, contents):
+        self.path = path
+        self.contents = list(contents)
+        self.closed = False
+
+    def wait(self):
+        if len(self.contents) == 0:
+            raise KeyboardInterrupt
+        with open(self.path, 'wb') as out:
+            out.write(self.contents.pop(0))
+
+    def close(self):
+        self.closed = True
+
+
+def test_content_hash():
+    assert watch.content_hash(b"foo") == watch.content_hash(b"foo")
+    assert watch.content_hash(b"foo") != watch.content_hash(b"bar")
+
+
+def test_watch_renders_changed_content_only(tmpdir):
+    path = tmpdir.join("foo.rst")
+    path.write_binary(b"one")
+    watcher = FakeWatcher(str(path), [b"two", b"two", b"three", b"three"])
+    rendered = []
+    watch.watch(str(path), rendered.append, watcher)
+    assert rendered == [b"one", b"two", b"three"]
+    assert watcher.closed
+
+
+@pytest.mark.parametrize("watcher_class", [
+    watch.PollingWatcher,
+    pytest.param(
+        watch.InotifyWatcher,
+        marks=pytest.mark.skipif(
+            not sys.platform.startswith("linux"),
+            reason="inotify is available on linux only")),
+    ])
+def test_watcher_detects_change(tmpdir, watcher_class):
+    path = tmpdir.join("foo.rst")
+    path.write("one")
+    if watcher_class is watch.PollingWatcher:
+        watcher = watcher_class(str(path), interval=0.05, debounce=0.05)
+    else:
+        watcher = watcher_class(str(path), debounce=0.05)
+
+    def modify():
+        time.sleep(0.2)
+        # replace the file via rename, as many editors do
+        tmpdir.join("foo.rst.new").write("two, which is longer")
+        os.rename(str(tmpdir.join("foo.rst.new")), str(path))
+
+    thread = threading.Thread(target=modify)
+    thread.start()
+    watcher.wait()
+    thread.join()
+    watcher.close()
+    assert path.read() == "two, which is longer"
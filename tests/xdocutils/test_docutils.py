@@ -26,9 +26,13 @@ rst source into html build and then checks the result.
 
 import textwrap
 
+from docutils.readers import standalone
+from docutils.utils import SystemMessage
 import pytest
 
+from pylatest.xdocutils.core import PylatestPublisher
 from pylatest.xdocutils.core import pylatest_publish_parts
+from pylatest.xdocutils.nodes import test_action_node
 
 
 def _publish_html(rst_input, use_plain=True):
@@ -599,3 +603,56 @@ def test_actions_plain_full_example(rst_input_full_example):
     </div>
     ''')
     assert _publish_html(rst_input_full_example, use_plain=True) == exp_result
+
+
+@pytest.mark.parametrize("use_plain", [True, False])
+def test_publisher_same_as_publish_parts(rst_input_full_example, use_plain):
+    publisher = PylatestPublisher(writer_name='html', use_plain=use_plain)
+    parts = publisher.publish_parts(rst_input_full_example)
+    exp_result = _publish_html(rst_input_full_example, use_plain=use_plain)
+    assert parts['html_body'] == exp_result
+
+
+def test_publisher_render_many(rst_input_full_example):
+    publisher = PylatestPublisher(writer_name='html', use_plain=True)
+    rst_sources = [
+        rst_input_full_example,
+        "Ceterum censeo Carthaginem esse delendam",
+        (rst_input_full_example, "test_foo.rst"),
+        ]
+    results = publisher.render_many(rst_sources)
+    assert len(results) == 3
+    # each document has it's own dict with parts
+    assert results[0] is not results[2]
+    assert results[0]['html_body'] == results[2]['html_body']
+    assert results[0]['html_body'] == _publish_html(rst_input_full_example)
+    assert "Carthaginem" in results[1]['html_body']
+    assert "Carthaginem" not in results[0]['html_body']
+
+
+def test_publisher_publish_string():
+    publisher = PylatestPublisher(writer_name='pseudoxml')
+    output = publisher.publish_string("Ceterum censeo Carthaginem esse delendam")
+    assert isinstance(output, bytes)
+    assert b"<paragraph>" in output
+
+
+def test_publisher_publish_doctree(rst_input_full_example):
+    publisher = PylatestPublisher(
+        writer_name='null', reader=standalone.Reader())
+    doctree = publisher.publish_doctree(rst_input_full_example)
+    assert doctree.tagname == "document"
+    # there is a node for each test_step and test_result directive (6 in the
+    # 1st variant of the input), or for each test_action directive (4 in the
+    # 2nd variant)
+    assert len(doctree.traverse(test_action_node)) in (4, 6)
+
+
+@pytest.mark.parametrize("method", [
+    "publish_parts", "publish_string", "publish_doctree"])
+def test_publisher_severe_error(method):
+    publisher = PylatestPublisher(writer_name='html')
+    # severe error raises an exception (as docutils.core.publish_* functions
+    # do), instead of exiting the whole process
+    with pytest.raises(SystemMessage):
+        getattr(publisher, method)("T\n=\n\n.. include:: /nonexistent\n")
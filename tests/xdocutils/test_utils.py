@@ -28,6 +28,7 @@ import pytest
 from pylatest.xdocutils.core import pylatest_publish_parts
 from pylatest.xdocutils.readers import NoDocInfoReader
 from pylatest.xdocutils.utils import get_field_list
+from pylatest.xdocutils.utils import get_requirement_key
 from pylatest.xdocutils.utils import get_testcase_id
 from pylatest.xdocutils.utils import get_testcase_requirements
 
@@ -253,3 +254,19 @@ def test_get_testcase_requirements_many_list_url_link():
     # and expected content
     assert results[0].astext() == "https://example.com/foo"
     assert results[1].astext() == "https://example.com/bar"
+
+
+def test_get_requirement_key():
+    doctree = _publish(textwrap.dedent('''\
+    Test Foo
+    ********
+
+    :author: joe.foo@example.com
+    :requirements:
+      - `Foo <https://example.com/foo>`_
+      - FOO-130
+    '''))
+    results = get_testcase_requirements(doctree)
+    # url is used as a key of references, text for everything else
+    assert get_requirement_key(results[0]) == "https://example.com/foo"
+    assert get_requirement_key(results[1]) == "FOO-130"
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import os
+import time
+
+import pytest
+
+from pylatest.catalog import Catalog
+
+
+def get_catalog(app):
+    return Catalog(os.path.join(app.doctreedir, "pylatest.db"))
+
+
+def touch_file(filename, content):
+    with io.open(filename, "w", encoding="utf-8") as f:
+        f.write(content)
+    # make sure sphinx considers the file changed
+    mtime = time.time() + 10
+    os.utime(filename, (mtime, mtime))
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='testdefaults-nested',
+    srcdir='catalog',
+    confoverrides={'pylatest_catalog': 'pylatest.db'})
+def test_catalog(app, status, warning):
+    app.builder.build_all()
+    catalog = get_catalog(app)
+    # only test cases are in the catalog
+    assert catalog.get_docnames() == set([
+        "foo/test_one", "foo/test_two", "bar/test_ten", "bar/test_elewen"])
+    row = catalog.query([("component", "=", "foo")])[0]
+    assert row['docname'] == "foo/test_one"
+    assert row['title'] == "Test One"
+    assert row['source'] == "foo/test_one.rst"
+    assert row['actions'] == 1
+    # metadata are stored with test_defaults applied
+    assert catalog.get_metadata("bar/test_ten") == {
+        "author": "joe@example.com",
+        "component": "bar",
+        "importance": "medium",
+        }
+    rows = catalog.query([
+        ("author", "=", "joe@example.com"), ("importance", "~", "me*")])
+    assert [row['docname'] for row in rows] == [
+        "bar/test_elewen", "bar/test_ten"]
+    # test actions are in full text search index
+    rows = catalog.search("happen", column="result")
+    assert len(rows) == 4
+    assert rows[0]['docname'] == "bar/test_elewen"
+    assert rows[0]['action_id'] == 1
+    assert rows[0]['step'] == "Do this."
+    assert catalog.search("happen", column="step") == []
+    catalog.close()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='testdefaults-nested',
+    srcdir='catalog_incremental',
+    confoverrides={'pylatest_catalog': 'pylatest.db'})
+def test_catalog_incremental(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    # change of a test case
+    touch_file(
+        os.path.join(app.srcdir, "foo", "test_two.rst"),
+        u"Test Two Changed\n"
+        u"****************\n\n"
+        u":author: alice@example.com\n\n"
+        u".. test_action::\n"
+        u"   :step: Do this.\n")
+    # removal of a test case
+    os.unlink(os.path.join(app.srcdir, "bar", "test_elewen.rst"))
+    app = make_app(*args, **kwargs)
+    app.build()
+    catalog = get_catalog(app)
+    assert catalog.get_docnames() == set([
+        "foo/test_one", "foo/test_two", "bar/test_ten"])
+    rows = catalog.query([("author", "=", "alice@example.com")])
+    assert [row['title'] for row in rows] == ["Test Two Changed"]
+    assert catalog.get_metadata("foo/test_two")["component"] == "foo"
+    rows = catalog.search("happen")
+    assert [row['docname'] for row in rows] == ["bar/test_ten", "foo/test_one"]
+    catalog.close()
+    # change of test_defaults updates test cases which were not changed
+    touch_file(
+        os.path.join(app.srcdir, "bar", "index.rst"),
+        u"Bar Tests\n"
+        u"=========\n\n"
+        u".. test_defaults::\n"
+        u"   :component: baz\n\n"
+        u".. toctree::\n"
+        u"   :glob:\n\n"
+        u"   test_*\n")
+    app = make_app(*args, **kwargs)
+    app.build()
+    catalog = get_catalog(app)
+    assert catalog.get_metadata("bar/test_ten") == {
+        "author": "joe@example.com",
+        "component": "baz",
+        }
+    catalog.close()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='requirementlist-url-flat',
+    srcdir='catalog_requirements',
+    confoverrides={'pylatest_catalog': 'pylatest.db'})
+def test_catalog_requirements(app, status, warning):
+    app.builder.build_all()
+    catalog = get_catalog(app)
+    assert catalog.get_requirements("test_foo") == [
+        "http://example.com/",
+        "https://bugzilla.redhat.com/show_bug.cgi?id=1",
+        ]
+    rows = catalog.query(
+        requirement="https://bugzilla.redhat.com/show_bug.cgi?id=1")
+    assert [row['docname'] for row in rows] == ["test_bar", "test_foo"]
+    catalog.close()
+
+
+@pytest.mark.sphinx('html', testroot='testdefaults-nested', srcdir='catalog_off')
+def test_catalog_disabled(app, status, warning):
+    app.builder.build_all()
+    assert not os.path.exists(os.path.join(app.doctreedir, "pylatest.db"))
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import json
+import os
+import time
+
+import pytest
+
+from pylatest.xsphinx.builders import format_csv
+
+
+RHBZ_1 = "https://bugzilla.redhat.com/show_bug.cgi?id=1"
+
+
+def load_coverage(app):
+    with io.open(os.path.join(app.outdir, "coverage.json")) as json_file:
+        return json.load(json_file)
+
+
+def test_format_csv():
+    rows = [("requirement", "docname"), (u"FOO, 1", u"test_é")]
+    assert format_csv(rows) == \
+        u'requirement,docname\n"FOO, 1",test_é\n'.encode('utf-8')
+
+
+@pytest.mark.sphinx('pylatest-coverage', testroot='requirementlist-url-flat')
+def test_coverage(app, status, warning):
+    app.builder.build_all()
+    assert load_coverage(app) == {
+        "requirements": {
+            "http://example.com/": ["test_foo"],
+            RHBZ_1: ["test_bar", "test_foo"],
+            },
+        "testcases": {
+            "test_bar": [RHBZ_1],
+            "test_foo": ["http://example.com/", RHBZ_1],
+            },
+        }
+    csv_file = os.path.join(app.outdir, "coverage.csv")
+    with io.open(csv_file, encoding="utf-8") as f:
+        assert f.read() == (
+            "requirement,docname\n"
+            "http://example.com/,test_foo\n"
+            "{0},test_bar\n"
+            "{0},test_foo\n").format(RHBZ_1)
+    # no document is rendered
+    assert sorted(os.listdir(app.outdir)) == ["coverage.csv", "coverage.json"]
+
+
+@pytest.mark.sphinx(
+    'pylatest-coverage',
+    testroot='requirementlist-url-flat',
+    srcdir='coverage_incremental',
+    confoverrides={'pylatest_coverage_csv': None})
+def test_coverage_incremental(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert not os.path.exists(os.path.join(app.outdir, "coverage.csv"))
+    # test case which no longer covers any requirement
+    filename = os.path.join(app.srcdir, "test_bar.rst")
+    with io.open(filename, "w", encoding="utf-8") as f:
+        f.write(
+            u"Test Bar\n"
+            u"********\n\n"
+            u".. test_action::\n"
+            u"   :step: Do this.\n")
+    mtime = time.time() + 10
+    os.utime(filename, (mtime, mtime))
+    app = make_app(*args, **kwargs)
+    app.builder.build_update()
+    coverage = load_coverage(app)
+    assert coverage["requirements"][RHBZ_1] == ["test_foo"]
+    assert "test_bar" not in coverage["testcases"]
+
+
+@pytest.mark.sphinx('pylatest-coverage', testroot='requirementlist-nested')
+def test_coverage_nested(app, status, warning):
+    app.builder.build_all()
+    coverage = load_coverage(app)
+    assert coverage["requirements"]["FOO-ALL"] == [
+        "baz/test_one", "baz/test_two", "test_bar", "test_foo"]
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+
+def read_file(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_compress',
+    confoverrides={
+        'pylatest_export_compress': True,
+        'pylatest_export_compress_level': 1,
+        'pylatest_export_index': 'index.json',
+        })
+def test_export_compress(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    gz_file = os.path.join(app.outdir, "test_bar.xml.gz")
+    assert not os.path.exists(os.path.join(app.outdir, "test_bar.xml"))
+    gz_content = read_file(gz_file)
+    # compressed output is the same for each build
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert read_file(gz_file) == gz_content
+    # gzip header doesn't contain mtime
+    assert gz_content[4:8] == b"\0\0\0\0"
+    with gzip.open(gz_file, "rb") as f:
+        content = f.read()
+    assert content.startswith(b"<?xml version='1.0' encoding='utf-8'?>")
+    assert b"<title>Test Bar</title>" in content
+    # index refers to the compressed files
+    with io.open(os.path.join(app.outdir, "index.json")) as index_file:
+        index = json.load(index_file)
+    assert index["test_bar"]["path"] == "test_bar.xml.gz"
+    assert index["test_bar"]["size"] == len(content)
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_compress_same',
+    confoverrides={'pylatest_export_compress': True})
+def test_export_compress_same_content(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    with gzip.open(os.path.join(app.outdir, "test_foo.xml.gz"), "rb") as f:
+        content = f.read()
+    # uncompressed output of the same project
+    kwargs['confoverrides'] = {}
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert read_file(os.path.join(app.outdir, "test_foo.xml")) == content
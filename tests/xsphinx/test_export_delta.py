@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import json
+import os
+
+import pytest
+from sphinx.errors import ConfigError
+
+
+def load_json(filename):
+    with io.open(filename, encoding='utf-8') as json_file:
+        return json.load(json_file)
+
+
+def docnames(delta, status):
+    return [item['docname'] for item in delta[status]]
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_manifest',
+    confoverrides={'pylatest_export_manifest': 'fingerprints.json'})
+def test_export_manifest(app, status, warning):
+    app.builder.build_all()
+    manifest = load_json(os.path.join(app.outdir, "fingerprints.json"))
+    assert manifest['version'] == 1
+    assert sorted(manifest['testcases']) == [
+        "foo/bar/test_one", "foo/bar/test_two", "test_bar", "test_foo"]
+    assert manifest['testcases']['test_bar']['id'] == "/test_bar"
+    assert len(manifest['testcases']['test_bar']['fingerprint']) == 64
+    # delta report is not created without delta mode
+    assert os.listdir(app.outdir).count("delta.json") == 0
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_delta',
+    confoverrides={
+        'pylatest_export_manifest': 'fingerprints.json',
+        'pylatest_export_delta': 'delta.json',
+        })
+def test_export_delta(app_params, make_app):
+    args, kwargs = app_params
+    srcdir = kwargs['srcdir']
+
+    # first build, without previous manifest, exports all test cases
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    delta = load_json(os.path.join(app.outdir, "delta.json"))
+    assert docnames(delta, "added") == [
+        "foo/bar/test_one", "foo/bar/test_two", "test_bar", "test_foo"]
+    assert delta["changed"] == delta["removed"] == []
+    assert delta["unchanged"] == 0
+    assert os.path.exists(os.path.join(app.outdir, "test_bar.xml"))
+
+    # second build, nothing changed so nothing is exported
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    delta = load_json(os.path.join(app.outdir, "delta.json"))
+    assert delta["added"] == delta["changed"] == delta["removed"] == []
+    assert delta["unchanged"] == 4
+    assert not os.path.exists(os.path.join(app.outdir, "test_bar.xml"))
+
+    # third build, after one test case is changed and another one removed
+    with io.open(srcdir / "test_bar.rst", "a", encoding="utf-8") as rst_file:
+        rst_file.write(u"\n#. And one more cleanup step.\n")
+    os.unlink(srcdir / "test_foo.rst")
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    delta = load_json(os.path.join(app.outdir, "delta.json"))
+    assert delta["added"] == []
+    assert delta["changed"] == [{"docname": "test_bar", "id": "/test_bar"}]
+    assert delta["removed"] == [{"docname": "test_foo", "id": "/test_foo"}]
+    assert delta["unchanged"] == 2
+    assert os.path.exists(os.path.join(app.outdir, "test_bar.xml"))
+    assert not os.path.exists(os.path.join(app.outdir, "test_foo.xml"))
+    assert not os.path.exists(
+        os.path.join(app.outdir, "foo", "bar", "test_one.xml"))
+    manifest = load_json(os.path.join(app.outdir, "fingerprints.json"))
+    assert "test_foo" not in manifest['testcases']
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_delta_config',
+    confoverrides={
+        'pylatest_export_manifest': 'fingerprints.json',
+        'pylatest_export_delta': 'delta.json',
+        })
+def test_export_delta_config_change(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    # all test cases are exported again when export config changes
+    kwargs['confoverrides'] = dict(
+        kwargs['confoverrides'], pylatest_export_content_type="CDATA")
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    delta = load_json(os.path.join(app.outdir, "delta.json"))
+    assert len(delta["changed"]) == 4
+    assert delta["unchanged"] == 0
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_delta_nomanifest',
+    confoverrides={'pylatest_export_delta': 'delta.json'})
+def test_export_delta_without_manifest(app_params, make_app):
+    args, kwargs = app_params
+    with pytest.raises(ConfigError):
+        make_app(*args, **kwargs)
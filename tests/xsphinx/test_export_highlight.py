@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import threading
+
+import pytest
+
+from pylatest.xsphinx.builders import CachingPygmentsBridge
+
+
+def read_file(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def test_highlighter_cache():
+    highlighter = CachingPygmentsBridge('html', 'sphinx', cache_size=2)
+    output = highlighter.highlight_block(
+        "ls -l", "console", location=("foo", 1))
+    assert '<div class="highlight">' in output
+    # location doesn't affect highlighted output
+    assert highlighter.highlight_block(
+        "ls -l", "console", location=("bar", 2)) is output
+    assert highlighter.hits == 1
+    assert highlighter.misses == 1
+    # other highlight options do
+    assert highlighter.highlight_block(
+        "ls -l", "console", opts={}, linenos=True, hl_lines=[1]) != output
+    assert highlighter.misses == 2
+    # when the cache is full, least recently used item is dropped
+    highlighter.highlight_block("ls -l", "console")
+    highlighter.highlight_block("pwd", "console")
+    assert len(highlighter.cache) == 2
+    highlighter.highlight_block("ls -l", "console", opts={}, linenos=True)
+    assert highlighter.misses == 4
+
+
+def test_highlighter_no_cache():
+    highlighter = CachingPygmentsBridge('html', 'sphinx', cache_size=0)
+    output = highlighter.highlight_block("ls -l", "console")
+    assert highlighter.highlight_block("ls -l", "console") == output
+    assert len(highlighter.cache) == 0
+
+
+def test_highlighter_disabled():
+    highlighter = CachingPygmentsBridge('html', 'sphinx', highlight=False)
+    output = highlighter.highlight_block("ls -l > <foo>", "console")
+    assert output == "<pre>ls -l &gt; &lt;foo&gt;</pre>\n"
+
+
+def test_highlighter_threads():
+    highlighter = CachingPygmentsBridge('html', 'sphinx', cache_size=8)
+    sources = ["echo {0}".format(i % 16) for i in range(200)]
+    expected = dict(
+        (source, CachingPygmentsBridge('html', 'sphinx').highlight_block(
+            source, "console"))
+        for source in set(sources))
+    results = []
+
+    def highlight_all():
+        for source in sources:
+            output = highlighter.highlight_block(source, "console")
+            results.append(output == expected[source])
+
+    threads = [threading.Thread(target=highlight_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 800
+    assert all(results)
+    assert len(highlighter.cache) <= 8
+
+
+@pytest.mark.sphinx('xmlexport', testroot='export_highlight')
+def test_export_highlight_cache(app, status, warning):
+    app.builder.build_all()
+    # the same code block is highlighted just once
+    assert app.builder.highlighter.misses == 1
+    assert app.builder.highlighter.hits == 1
+    content = read_file(os.path.join(app.outdir, "test_two.xml"))
+    assert b'class="highlight"' in content
+    assert b'systemctl' in content
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_highlight',
+    srcdir='export_highlight_disabled',
+    confoverrides={'pylatest_export_highlight': False})
+def test_export_highlight_disabled(app, status, warning):
+    app.builder.build_all()
+    assert app.builder.highlighter.misses == 0
+    content = read_file(os.path.join(app.outdir, "test_one.xml"))
+    assert b'class="highlight"' not in content
+    assert b'<html:pre># systemctl status sshd</html:pre>' in content
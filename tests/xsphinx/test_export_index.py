@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='requirementlist-url-flat',
+    srcdir='export_index_json',
+    confoverrides={'pylatest_export_index': 'index.json'})
+def test_export_index_json(app, status, warning):
+    app.builder.build_all()
+    with io.open(os.path.join(app.outdir, "index.json")) as index_file:
+        index = json.load(index_file)
+    # only test case documents are included
+    assert sorted(index) == ["test_bar", "test_foo"]
+    entry = index["test_foo"]
+    assert entry["id"] == "/test_foo"
+    assert entry["lookup_method"] == "custom"
+    assert entry["title"] == "Test Foo"
+    assert entry["path"] == "test_foo.xml"
+    assert entry["requirements"] == [
+        "https://bugzilla.redhat.com/show_bug.cgi?id=1",
+        "http://example.com/",
+        ]
+    # size and hash match content of the xml export file
+    with open(os.path.join(app.outdir, entry["path"]), "rb") as xml_file:
+        content = xml_file.read()
+    assert entry["size"] == len(content)
+    assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='requirementlist-url-flat',
+    srcdir='export_index_jsonl',
+    confoverrides={
+        'pylatest_export_index': 'index.jsonl',
+        'pylatest_export_lookup_method': 'id,custom',
+        })
+def test_export_index_jsonl(app, status, warning):
+    app.builder.build_all()
+    with io.open(os.path.join(app.outdir, "index.jsonl")) as index_file:
+        entries = [json.loads(line) for line in index_file]
+    assert [entry["docname"] for entry in entries] == ["test_bar", "test_foo"]
+    assert entries[0]["lookup_method"] == "custom"
+    assert entries[0]["requirements"] == [
+        "https://bugzilla.redhat.com/show_bug.cgi?id=1"]
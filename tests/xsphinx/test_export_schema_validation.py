@@ -16,19 +16,26 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import os
+
 import pytest
 
 from lxml import etree
+from sphinx.errors import ConfigError
 
 from testutil import xmlparse_testcase
 
 
+# XML Schema of xml export documents, as expected by the xml importer
+SCHEMA_FILE = "tests/xsphinx/import-testcases.xsd"
+
+
 @pytest.fixture
 def xml_schema():
     """
     Returns lxml object with XMLSchema of xml export document.
     """
-    with open("tests/xsphinx/import-testcases.xsd", "r") as schema_file:
+    with open(SCHEMA_FILE, "r") as schema_file:
         schema_doc = etree.parse(schema_file)
         schema = etree.XMLSchema(schema_doc)
         yield schema
@@ -43,3 +50,51 @@ def test_xml_schema_validation(app, status, warning, xml_schema):
     # validate the xml documents
     assert xml_schema.validate(bar_tree)
     assert xml_schema.validate(baz_tree)
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_schema_validation',
+    srcdir='export_schema_option',
+    confoverrides={
+        'pylatest_export_schema': os.path.abspath(SCHEMA_FILE),
+        'pylatest_export_timing_report': 'timing.json',
+        })
+def test_export_schema_option(app, status, warning):
+    app.builder.build_all()
+    # schema is compiled just once for the whole build
+    assert app.builder.schema is not None
+    assert app.builder.timer.build_report()['phases']['validate']['count'] \
+        == 2
+    assert "is not valid" not in warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_schema_validation',
+    srcdir='export_schema_option_invalid',
+    confoverrides={
+        # relative path is evaluated with respect to the config directory
+        'pylatest_export_schema': 'strict.xsd',
+        })
+def test_export_schema_option_invalid(app, status, warning):
+    app.builder.build_all()
+    # each invalid document is reported as sphinx warning, with location
+    # of it's source file
+    for docname in ("test_bar", "test_baz"):
+        assert "{0}.rst: WARNING: xml export is not valid".format(docname) \
+            in warning.getvalue()
+    assert "project-id" in warning.getvalue()
+    # invalid xml export files are still written
+    assert os.path.exists(os.path.join(app.outdir, "test_bar.xml"))
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_schema_validation',
+    srcdir='export_schema_option_missing',
+    confoverrides={'pylatest_export_schema': 'missing.xsd'})
+def test_export_schema_option_missing(app_params, make_app):
+    args, kwargs = app_params
+    with pytest.raises(ConfigError):
+        make_app(*args, **kwargs)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import json
+import os
+
+from lxml import etree
+import pytest
+
+from pylatest.export import pack_shards
+
+
+def read_file(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def list_shards(outdir):
+    shards_dir = os.path.join(outdir, "shards")
+    shards = []
+    for dirpath, dirnames, filenames in os.walk(shards_dir):
+        for filename in filenames:
+            shard_path = os.path.join(dirpath, filename)
+            shards.append(os.path.relpath(shard_path, shards_dir))
+    return sorted(shards)
+
+
+def get_testcase_titles(shard_file):
+    tree = etree.parse(shard_file)
+    return [e.text for e in tree.findall("/testcase/title")]
+
+
+@pytest.mark.parametrize("sizes, max_count, max_bytes, base_size, exp", [
+    ([], 0, 0, 0, []),
+    ([1, 2, 3], 0, 0, 0, [(0, 3)]),
+    ([1, 2, 3], 2, 0, 0, [(0, 2), (2, 3)]),
+    ([1, 2, 3, 4], 0, 6, 0, [(0, 3), (3, 4)]),
+    ([1, 2, 3, 4], 0, 6, 1, [(0, 2), (2, 3), (3, 4)]),
+    ([1, 9, 1, 1], 0, 5, 0, [(0, 1), (1, 2), (2, 4)]),
+    ([1, 1, 1, 1], 3, 3, 1, [(0, 2), (2, 4)]),
+    ])
+def test_pack_shards(sizes, max_count, max_bytes, base_size, exp):
+    assert pack_shards(sizes, max_count, max_bytes, base_size) == exp
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_shards',
+    confoverrides={
+        'pylatest_export_shards': True,
+        'pylatest_export_shard_max_testcases': 3,
+        'pylatest_export_index': 'index.json',
+        })
+def test_export_shards(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    # test cases are not written into separate files
+    assert not os.path.exists(os.path.join(app.outdir, "test_bar.xml"))
+    assert list_shards(app.outdir) == [
+        "testcases-0001.xml", "testcases-0002.xml"]
+    shard_1 = os.path.join(app.outdir, "shards", "testcases-0001.xml")
+    shard_2 = os.path.join(app.outdir, "shards", "testcases-0002.xml")
+    # shards are ordered by docname
+    assert get_testcase_titles(shard_1) == [
+        "Test One", "Test Two", "Test Bar"]
+    assert get_testcase_titles(shard_2) == ["Test Foo"]
+    # each shard has it's own properties header
+    tree = etree.parse(shard_2)
+    assert tree.xpath(
+        "/testcases/properties/property[@name='lookup-method']/@value") \
+        == ["custom"]
+    # index refers to the shard files
+    with io.open(os.path.join(app.outdir, "index.json")) as index_file:
+        index = json.load(index_file)
+    assert index["test_foo"]["path"] == "shards/testcases-0002.xml"
+    assert index["test_foo"]["size"] == len(read_file(shard_2))
+    # rebuild produces the same shards, which are not written again
+    shard_content = read_file(shard_1)
+    os.utime(shard_1, (1000, 1000))
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert read_file(shard_1) == shard_content
+    assert os.stat(shard_1).st_mtime == 1000
+    # shards which are no longer produced are removed
+    kwargs['confoverrides'] = dict(
+        kwargs['confoverrides'], pylatest_export_shard_max_testcases=0)
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert list_shards(app.outdir) == ["testcases-0001.xml"]
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_shards_bytes',
+    confoverrides={'pylatest_export_shards': True})
+def test_export_shards_max_bytes(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    shard_file = os.path.join(app.outdir, "shards", "testcases-0001.xml")
+    shard_size = len(read_file(shard_file))
+    # size limit which fits all but one of the test cases
+    kwargs['confoverrides'] = dict(
+        kwargs['confoverrides'],
+        pylatest_export_shard_max_bytes=shard_size - 1)
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    shards = list_shards(app.outdir)
+    assert shards == ["testcases-0001.xml", "testcases-0002.xml"]
+    for shard in shards:
+        shard_file = os.path.join(app.outdir, "shards", shard)
+        assert len(read_file(shard_file)) <= shard_size - 1
+    assert "exceeds" not in app._warning.getvalue()
+    # size limit which no test case fits in
+    kwargs['confoverrides']['pylatest_export_shard_max_bytes'] = 10
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert len(list_shards(app.outdir)) == 4
+    assert "xml export of foo/bar/test_one exceeds" in \
+        app._warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_shards_by_dir',
+    confoverrides={
+        'pylatest_export_shards': True,
+        'pylatest_export_shard_by_dir': True,
+        })
+def test_export_shards_by_dir(app, status, warning):
+    app.builder.build_all()
+    assert list_shards(app.outdir) == [
+        os.path.join("foo", "testcases-0001.xml"), "testcases-0001.xml"]
+    shard_file = os.path.join(app.outdir, "shards", "testcases-0001.xml")
+    assert get_testcase_titles(shard_file) == ["Test Bar", "Test Foo"]
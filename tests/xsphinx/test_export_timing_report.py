@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import json
+import os
+
+import pytest
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_timing_report',
+    confoverrides={
+        'pylatest_export_timing_report': 'timing.json',
+        'pylatest_export_timing_slowest': 2,
+        })
+def test_timing_report(app, status, warning):
+    app.builder.build_all()
+    report_path = os.path.join(app.outdir, "timing.json")
+    with io.open(report_path, encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    # there are 4 test case documents in the testroot
+    assert report['documents'] == 4
+    assert len(report['slowest']) == 2
+    for phase in ('html', 'parse', 'filter', 'tree', 'serialize', 'write'):
+        assert report['phases'][phase]['count'] == 4
+    # the slowest documents are ordered by total time
+    assert report['slowest'][0]['wall'] >= report['slowest'][1]['wall']
+
+
+@pytest.mark.sphinx('xmlexport', testroot='export_lookup_method-default')
+def test_timing_report_disabled(app, status, warning):
+    app.builder.build_all()
+    assert len(app.builder.timer) == 0
+    assert not os.path.exists(os.path.join(app.outdir, "timing.json"))
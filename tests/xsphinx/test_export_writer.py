@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from pylatest.xsphinx.builders import OutputWriter
+
+
+def read_file(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def test_output_writer(tmpdir):
+    written = []
+
+    def write_func(outfilename, content_b):
+        if content_b == b"error":
+            raise IOError("no space left")
+        written.append((outfilename, content_b))
+
+    writer = OutputWriter(write_func, queue_size=1)
+    for num in range(10):
+        outfilename = tmpdir.join("out", str(num)).strpath
+        writer.write(str(num), outfilename, b"error" if num == 3 else b"ok")
+    errors = writer.close()
+    assert not writer.thread.is_alive()
+    # files are written in the same order as they were queued
+    assert [name for name, _ in written] == [
+        tmpdir.join("out", str(num)).strpath for num in range(10) if num != 3]
+    assert len(errors) == 1
+    assert errors[0][0] == "3"
+    assert str(errors[0][2]) == "no space left"
+
+
+def test_output_writer_unexpected_error(tmpdir):
+    def write_func(outfilename, content_b):
+        raise ValueError("unexpected")
+
+    # writer thread keeps going after any error, so that writing into full
+    # queue doesn't block forever
+    writer = OutputWriter(write_func, queue_size=1)
+    producer = threading.Thread(target=lambda: [
+        writer.write(str(num), tmpdir.join(str(num)).strpath, b"ok")
+        for num in range(10)])
+    producer.start()
+    producer.join(10)
+    assert not producer.is_alive()
+    errors = writer.close()
+    assert [docname for docname, _, _ in errors] == [
+        str(num) for num in range(10)]
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_writer',
+    confoverrides={'pylatest_export_write_queue_size': 1})
+def test_export_writer_same_content(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    assert app.builder.output_writer is None
+    docnames = ("test_bar", "test_foo", "foo/bar/test_one", "foo/bar/test_two")
+    contents = {}
+    for docname in docnames:
+        contents[docname] = read_file(
+            os.path.join(app.outdir, docname + ".xml"))
+    # files written without background writer thread
+    kwargs['confoverrides'] = {'pylatest_export_write_queue_size': 0}
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    for docname in docnames:
+        filename = os.path.join(app.outdir, docname + ".xml")
+        assert read_file(filename) == contents[docname]
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_writer_error',
+    confoverrides={'pylatest_export_index': 'index.json'})
+def test_export_writer_error(app, status, warning):
+    # directory in place of xml export file makes writing of the file fail
+    os.makedirs(os.path.join(app.outdir, "test_bar.xml"))
+    app.builder.build_all()
+    assert "error writing file {0}".format(
+        os.path.join(app.outdir, "test_bar.xml")) in warning.getvalue()
+    assert os.path.exists(os.path.join(app.outdir, "test_foo.xml"))
+    # file which was not written is not listed in the index
+    with io.open(os.path.join(app.outdir, "index.json")) as index_file:
+        index = json.load(index_file)
+    assert "test_bar" not in index
+    assert "test_foo" in index
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_writer_unchanged',
+    confoverrides={'pylatest_export_compress': True})
+def test_export_writer_skip_unchanged(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    bar_file = os.path.join(app.outdir, "test_bar.xml.gz")
+    foo_file = os.path.join(app.outdir, "test_foo.xml.gz")
+    # make the files look old and change content of one of them
+    os.utime(bar_file, (1000, 1000))
+    with open(foo_file, "wb") as f:
+        f.write(b"broken")
+    os.utime(foo_file, (1000, 1000))
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    # file with the same content is not touched, while the other is replaced
+    assert os.stat(bar_file).st_mtime == 1000
+    assert os.stat(foo_file).st_mtime != 1000
+    assert read_file(foo_file) != b"broken"
+    # no temporary files are left behind
+    assert sorted(os.listdir(app.outdir)) == [
+        "foo", "test_bar.xml.gz", "test_foo.xml.gz"]
+
+
+@pytest.mark.sphinx(
+    'xmlexport',
+    testroot='export_lookup_method-custom',
+    srcdir='export_writer_error_delta',
+    confoverrides={
+        'pylatest_export_manifest': 'fingerprints.json',
+        'pylatest_export_delta': 'delta.json',
+        })
+def test_export_writer_error_delta(app_params, make_app):
+    args, kwargs = app_params
+    app = make_app(*args, **kwargs)
+    # directory in place of xml export file makes writing of the file fail
+    os.makedirs(os.path.join(app.outdir, "test_bar.xml"))
+    app.builder.build_all()
+    # test case which was not written is not listed in the manifest
+    with io.open(os.path.join(app.outdir, "fingerprints.json")) as f:
+        manifest = json.load(f)
+    assert "test_bar" not in manifest['testcases']
+    assert "test_foo" in manifest['testcases']
+    # so that it's exported in the next build
+    os.rmdir(os.path.join(app.outdir, "test_bar.xml"))
+    app = make_app(*args, **kwargs)
+    app.builder.build_all()
+    with io.open(os.path.join(app.outdir, "delta.json")) as f:
+        delta = json.load(f)
+    assert [item['docname'] for item in delta['added']] == ["test_bar"]
+    assert os.path.isfile(os.path.join(app.outdir, "test_bar.xml"))
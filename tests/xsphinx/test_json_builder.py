@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import json
+import os
+
+import pytest
+
+
+def load_json(app, filename):
+    with io.open(os.path.join(app.outdir, filename)) as json_file:
+        return json.load(json_file)
+
+
+@pytest.mark.sphinx('pylatest-json', testroot='export_lookup_method-id_custom')
+def test_json_testcases(app, status, warning):
+    app.builder.build_all()
+    # only test cases are written into json files
+    assert not os.path.exists(os.path.join(app.outdir, "index.json"))
+    entry = load_json(app, "test_0001.json")
+    assert entry == {
+        'docname': 'test_0001',
+        'id': '0001',
+        'lookup_method': 'id',
+        'title': 'Test Bar',
+        'metadata': {},
+        'requirements': [],
+        'sections': ['Description', 'Setup', 'Test Steps', 'Teardown'],
+        'missing_sections': [],
+        'actions': 2,
+        'steps': 2,
+        'results': 2,
+        }
+    entry = load_json(app, "test_noid.json")
+    assert entry['id'] == '/test_noid'
+    assert entry['lookup_method'] == 'custom'
+    assert entry['metadata'] == {'author': 'joe.foo@example.com'}
+    assert entry['sections'] == ['Test Steps']
+    assert entry['missing_sections'] == ['Description', 'Setup', 'Teardown']
+    assert entry['actions'] == 1
+
+
+@pytest.mark.sphinx('pylatest-json', testroot='testdefaults-nested')
+def test_json_testdefaults(app, status, warning):
+    app.builder.build_all()
+    entry = load_json(app, os.path.join("foo", "test_one.json"))
+    assert entry['metadata'] == {
+        'author': 'joe@example.com',
+        'component': 'foo',
+        'importance': 'high',
+        }
+
+
+@pytest.mark.sphinx(
+    'pylatest-json',
+    testroot='testdefaults-nested',
+    confoverrides={'pylatest_json_lines': 'testcases.jsonl'})
+def test_json_lines(app, status, warning):
+    app.builder.build_all()
+    with io.open(os.path.join(app.outdir, "testcases.jsonl")) as jsonl_file:
+        entries = [json.loads(line) for line in jsonl_file]
+    docnames = [entry['docname'] for entry in entries]
+    assert docnames == [
+        'bar/test_elewen', 'bar/test_ten', 'foo/test_one', 'foo/test_two']
+    assert entries[2]['metadata']['component'] == 'foo'
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2018 Martin Bukatovič <martin.bukatovic@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from argparse import Namespace
+import io
+import json
+import os
+
+import pytest
+
+from pylatest.xsphinx.extension import pylatest_profile_merge
+from pylatest.xsphinx.profiling import PhaseTimer
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='requirementlist-nested',
+    srcdir='profile_file',
+    confoverrides={'pylatest_profile': 'profile.json'})
+def test_profile_report_file(app, status, warning):
+    app.build(True)
+    report_path = os.path.join(app.outdir, "profile.json")
+    with io.open(report_path, encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    # handlers and transforms are reported separately
+    for name in (
+            "RequiremenIndexingTransform",
+            "TestActionsTableTransform",
+            "pylatest_transform_handler",
+            "pylatest_resolve_defaults",
+            "pylatest_resolve_requirements"):
+        assert name in report['phases']
+    # indexing transform is executed for each document during reading
+    assert report['phases']['RequiremenIndexingTransform']['count'] == 8
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='requirementlist-nested',
+    srcdir='profile_log',
+    confoverrides={'pylatest_profile': True})
+def test_profile_report_log(app, status, warning):
+    app.build(True)
+    assert "pylatest profile (8 documents)" in status.getvalue()
+    assert "pylatest_resolve_requirements" in status.getvalue()
+
+
+def test_profile_merge_docnames():
+    # env of a worker process contains data of documents read by previous
+    # workers (which were already merged), so that only data of documents
+    # read by the worker itself are merged
+    main_env = Namespace(pylatest_profile=PhaseTimer())
+    main_env.pylatest_profile.add("foo", "phase", 1.0, 1.0)
+    worker_env = Namespace(pylatest_profile=PhaseTimer())
+    worker_env.pylatest_profile.merge(main_env.pylatest_profile)
+    worker_env.pylatest_profile.add("bar", "phase", 2.0, 1.5)
+    pylatest_profile_merge(None, main_env, set(["bar"]), worker_env)
+    assert main_env.pylatest_profile.doc_total("foo") == (1.0, 1.0)
+    assert main_env.pylatest_profile.doc_total("bar") == (2.0, 1.5)
@@ -16,9 +16,13 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import os
+
 from lxml import etree
 import pytest
 
+from pylatest.xsphinx import extension
+
 from testutil import xmlparse_testcase, get_requirements_from_build, NS
 
 
@@ -133,3 +137,104 @@ def test_requirementlist_url_flat_html(app, status, warning):
     assert len(req_links) == 2
     assert len(req_links[0]) == 1
     assert len(req_links[1]) == 1
+
+
+@pytest.mark.sphinx(
+    'html', testroot='requirementlist-nested', srcdir='requirementlist-once')
+def test_requirementlist_template_once(app, status, warning, monkeypatch):
+    """
+    Check that requirement list is built just once per build, and then used
+    in all documents with requirementlist directive (with correct links).
+    """
+    calls = []
+    build_template = extension.build_requirementlist_template
+
+    def counting_build_template(env):
+        calls.append(env)
+        return build_template(env)
+
+    monkeypatch.setattr(
+        extension, "build_requirementlist_template", counting_build_template)
+    app.builder.build_all()
+    assert len(calls) == 1
+    for docname, exp_href in (
+            ("requirements", "baz/test_one.html"),
+            ("requirements/requirements", "../baz/test_one.html")):
+        doc_tree = xmlparse_testcase(app.outdir, docname, "html")
+        req_list = get_requirements_from_build(doc_tree, "html")
+        req_item = [i for i in req_list if i.text == "FOO-111"][0]
+        case_ref_list = req_item.xpath('h:ul/h:li/h:a', namespaces=NS)
+        assert [ref.get('href') for ref in case_ref_list] == [exp_href]
+    # requirement nodes in the reverse index are copied into the list
+    # (instead of being moved from one doctree into another)
+    index_req_ids = set(
+        id(req_node)
+        for req_node, _ in app.env.pylatest_requirements.values())
+    for _, req_item_node, _ in app.builder.pylatest_requirementlist:
+        assert id(req_item_node[0][0]) not in index_req_ids
+
+
+def get_requirement_items(tree):
+    """
+    Get text of requirements and links to test cases from requirement list
+    in given html tree (either of a document or of additional page).
+    """
+    items = []
+    for req_item in tree.xpath(
+            '//h:div[@role="main"]//h:ul[not(ancestor::h:ul)]/h:li',
+            namespaces=NS):
+        links = req_item.xpath('h:ul/h:li/h:a/@href', namespaces=NS)
+        items.append((req_item.text, links))
+    return items
+
+
+def get_page_links(tree):
+    return tree.xpath(
+        '//h:p[contains(@class, "pylatest-pages")][1]/h:a/@href',
+        namespaces=NS)
+
+
+@pytest.mark.sphinx('html', testroot='requirementlist-paged')
+def test_requirementlist_paged_html(app, status, warning):
+    app.builder.build_all()
+    doc_tree = xmlparse_testcase(app.outdir, "requirements", "html")
+    # first list contains first 2 of 5 requirements with FOO- prefix, while
+    # the second list is not paged at all
+    items = get_requirement_items(doc_tree)
+    assert items == [
+        ("FOO-1", ["test_one.html"]),
+        ("FOO-2", ["test_one.html"]),
+        ("BAR-1", ["test_one.html"]),
+        ("BAZ-1", ["test_two.html"]),
+        ]
+    assert get_page_links(doc_tree) == [
+        "requirements-page-2.html", "requirements-page-3.html"]
+    # other pages are generated as separate html files
+    page_tree = xmlparse_testcase(app.outdir, "requirements-page-2", "html")
+    assert get_requirement_items(page_tree) == [
+        ("FOO-3", ["test_two.html"]),
+        ("FOO-4", ["test_two.html"]),
+        ]
+    assert get_page_links(page_tree) == [
+        "requirements.html", "requirements-page-3.html"]
+    page_tree = xmlparse_testcase(app.outdir, "requirements-page-3", "html")
+    assert get_requirement_items(page_tree) == [
+        ("FOO-5", ["test_two.html"]),
+        ]
+    assert not os.path.exists(
+        os.path.join(app.outdir, "requirements-page-4.html"))
+
+
+@pytest.mark.sphinx('text', testroot='requirementlist-paged')
+def test_requirementlist_paged_text(app, status, warning):
+    """
+    Check that requirement list is not split into pages for other than html
+    builders.
+    """
+    app.builder.build_all()
+    with open(os.path.join(app.outdir, "requirements.txt")) as f:
+        content = f.read()
+    for req in ("FOO-1", "FOO-5", "BAR-1", "BAZ-1"):
+        assert req in content
+    assert "QUX-1" not in content
+    assert "Pages:" not in content